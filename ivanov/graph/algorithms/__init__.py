@@ -5,6 +5,7 @@ Created on Nov 21, 2015
 '''
 
 from ivanov.graph.algorithms import arnborg_proskurowski
+from ivanov.graph.compact_hypergraph import CompactHypergraph
 from ivanov.graph.hypergraph import Hypergraph
 import networkx as nx
 import random
@@ -47,10 +48,16 @@ def r_ball(graph, center, r, edge_dir=0):
 
 # TODO: can be optimized
 def r_ball_hyper(hypergraph, center, r, edge_dir=0, center_default_color=False):
-    '''The same as r_ball but for Hypergraph.
+    '''The same as r_ball but for Hypergraph. The hypergraph can also be a
+    CompactHypergraph (e.g. memory-mapped by load_from_binary), then only the
+    r-ball is read from its arrays and the node with ID i gets the ID u"n_i".
     '''
-    assert type(hypergraph) is Hypergraph
+    assert type(hypergraph) in [Hypergraph, CompactHypergraph]
     
+    if type(hypergraph) is CompactHypergraph:
+        node_id = Hypergraph.format_node_id
+    else:
+        node_id = lambda node: node
     visited_nodes = set()
     
     def recurse(u, i):
@@ -63,20 +70,25 @@ def r_ball_hyper(hypergraph, center, r, edge_dir=0, center_default_color=False):
             endpoints = hypergraph.endpoints(edge)
             new_endpoints = set(endpoints) - set([u])
             for v in new_endpoints:
-                if not rball.has_node(v):
-                    rball.add_node(v, attr_dict=copy.deepcopy(hypergraph.node[v]))
+                if not rball.has_node(node_id(v)):
+                    rball.add_node(node_id(v), attr_dict=copy.deepcopy(hypergraph.node[v]))
             
             first_new_endpoint = next(iter(new_endpoints))
             # TODO: this condition may be tricky if the graph has hyperedges
-            if not rball.has_edge(u, first_new_endpoint, edge_dir):
+            if not rball.has_edge(node_id(u), node_id(first_new_endpoint), edge_dir):
                 parallel_edges = hypergraph.edges_iter_dir(u, first_new_endpoint, dir_code=edge_dir)
                 # add all parallel edges in the same direction to the r-ball
                 for parallel_edge in parallel_edges:
                     skip_edges.add(parallel_edge)
                     p_edge_attr = hypergraph.edge(parallel_edge)
-                    direction = p_edge_attr["direction"]
-                    # TODO: not safe if we have hyperedges
-                    rball.add_edge(endpoints, direction=copy.deepcopy(direction), label=u",".join(copy.deepcopy(p_edge_attr["labels"])))
+                    label = u",".join(copy.deepcopy(p_edge_attr["labels"]))
+                    if type(hypergraph) is CompactHypergraph:
+                        # the direction mask refers to the order of the integer endpoints
+                        direction = set(tuple(map(node_id, perm)) for perm in hypergraph.edge_direction(parallel_edge))
+                        rball.add_edge(set(map(node_id, p_edge_attr["endpoints"])), direction=direction, label=label)
+                    else:
+                        # TODO: not safe if we have hyperedges
+                        rball.add_edge(endpoints, dir_mask=p_edge_attr["dir_mask"], label=label)
             
             if i < r:
                 for v in new_endpoints:
@@ -86,9 +98,9 @@ def r_ball_hyper(hypergraph, center, r, edge_dir=0, center_default_color=False):
     rball = Hypergraph()
     if center_default_color:
         # the center node's default color is 0 ("owl:Thing")
-        rball.add_node(center, attr_dict={"labels": ["0"]})
+        rball.add_node(node_id(center), attr_dict={"labels": ["0"]})
     else:
-        rball.add_node(center, attr_dict=copy.deepcopy(hypergraph.node[center]))
+        rball.add_node(node_id(center), attr_dict=copy.deepcopy(hypergraph.node[center]))
     if r > 0:
         recurse(center, 1)
     
@@ -5,23 +5,92 @@ Created on Nov 21, 2015
 '''
 
 from reducible_feature import ReducibleFeature
+from permutation_search import Permutations
+from canonical_cache import CanonicalCache
+from label_dag import LabelDAG
+from reduction_plan import ReductionPlan
+from rule_stats import RuleStats
+from treewidth import get_lower_bound
 from ivanov.graph.hypergraph import Hypergraph
-from itertools import groupby, permutations
+from itertools import groupby, imap
+import multiprocessing
+import permutation_search
+import rule_stats
+import treewidth
+import time
 import sys
 
+canonical_cache = None
+
+def enable_cache(max_size=CanonicalCache.DEFAULT_MAX_SIZE, cache_file=None):
+    '''Enable memoizing the results of get_canonical_representation (see
+    CanonicalCache).
+    :param max_size: (default CanonicalCache.DEFAULT_MAX_SIZE) The maximal number of cached graphs.
+    :param cache_file: (optional) A file to load the cache from and to save it to
+    in disable_cache, so that later runs reuse the results.
+    :return The CanonicalCache.
+    '''
+    global canonical_cache
+    canonical_cache = CanonicalCache(max_size, cache_file)
+    return canonical_cache
+
+def disable_cache():
+    '''Disable the cache and save it if it was enabled with a cache_file.
+    :return The disabled CanonicalCache (or None).
+    '''
+    global canonical_cache
+    cache = canonical_cache
+    canonical_cache = None
+    if cache is not None and cache.cache_file:
+        cache.save()
+    return cache
+
+def enable_stats():
+    '''Start collecting statistics of the rules applied by run_algorithm in
+    this process (see RuleStats). The statistics aggregate over all calls
+    until disable_stats.
+    :return The RuleStats.
+    '''
+    rule_stats.active_stats = RuleStats()
+    return rule_stats.active_stats
+
+def disable_stats():
+    '''Stop collecting statistics.
+    :return The collected RuleStats (or None).
+    '''
+    stats = rule_stats.active_stats
+    rule_stats.active_stats = None
+    return stats
+
 def get_treewidth(graph):
-    result = run_algorithm(graph, return_features=False, compute_string=False)
-    return result[0]
+    '''Compute the tree-width of a graph by the structural-only reduction in
+    the module treewidth (the result is the same as the one of run_algorithm).
+    :param graph: A NetworkX graph or a Hypergraph.
+    :return The tree-width (0 to 3) or -1 if it is greater than 3.
+    '''
+    return treewidth.get_treewidth(graph)
 
-def get_canonical_representation(graph):
-    result = run_algorithm(graph)
+def get_canonical_representation(graph, plan=None):
+    '''
+    :param graph: A NetworkX graph or a Hypergraph.
+    :param plan: (optional) A ReductionPlan (see run_algorithm).
+    '''
+    if canonical_cache is not None:
+        hypergraph = graph if type(graph) is Hypergraph else Hypergraph(graph)
+        key = canonical_cache.get_key(hypergraph)
+        result = canonical_cache.get(hypergraph, key)
+        if result is None:
+            result = run_algorithm(hypergraph, check_lower_bound=True, plan=plan)
+            canonical_cache.put(hypergraph, result, key)
+        return result[1]
+    result = run_algorithm(graph, check_lower_bound=True, plan=plan)
     return result[1]
 
 def get_reduced_features(graph):
     result = run_algorithm(graph, return_features=True, compute_string=False)
     return result[2]
  
-def run_algorithm(graph, return_features=False, compute_string=True):
+def run_algorithm(graph, return_features=False, compute_string=True, check_lower_bound=False, label_dag=None, plan=None):
     '''Performs the algorithm proposed by Arnborg & Proskurowski on a graph with tree-width at most 3.
     :param graph: A NetworkX graph or a Hypergraph.
     :param return_features: (default False) If true, returns the features, which
@@ -29,8 +98,71 @@ def run_algorithm(graph, return_features=False, compute_string=True):
     :param compute_string: (default True) If True returns the canonical string
     representation of the graph. False means to perform the reduction rules
     without computing the canonical string.
+    :param check_lower_bound: (default False) If True, graphs with a non-empty
+    4-core or an MMD+ lower bound of at least 4 are rejected as "Tree-width > 3"
+    before any reduction (no features are returned for them).
+    :param label_dag: (optional) A LabelDAG. If given, the labels built by the
+    reduction are interned in it and the canonical string is given in terms of
+    ID's of the DAG (the ID of the final label, if a single node remains). The
+    full string, which is the same as without a LabelDAG, can be obtained by
+    label_dag.render.
+    :param plan: (optional) A ReductionPlan (requires compute_string). If it was
+    recorded on a graph with the same structure (the same node and edge ids),
+    the recorded reduction is replayed: the features are not extracted again,
+    the ready sets of the hypergraph are updated only once at the end and only
+    the labels are computed. Otherwise the reduction is recorded in the plan.
     :return A tuple of the form (tree_width, canonical_string[, reduced_features]).
     '''
+    stats = rule_stats.active_stats
+    
+    def run_rule(name, rule, *args):
+        if stats is None:
+            return rule(*args)
+        start = time.time()
+        result = rule(*args)
+        stats.add_rule(name, time.time() - start, result[0] if type(result) is tuple else result)
+        return result
+    
+    def reduce_feature(feature, hypergraph, compute_string):
+        if stats is None:
+            feature.reduce(hypergraph, compute_string)
+            return
+        start = time.time()
+        feature.reduce(hypergraph, compute_string)
+        stats.add_feature(feature.get_full_rule(), time.time() - start)
+    
+    def finish(*result):
+        if stats is not None:
+            stats.add_run(result[0], hypergraph.number_of_nodes(), hypergraph.number_of_edges())
+        return result
+    
+    def record(treewidth, canonical_string=None):
+        if recording:
+            plan.finish(treewidth, canonical_string)
+    
+    def replay(hypergraph):
+        canon_str = plan.canonical_string
+        if canon_str is None:
+            # the ready sets are not needed, since the groups and the features are known
+            with hypergraph.batch():
+                for step in plan.steps:
+                    if stats is not None:
+                        stats.add_iteration()
+                    # nodes removed since the last commit of the ready sets
+                    hypergraph.nodes_with_more_labels &= hypergraph.nodes_registry
+                    run_rule(u"0", rule_0, hypergraph, True, None, step.edges_groups)
+                    if step.hedges_groups:
+                        run_rule(u"3", rule_3, hypergraph, None, step.hedges_groups)
+                    for feature in step.features:
+                        reduce_feature(feature, hypergraph, True)
+            canon_str = collect_labels(hypergraph)
+            if label_dag is not None:
+                canon_str = label_dag.intern(canon_str)
+        if return_features:
+            return finish(plan.treewidth, canon_str, plan.get_features())
+        else:
+            return finish(plan.treewidth, canon_str)
+    
     def is_done(hypergraph):
         if hypergraph.number_of_edges() == 0:
             return True
@@ -47,7 +179,12 @@ def run_algorithm(graph, return_features=False, compute_string=True):
         
         return u",".join(labels)
     
-    def rule_0(hypergraph, compute_string):
+    def rule_0(hypergraph, compute_string, step=None, edges_groups=None):
+        '''
+        :param step: (optional) A ReductionStep to record the merged groups of parallel edges in.
+        :param edges_groups: (optional) The groups of parallel edges to merge
+        (when replaying a plan), by default the ones in the ready set.
+        '''
         modified = False
         
         # (originally 1.3) - remove self-loops
@@ -69,38 +206,26 @@ def run_algorithm(graph, return_features=False, compute_string=True):
                 modified = True
             
             for node in nodes_with_more_labels:
-                labels = hypergraph.node[node]["labels"]
-                labels.sort()
+                labels = sorted(hypergraph.node[node]["labels"])
                 new_label = u"(0.1;{0})".format(u",".join(labels))
                 hypergraph.set_node_labels(node, [new_label])
             
             hypergraph.reset_nodes_with_more_labels()
         
         # rule 0.2
-        parallel_edges_groups_keys = list(hypergraph.parallel_edges_groups.keys())
+        if edges_groups is None:
+            edges_groups = [list(hypergraph.parallel_edges_groups[key]) for key in hypergraph.parallel_edges_groups.keys()]
+            if step is not None:
+                step.edges_groups = edges_groups
         
-        if len(parallel_edges_groups_keys) > 0:
+        if len(edges_groups) > 0:
             modified = True
         
-        for key in parallel_edges_groups_keys:
-            edges_group = list(hypergraph.parallel_edges_groups[key])
+        for edges_group in edges_groups:
             endpoints = hypergraph.endpoints(edges_group[0])
             if compute_string:
-                perms = permutations(endpoints)
-                possible_labels = []
-                for perm in perms:
-                    possible_label = {}
-                    possible_label["perm"] = perm
-                    possible_label["label"] = []
-                    for edge in edges_group:
-                        possible_label["label"].append(Hypergraph.edge_to_string(hypergraph, edge, perm))
-                    possible_label["label"].sort()
-                    possible_label["label"] = u"(0.2;{0})".format(u",".join(possible_label["label"]))
-                    possible_labels.append(possible_label)
-                possible_labels = sorted(possible_labels, key=lambda element: element["label"])
-                minimal_label = possible_labels[0]["label"]
-                minimal_perm_indices = filter(lambda i: possible_labels[i]["label"] == minimal_label, range(len(possible_labels)))
-                direction = set([possible_labels[i]["perm"] for i in minimal_perm_indices])
+                minimal_label, minimal_perms = permutation_search.minimal_label(hypergraph, edges_group, Permutations(endpoints), label_format=u"(0.2;{0})")
+                direction = set(minimal_perms)
                 hypergraph.remove_edges_from(edges_group, unsafe=True)
                 hypergraph.add_edge(endpoints, direction, minimal_label)
             else:
@@ -117,15 +242,12 @@ def run_algorithm(graph, return_features=False, compute_string=True):
         if return_features:
             pendant_features = list(pendant_features)
         
-        affected_nodes = set()
-        
-        for feature in pendant_features:
-            if not modified:
-                modified = True
-            feature.reduce(hypergraph, compute_string)
-            affected_nodes |= set(feature.reducible_nodes) | set(feature.peripheral_nodes)
-        
-        hypergraph.update_nodes_with_n_neighbors(affected_nodes)
+        # the ready sets are updated once for the whole pass
+        with hypergraph.batch():
+            for feature in pendant_features:
+                if not modified:
+                    modified = True
+                reduce_feature(feature, hypergraph, compute_string)
         
         return modified, pendant_features if return_features else None
     
@@ -135,47 +257,29 @@ def run_algorithm(graph, return_features=False, compute_string=True):
         if return_features:
             series_features = list(series_features)
         
-        affected_nodes = set()
-        new_edges = set()
-        
-        for feature in series_features:
-            if not modified:
-                modified = True
-            _new_edges = feature.reduce(hypergraph, compute_string)
-            affected_nodes |= set(feature.reducible_nodes) | set(feature.peripheral_nodes)
-            new_edges |= _new_edges
-        
-        hypergraph.update_parallel_edges_groups(new_edges)
-        hypergraph.update_nodes_with_n_neighbors(affected_nodes)
+        with hypergraph.batch():
+            for feature in series_features:
+                if not modified:
+                    modified = True
+                reduce_feature(feature, hypergraph, compute_string)
         
         return modified, series_features if return_features else None
     
-    def rule_3(hypergraph):
+    def rule_3(hypergraph, step=None, hedges_groups=None):
         modified = False
         
-        parallel_hedges_groups_keys = list(hypergraph.parallel_hedges_groups.keys())
+        if hedges_groups is None:
+            hedges_groups = [list(hypergraph.parallel_hedges_groups[key]) for key in hypergraph.parallel_hedges_groups.keys()]
+            if step is not None:
+                step.hedges_groups = hedges_groups
         
-        if len(parallel_hedges_groups_keys) > 0:
+        if len(hedges_groups) > 0:
             modified = True
         
-        for key in parallel_hedges_groups_keys:
-            hedges_group = hypergraph.parallel_hedges_groups[key]
+        for hedges_group in hedges_groups:
             endpoints = hypergraph.endpoints(hedges_group[0])
-            perms = permutations(endpoints)
-            possible_labels = []
-            for perm in perms:
-                possible_label = {}
-                possible_label["perm"] = perm
-                possible_label["label"] = []
-                for hedge in hedges_group:
-                    possible_label["label"].append(Hypergraph.hedge_to_string(hypergraph, hedge, perm))
-                possible_label["label"].sort()
-                possible_label["label"] = u",".join(possible_label["label"])
-                possible_labels.append(possible_label)
-            possible_labels = sorted(possible_labels, key=lambda element: element["label"])
-            minimal_label = possible_labels[0]["label"]
-            minimal_perm_indices = filter(lambda i: possible_labels[i]["label"] == minimal_label, range(len(possible_labels)))
-            direction = set([possible_labels[i]["perm"] for i in minimal_perm_indices])
+            minimal_label, minimal_perms = permutation_search.minimal_label(hypergraph, hedges_group, Permutations(endpoints))
+            direction = set(minimal_perms)
             hypergraph.remove_edges_from(hedges_group, unsafe=True)
             hypergraph.add_edge(endpoints, direction, u"(3;{0})".format(minimal_label))
         
@@ -189,21 +293,11 @@ def run_algorithm(graph, return_features=False, compute_string=True):
         if return_features:
             degree_3_features = list(degree_3_features)
         
-        affected_nodes = set()
-        new_edges = set()
-        
-        for feature in degree_3_features:
-            if not modified:
-                modified = True
-            _new_edges = feature.reduce(hypergraph, compute_string)
-            affected_nodes |= set(feature.reducible_nodes) | set(feature.peripheral_nodes)
-            new_edges |= _new_edges
-        
-        new_hedges = set(filter(lambda edge_id: edge_id.startswith(u"he_"), new_edges))
-        
-        hypergraph.update_parallel_edges_groups(new_edges - new_hedges)
-        hypergraph.update_parallel_hedges_groups(new_hedges)
-        hypergraph.update_nodes_with_n_neighbors(affected_nodes)
+        with hypergraph.batch():
+            for feature in degree_3_features:
+                if not modified:
+                    modified = True
+                reduce_feature(feature, hypergraph, compute_string)
         
         return modified, degree_3_features if return_features else None
     
@@ -211,15 +305,32 @@ def run_algorithm(graph, return_features=False, compute_string=True):
         hypergraph = Hypergraph(graph)
     else:
         hypergraph = graph.copy()
+    if compute_string:
+        hypergraph.label_dag = label_dag
+    
+    assert plan is None or compute_string, "A reduction plan requires compute_string."
+    if plan is not None and plan.matches(hypergraph):
+        return replay(hypergraph)
+    recording = plan is not None
+    if recording:
+        plan.start(hypergraph)
     
     features = []
     treewidth = 0
     
     if hypergraph.number_of_nodes() == 0:
+        record(treewidth, u"")
+        if return_features:
+            return finish(treewidth, "", features)
+        else:
+            return finish(treewidth, "")
+    
+    if check_lower_bound and get_lower_bound(hypergraph) > 3:
+        record(-1, u"Tree-width > 3")
         if return_features:
-            return treewidth, "", features
+            return finish(-1, u"Tree-width > 3", features)
         else:
-            return treewidth, ""
+            return finish(-1, u"Tree-width > 3")
     
     new_features = []
             
@@ -231,50 +342,137 @@ def run_algorithm(graph, return_features=False, compute_string=True):
         
 #         hypergraph.visualize()
         
+        if stats is not None:
+            stats.add_iteration()
+        
+        step = plan.add_step() if recording else None
+        
         # no need to check if modified here to continue, just go to the next rule after
-        rule_0(hypergraph, compute_string)
+        run_rule(u"0", rule_0, hypergraph, compute_string, step)
 
-        modified, new_features = rule_1(hypergraph, return_features, compute_string)
+        modified, new_features = run_rule(u"1", rule_1, hypergraph, return_features or recording, compute_string)
         if modified:
             if treewidth < 1:
                 treewidth = 1
+            if recording:
+                step.features = new_features
             continue
 
-        modified, new_features = rule_2(hypergraph, return_features, compute_string)
+        modified, new_features = run_rule(u"2", rule_2, hypergraph, return_features or recording, compute_string)
         if modified:
             if treewidth < 2:
                 treewidth = 2
+            if recording:
+                step.features = new_features
             continue
         
         if compute_string:
-            modified = rule_3(hypergraph)
+            modified = run_rule(u"3", rule_3, hypergraph, step)
             if modified:
                 new_features = []
                 continue
 
-        modified, new_features = rules_4_5_6_7(hypergraph, return_features, compute_string)
+        modified, new_features = run_rule(u"4-7", rules_4_5_6_7, hypergraph, return_features or recording, compute_string)
         if modified:
             if treewidth < 3:
                 treewidth = 3
+            if recording:
+                step.features = new_features
             continue
         else:
             if is_done(hypergraph):
                 if hypergraph.number_of_nodes() == 0:
                     sys.stderr.write("\n[ArnborgProskurowski] Error: empty graph produced.")
+                    record(treewidth, u"")
                     if return_features:
-                        return treewidth, u"", features
+                        return finish(treewidth, u"", features)
                     else:
-                        return treewidth, u""
+                        return finish(treewidth, u"")
                 else:
+                    record(treewidth)
                     canon_str = collect_labels(hypergraph) if compute_string else u""
+                    if compute_string and label_dag is not None:
+                        canon_str = label_dag.intern(canon_str)
                     if return_features:
                         features += new_features
-                        return treewidth, canon_str, features
+                        return finish(treewidth, canon_str, features)
                     else:
-                        return treewidth, canon_str
+                        return finish(treewidth, canon_str)
             else:
+                record(-1, u"Tree-width > 3")
                 if return_features:
                     features += new_features
-                    return -1, u"Tree-width > 3", features
+                    return finish(-1, u"Tree-width > 3", features)
                 else:
-                    return -1, u"Tree-width > 3"
+                    return finish(-1, u"Tree-width > 3")
+
+# the number of nodes and edges of the graphs, which are sent to a worker process at once
+DEFAULT_CHUNK_WEIGHT = 5000
+
+def _run_algorithm_on_chunk(args):
+    start, graphs, kwargs = args
+    return start, [run_algorithm(graph, **kwargs) for graph in graphs]
+
+def _get_chunks(graphs, chunksize, chunk_weight):
+    '''Group the graphs into chunks of chunksize graphs or (if chunksize is None)
+    of about chunk_weight nodes and edges in total.
+    :return A generator of tuples (index_of_first_graph, graphs).
+    '''
+    chunk = []
+    start = 0
+    weight = 0
+    for i, graph in enumerate(graphs):
+        chunk.append(graph)
+        weight += graph.number_of_nodes() + graph.number_of_edges()
+        if (chunksize and len(chunk) >= chunksize) or (not chunksize and weight >= chunk_weight):
+            yield start, chunk
+            chunk = []
+            start = i + 1
+            weight = 0
+    if chunk:
+        yield start, chunk
+
+def run_algorithm_many(graphs, processes=None, chunksize=None, ordered=True, return_features=False, compute_string=True, check_lower_bound=False, chunk_weight=DEFAULT_CHUNK_WEIGHT):
+    '''Run the algorithm on many graphs in a pool of worker processes. The graphs
+    are consumed lazily and the results are streamed back as the chunks are done.
+    :param graphs: An iterable of NetworkX graphs or Hypergraphs.
+    :param processes: (default None) The number of worker processes (None means
+    the number of CPUs). With 1 process the graphs are processed in the current
+    process.
+    :param chunksize: (optional) The number of graphs sent to a worker at once.
+    By default the chunks are formed by graph size (see chunk_weight), so that
+    big graphs are not stuck together in one chunk.
+    :param ordered: (default True) If True the results are yielded in the order
+    of the input graphs, otherwise as soon as they are ready.
+    :param return_features: See run_algorithm.
+    :param compute_string: See run_algorithm.
+    :param check_lower_bound: See run_algorithm.
+    :param chunk_weight: (default DEFAULT_CHUNK_WEIGHT) The total number of
+    nodes and edges of the graphs in a chunk if chunksize is not given.
+    :return A generator of the results of run_algorithm if ordered, otherwise of
+    tuples (index_of_graph, result).
+    '''
+    kwargs = {"return_features": return_features, "compute_string": compute_string, "check_lower_bound": check_lower_bound}
+    chunks = ((start, chunk, kwargs) for start, chunk in _get_chunks(graphs, chunksize, chunk_weight))
+    
+    if processes == 1:
+        for start, results in imap(_run_algorithm_on_chunk, chunks):
+            for i, result in enumerate(results):
+                yield result if ordered else (start + i, result)
+        return
+    
+    pool = multiprocessing.Pool(processes)
+    try:
+        if ordered:
+            for _, results in pool.imap(_run_algorithm_on_chunk, chunks):
+                for result in results:
+                    yield result
+        else:
+            for start, results in pool.imap_unordered(_run_algorithm_on_chunk, chunks):
+                for i, result in enumerate(results):
+                    yield start + i, result
+        pool.close()
+    finally:
+        # also stops the workers if the generator is not consumed completely
+        pool.terminate()
+        pool.join()
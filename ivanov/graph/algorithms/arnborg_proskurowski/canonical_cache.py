@@ -0,0 +1,233 @@
+'''
+Created on Mar 20, 2016
+
+@author: Ivan Ivanov
+'''
+
+from collections import OrderedDict
+from networkx.algorithms import isomorphism
+from ivanov.graph.hypergraph import Hypergraph, DIRECTION_FLAGS, hash_colors
+from ivanov import inout
+import itertools
+import math
+import networkx as nx
+import os
+
+def get_representative(hypergraph, nodes=None):
+    '''Get a compact copy of a labeled hypergraph, which is stored in the cache
+    to verify the hits.
+    :param nodes: (optional) The order of the nodes, by default sorted by id.
+    :return A tuple (node_labels, edges), where node_labels is a tuple of the
+    sorted labels of each node and edges is a sorted tuple of (labels,
+    endpoints, dir_mask) with the endpoints given as sorted indices in
+    node_labels.
+    '''
+    if nodes is None:
+        nodes = sorted(hypergraph.nodes_iter())
+    node_indices = {node: i for i, node in enumerate(nodes)}
+    node_labels = tuple(tuple(sorted(hypergraph.node[node]["labels"])) for node in nodes)
+    edges = []
+    for edge in hypergraph.edges_iter():
+        edge_attr = hypergraph.edge(edge)
+        endpoints = tuple(sorted(node_indices[node] for node in edge_attr["endpoints"]))
+        direction = [tuple(node_indices[node] for node in perm) for perm in hypergraph.edge_direction(edge)]
+        edges.append((tuple(edge_attr["labels"]), endpoints, Hypergraph.encode_direction(endpoints, direction)))
+    edges.sort()
+    return node_labels, tuple(edges)
+
+def get_canonical_representative(hypergraph, node_colors, max_orderings):
+    '''Get the representative of a hypergraph with the nodes ordered by their
+    colors (see Hypergraph.refine_colors). The ties between nodes of the same
+    color are broken by taking the lexicographically smallest representative
+    over all their orderings, so two hypergraphs have the same canonical
+    representative if and only if they are isomorphic.
+    :param node_colors: A dictionary mapping the nodes to their colors.
+    :param max_orderings: The maximal number of orderings to try.
+    :return The canonical representative or None if the color classes allow
+    more than max_orderings orderings.
+    '''
+    color_classes = {}
+    for node, color in node_colors.iteritems():
+        color_classes.setdefault(color, []).append(node)
+    color_classes = [color_classes[color] for color in sorted(color_classes)]
+    orderings_count = 1
+    for color_class in color_classes:
+        orderings_count *= math.factorial(len(color_class))
+        if orderings_count > max_orderings:
+            return None
+    return min(get_representative(hypergraph, list(itertools.chain(*ordering)))
+               for ordering in itertools.product(*[itertools.permutations(color_class) for color_class in color_classes]))
+
+def _to_incidence_graph(representative):
+    '''Build the bipartite graph of a representative, in which each node and
+    edge is colored by its labels and each incidence by the role of the node
+    (source and/or target) in the edge.
+    '''
+    node_labels, edges = representative
+    graph = nx.Graph()
+    for i, labels in enumerate(node_labels):
+        graph.add_node(i, color=(u"node", labels))
+    for j, (labels, endpoints, dir_mask) in enumerate(edges):
+        edge = len(node_labels) + j
+        graph.add_node(edge, color=(u"edge", len(endpoints), labels))
+        is_source, is_target = DIRECTION_FLAGS[len(endpoints), dir_mask]
+        for k, node in enumerate(endpoints):
+            graph.add_edge(node, edge, role=(is_source[k], is_target[k]))
+    return graph
+
+def is_isomorphic(representative1, representative2):
+    '''Check whether two representatives (see get_representative) are
+    isomorphic, respecting the labels and the edge directions.
+    '''
+    node_labels1, edges1 = representative1
+    node_labels2, edges2 = representative2
+    if len(node_labels1) != len(node_labels2) or len(edges1) != len(edges2):
+        return False
+    matcher = isomorphism.GraphMatcher(_to_incidence_graph(representative1), _to_incidence_graph(representative2),
+                                       node_match=lambda attr1, attr2: attr1["color"] == attr2["color"],
+                                       edge_match=lambda attr1, attr2: attr1["role"] == attr2["role"])
+    offset1 = len(node_labels1)
+    offset2 = len(node_labels2)
+    for mapping in matcher.isomorphisms_iter():
+        # the roles determine the direction of edges with up to 2 endpoints,
+        # but the direction of a hyperedge is a set of permutations of its endpoints
+        for j, (_, endpoints, dir_mask) in enumerate(edges1):
+            if len(endpoints) > 2:
+                _, other_endpoints, other_dir_mask = edges2[mapping[offset1 + j] - offset2]
+                direction = set(tuple(mapping[node] for node in perm) for perm in Hypergraph.decode_direction(endpoints, dir_mask))
+                if direction != Hypergraph.decode_direction(other_endpoints, other_dir_mask):
+                    break
+        else:
+            return True
+    return False
+
+class CanonicalCache(object):
+    '''An LRU cache mapping labeled graphs to the results (treewidth,
+    canonical_string) of the Arnborg & Proskurowski algorithm. The same small
+    labeled graphs (shingles, features) occur many times in a database, so they
+    are reduced only once. The cache can be saved to a file and loaded in later
+    runs.
+    
+    The graphs are looked up by their structural hash (see
+    Hypergraph.structural_hash). Since graphs which are not distinguished by the
+    Weisfeiler-Lehman refinement of the hash collide (e.g. K3,3 and the
+    triangular prism), each entry keeps a representative of every cached graph
+    with the hash. If the color classes of the refinement are small, the
+    representative is canonical (see get_canonical_representative) and a hit is
+    verified by comparing the representatives. Otherwise it is verified by an
+    isomorphism test.
+    '''
+    
+    DEFAULT_MAX_SIZE = 1000000
+    DEFAULT_MAX_REPRESENTATIVES = 16
+    DEFAULT_MAX_ORDERINGS = 720
+    
+    def get_key(self, hypergraph):
+        '''Compute the key of a graph, which can be passed to get and put.
+        :return A tuple (structural_hash, representative, canonical).
+        '''
+        node_colors, edge_colors = hypergraph.refine_colors()
+        representative = get_canonical_representative(hypergraph, node_colors, self.max_orderings)
+        if representative is not None:
+            return hash_colors(node_colors, edge_colors), representative, True
+        else:
+            return hash_colors(node_colors, edge_colors), get_representative(hypergraph), False
+    
+    def get(self, hypergraph, key=None):
+        '''Get the result for a graph and mark it as recently used.
+        :param hypergraph: A Hypergraph.
+        :param key: (optional) The key of the hypergraph (see get_key), if already computed.
+        :return The tuple (treewidth, canonical_string) or None if the graph is not in the cache.
+        '''
+        if key is None:
+            key = self.get_key(hypergraph)
+        structural_hash, representative, canonical = key
+        value = None
+        representatives = self.entries.pop(structural_hash, None)
+        if representatives is not None:
+            self.entries[structural_hash] = representatives
+            for cached_representative, cached_canonical, cached_value in representatives:
+                # isomorphic graphs are either both canonical or both not
+                if cached_canonical != canonical:
+                    continue
+                if cached_representative == representative or (not canonical and is_isomorphic(cached_representative, representative)):
+                    value = cached_value
+                    break
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+    
+    def put(self, hypergraph, value, key=None):
+        '''Add the result for a graph. If the cache is full, the least recently
+        used entry is evicted. If the entry of the structural hash already has
+        max_representatives graphs, the oldest of them is dropped.
+        :param hypergraph: A Hypergraph.
+        :param value: A tuple (treewidth, canonical_string).
+        :param key: (optional) The key of the hypergraph (see get_key), if already computed.
+        '''
+        if key is None:
+            key = self.get_key(hypergraph)
+        structural_hash, representative, canonical = key
+        self._put(structural_hash, representative, canonical, value)
+    
+    def _put(self, structural_hash, representative, canonical, value):
+        representatives = self.entries.pop(structural_hash, [])
+        representatives.append((representative, canonical, value))
+        if len(representatives) > self.max_representatives:
+            del representatives[0]
+        self.entries[structural_hash] = representatives
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+    
+    def save(self, cache_file=None):
+        '''Save the entries (in LRU order) to a file.
+        :param cache_file: (optional) The file, by default the one passed to the constructor.
+        '''
+        cache_file = cache_file if cache_file else self.cache_file
+        assert cache_file, "No file to save the cache to."
+        inout.save_to_file(self.entries.items(), cache_file)
+    
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self.entries)
+        }
+    
+    def __len__(self):
+        return len(self.entries)
+    
+    def __repr__(self):
+        return "CanonicalCache({0})".format(self.stats())
+    
+    def __init__(self, max_size=DEFAULT_MAX_SIZE, cache_file=None, max_representatives=DEFAULT_MAX_REPRESENTATIVES,
+                 max_orderings=DEFAULT_MAX_ORDERINGS):
+        '''
+        :param max_size: (default DEFAULT_MAX_SIZE) The maximal number of
+        entries (structural hashes).
+        :param cache_file: (optional) A file to load the entries from (if it
+        exists) and to save them to.
+        :param max_representatives: (default DEFAULT_MAX_REPRESENTATIVES) The
+        maximal number of graphs kept for a structural hash.
+        :param max_orderings: (default DEFAULT_MAX_ORDERINGS) The maximal number
+        of node orderings tried to compute a canonical representative.
+        '''
+        assert max_size > 0
+        assert max_representatives > 0
+        self.max_size = max_size
+        self.max_representatives = max_representatives
+        self.max_orderings = max_orderings
+        self.cache_file = cache_file
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if cache_file and os.path.exists(cache_file):
+            for structural_hash, representatives in inout.load_from_file(cache_file):
+                for representative, canonical, value in representatives:
+                    self._put(structural_hash, representative, canonical, value)
+            self.evictions = 0
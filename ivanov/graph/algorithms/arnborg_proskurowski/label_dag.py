@@ -0,0 +1,171 @@
+'''
+Created on Mar 22, 2016
+
+@author: Ivan Ivanov
+
+A DAG of the labels built during the reduction of a graph.
+'''
+
+from ivanov.inout.serializable import Serializable
+import re
+
+# the digits of the order keys, the smallest one never ends a key
+KEY_DIGITS = u"0123456789abcdefghijklmnopqrstuvwxyz"
+
+def _midpoint(low, high):
+    '''Get an order key strictly between two keys (fractional indexing).
+    :param low: The lower key or u"" for no lower bound.
+    :param high: The higher key or None for no upper bound.
+    '''
+    if high is not None:
+        n = 0
+        while n < len(high) and (low[n] if n < len(low) else KEY_DIGITS[0]) == high[n]:
+            n += 1
+        if n > 0:
+            return high[:n] + _midpoint(low[n:], high[n:])
+    digit_low = KEY_DIGITS.index(low[0]) if low else 0
+    digit_high = KEY_DIGITS.index(high[0]) if high is not None else len(KEY_DIGITS)
+    if digit_high - digit_low > 1:
+        return KEY_DIGITS[(digit_low + digit_high) // 2]
+    if high is not None and len(high) > 1:
+        return high[:1]
+    return KEY_DIGITS[digit_low] + _midpoint(low[1:], None)
+
+def _get_head(label):
+    '''Get the head of a label of a rule, e.g. u"(2.1;" for u"(2.1;...)".
+    :return The head or None if the label is not a single parenthesized label
+    of a rule.
+    '''
+    if not label.startswith(u"("):
+        return None
+    end = label.find(u";")
+    if end < 0 or u"(" in label[1:end] or u")" in label[1:end]:
+        return None
+    depth = 0
+    for i, char in enumerate(label):
+        if char == u"(":
+            depth += 1
+        elif char == u")":
+            depth -= 1
+            if depth == 0 and i != len(label) - 1:
+                return None
+    if depth != 0:
+        return None
+    return label[:end + 1]
+
+class LabelDAG(Serializable):
+    '''Interns the labels of the rules as short ID's. The label of a reduced
+    feature is built from the ID's of the labels of its nodes and edges, so it
+    does not grow with the depth of the reduction. Each distinct label is
+    stored once (as its definition in terms of other ID's), so the labels form
+    a DAG, from which the full string of an ID can be rendered when needed.
+    Other labels (e.g. the labels of the input graph) are not interned.
+    
+    The labels are numbered by a counter. The ID of a label embedded in other
+    labels is its head (e.g. u"(2.1;") followed by ID_MARK, an order key and
+    u")". The order keys are assigned when the labels are interned, so that
+    they follow the lexicographic order of the rendered labels (see get_rank),
+    and they never change. Since the labels of the rules are balanced in the
+    parentheses, none of them is a prefix of another, so two labels built from
+    ID's compare like their rendered strings and the minimal labels chosen
+    during the reduction are the same as without a LabelDAG. The order keys
+    (and hence the ID's) depend on the labels interned before, only the
+    rendered strings can be compared across DAG's.
+    '''
+    
+    ID_MARK = u"#"
+    ID_PATTERN = re.compile(u"\\([^;()]*;#[0-9a-z]+\\)")
+    
+    def intern(self, label):
+        '''Get the ID of a label. The label is added to the DAG if needed. ID's
+        of the DAG and labels, which are not labels of a rule, are returned
+        unchanged.
+        '''
+        if label in self.ids:
+            return self.tokens[self.ids[label]]
+        head = _get_head(label)
+        if head is None or label in self:
+            return label
+        
+        # the position of the label in the order of the definitions
+        low = 0
+        high = len(self.order)
+        while low < high:
+            middle = (low + high) // 2
+            if self.definitions[self.order[middle]] < label:
+                low = middle + 1
+            else:
+                high = middle
+        lower_key = self.keys[self.order[low - 1]] if low > 0 else u""
+        higher_key = self.keys[self.order[low]] if low < len(self.order) else None
+        key = _midpoint(lower_key, higher_key)
+        
+        number = len(self.definitions)
+        self.ids[label] = number
+        self.definitions.append(label)
+        self.keys.append(key)
+        self.tokens.append(u"{0}{1}{2})".format(head, LabelDAG.ID_MARK, key))
+        self.numbers[key] = number
+        self.order.insert(low, number)
+        return self.tokens[number]
+    
+    def get_definition(self, label_id):
+        '''Get the label of an ID in terms of other ID's.'''
+        return self.definitions[self._get_number(label_id)]
+    
+    def get_rank(self, label_id):
+        '''Get the position of an ID in the lexicographic order of the rendered
+        labels of the DAG.
+        '''
+        return self.order.index(self._get_number(label_id))
+    
+    def render(self, label):
+        '''Replace all ID's in a label by their full strings (recursively).
+        :param label: An ID or a label containing ID's.
+        :return The full string.
+        '''
+        rendered = {}
+        
+        def render_id(match):
+            number = self._get_number(match.group(0))
+            if number is None:
+                return match.group(0)
+            if number not in rendered:
+                rendered[number] = LabelDAG.ID_PATTERN.sub(render_id, self.definitions[number])
+            return rendered[number]
+        
+        return LabelDAG.ID_PATTERN.sub(render_id, label)
+    
+    def _get_number(self, label_id):
+        '''Get the number of an ID or None if it is not an ID of the DAG.'''
+        key = label_id[label_id.rfind(LabelDAG.ID_MARK) + 1:-1]
+        number = self.numbers.get(key)
+        if number is None or self.tokens[number] != label_id:
+            return None
+        return number
+    
+    def __contains__(self, label_id):
+        return self._get_number(label_id) is not None
+    
+    def __len__(self):
+        return len(self.definitions)
+    
+    def __eq__(self, other):
+        if isinstance(other, self.__class__):
+            return self.definitions == other.definitions and self.keys == other.keys
+        else:
+            return False
+    
+    def __ne__(self, other):
+        return not self.__eq__(other)
+    
+    def __init__(self):
+        # the definitions, order keys and ID's by the number of the label
+        self.definitions = []
+        self.keys = []
+        self.tokens = []
+        # the numbers by definition and by order key
+        self.ids = {}
+        self.numbers = {}
+        # the numbers in the order of the definitions
+        self.order = []
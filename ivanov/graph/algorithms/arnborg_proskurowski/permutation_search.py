@@ -0,0 +1,198 @@
+'''
+Created on Mar 18, 2016
+
+@author: Ivan Ivanov
+
+Search for the permutations of the nodes of a reduced feature, which give the
+minimal label. The result is the same as labeling the feature with every
+permutation and taking the minimum, but branches of the search, which can only
+lead to greater labels, are pruned.
+'''
+
+from itertools import permutations
+from ivanov.graph.hypergraph import Hypergraph
+
+class Permutations(object):
+    '''All permutations of a collection of nodes. Iterating yields the same tuples
+    as itertools.permutations, but minimal_label searches them without
+    enumerating all of them.
+    '''
+    
+    def __init__(self, nodes):
+        self.nodes = tuple(nodes)
+    
+    def __iter__(self):
+        return permutations(self.nodes)
+
+def _build_trie(perms):
+    trie = {}
+    for perm in perms:
+        subtrie = trie
+        for node in perm:
+            subtrie = subtrie.setdefault(node, {})
+    return trie
+
+def _get_cell_ranks(nodes, edge_attrs, node_edges):
+    '''Partition the nodes by color refinement on the labels of their incident
+    edges and on the cells of their neighbors. Nodes from lower cells are tried
+    first, so that a small label is found early and more branches are pruned.
+    :return A dictionary mapping each node to the rank of its cell.
+    '''
+    colors = {}
+    for node in nodes:
+        colors[node] = tuple(sorted((edge_attrs[i]["labels"][0], len(edge_attrs[i]["endpoints"])) for i in node_edges[node]))
+    
+    for _ in range(len(nodes)):
+        new_colors = {}
+        for node in nodes:
+            signature = []
+            for i in node_edges[node]:
+                neighbor_colors = tuple(sorted(colors[neighbor] for neighbor in edge_attrs[i]["endpoints"] if neighbor != node))
+                signature.append((edge_attrs[i]["labels"][0], neighbor_colors))
+            new_colors[node] = (colors[node], tuple(sorted(signature)))
+        refined = len(set(new_colors.itervalues())) > len(set(colors.itervalues()))
+        colors = new_colors
+        if not refined:
+            break
+    
+    ranks = {color: rank for rank, color in enumerate(sorted(set(colors.itervalues())))}
+    return {node: ranks[colors[node]] for node in nodes}
+
+def _exceeds(prefix, label):
+    '''Check whether every string starting with prefix is greater than label.'''
+    common_len = min(len(prefix), len(label))
+    if prefix[:common_len] != label[:common_len]:
+        return prefix[:common_len] > label[:common_len]
+    return len(prefix) > len(label)
+
+def _is_prefix_free(strings):
+    '''Check that no string is a proper prefix of another one.'''
+    strings = sorted(set(strings))
+    return not any(strings[i + 1].startswith(strings[i]) for i in range(len(strings) - 1))
+
+def minimal_label(hypergraph, edges, perms, fixed_labels=[], label_format=u"{0}", counters=None):
+    '''Find the minimal label of a group of edges over a set of permutations of
+    their endpoints. The label for a permutation is
+    label_format.format(",".join(sorted(fixed_labels + edge_strings))), where
+    edge_strings are the strings of the edges produced by
+    Hypergraph.edge_to_string for the permutation.
+    
+    The permutations are built position by position. The nodes which are not
+    placed yet will get greater positions, which gives a lower bound for the
+    string of every edge. If no edge string can be a proper prefix of another
+    one or of a fixed label, sorting and joining preserves the bounds and the
+    label built from them is a lower bound for the whole branch. Otherwise
+    only the smallest elements of the sorted label, which are already
+    determined, are compared. When the bound is greater than the best label
+    found so far, the branch is pruned.
+    :param hypergraph: The hypergraph containing the edges.
+    :param edges: The edge ids.
+    :param perms: Either a Permutations object or an iterable of permutations
+    (tuples of the same length) containing the endpoints of all edges.
+    :param fixed_labels: (default []) Labels, which do not depend on the
+    permutation, but are sorted together with the edge strings.
+    :param label_format: (default u"{0}") A template for the label.
+    :param counters: (optional) A dictionary, whose entries "labeled" (the
+    number of complete permutations which were labeled) and "pruned" (the
+    number of pruned branches) are increased.
+    :return A tuple (minimal_label, minimal_perms), where minimal_perms is a
+    list of all permutations giving the minimal label.
+    '''
+    edge_attrs = [hypergraph.edge(edge) for edge in edges]
+    fixed_labels = list(fixed_labels)
+    
+    if isinstance(perms, Permutations):
+        trie = None
+        nodes = list(perms.nodes)
+        perm_len = len(nodes)
+    else:
+        perms = list(perms)
+        trie = _build_trie(perms)
+        nodes = list(set(node for perm in perms for node in perm))
+        perm_len = len(perms[0])
+    
+    node_edges = {node: [] for node in nodes}
+    for i, edge_attr in enumerate(edge_attrs):
+        for node in set(edge_attr["endpoints"]):
+            node_edges[node].append(i)
+    cell_ranks = _get_cell_ranks(nodes, edge_attrs, node_edges)
+    
+    # the lower bounds compare positions as strings, so they are valid only for single digits
+    use_bounds = perm_len <= 10
+    # the edge strings start with "(label,((" followed by a position
+    edge_heads = set(u"({0},((".format(edge_attr["labels"][0]) for edge_attr in edge_attrs)
+    full_bounds = _is_prefix_free(list(edge_heads) + fixed_labels) and not edge_heads & set(fixed_labels)
+    label_prefix = label_format.split(u"{0}")[0]
+    strings_cache = {}
+    positions = {}
+    perm = []
+    state = {"best": None, "minimal_perms": [], "labeled": 0, "pruned": 0}
+    
+    def edge_string(i, next_position):
+        edge_positions = tuple(positions.get(node, next_position) for node in edge_attrs[i]["endpoints"])
+        key = (i, edge_positions)
+        if key not in strings_cache:
+            strings_cache[key] = Hypergraph.edge_positions_to_string(edge_attrs[i], list(edge_positions))
+        return strings_cache[key]
+    
+    def is_pruned():
+        next_position = unicode(len(perm))
+        known = list(fixed_labels)
+        lower_bounds = []
+        for i, edge_attr in enumerate(edge_attrs):
+            if all(node in positions for node in edge_attr["endpoints"]):
+                known.append(edge_string(i, next_position))
+            else:
+                lower_bounds.append(edge_string(i, next_position))
+        if full_bounds:
+            return label_format.format(u",".join(sorted(known + lower_bounds))) > state["best"]
+        
+        known.sort()
+        if lower_bounds:
+            min_lower_bound = min(lower_bounds)
+            determined = 0
+            while determined < len(known) and known[determined] <= min_lower_bound:
+                determined += 1
+        else:
+            determined = len(known)
+        prefix = label_prefix + u",".join(known[:determined])
+        if 0 < determined < len(known) + len(lower_bounds):
+            prefix += u","
+        return _exceeds(prefix, state["best"])
+    
+    def search(subtrie):
+        if len(perm) == perm_len:
+            strings = fixed_labels + [edge_string(i, None) for i in range(len(edge_attrs))]
+            label = label_format.format(u",".join(sorted(strings)))
+            state["labeled"] += 1
+            if state["best"] is None or label < state["best"]:
+                state["best"] = label
+                state["minimal_perms"] = [tuple(perm)]
+            elif label == state["best"]:
+                state["minimal_perms"].append(tuple(perm))
+            return
+        
+        if use_bounds and state["best"] is not None and is_pruned():
+            state["pruned"] += 1
+            return
+        
+        if subtrie is None:
+            candidates = filter(lambda node: node not in positions, nodes)
+        else:
+            candidates = subtrie.keys()
+        candidates.sort(key=lambda node: cell_ranks[node])
+        
+        for node in candidates:
+            positions[node] = unicode(len(perm))
+            perm.append(node)
+            search(subtrie[node] if subtrie is not None else None)
+            perm.pop()
+            del positions[node]
+    
+    search(trie)
+    
+    if counters is not None:
+        counters["labeled"] = counters.get("labeled", 0) + state["labeled"]
+        counters["pruned"] = counters.get("pruned", 0) + state["pruned"]
+    
+    return state["best"], state["minimal_perms"]
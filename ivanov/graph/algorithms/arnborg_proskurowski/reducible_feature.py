@@ -8,6 +8,9 @@ from itertools import combinations, permutations
 from networkx.classes.function import neighbors
 from ivanov.graph.hypergraph import Hypergraph
 from ivanov.graph import nxext
+from permutation_search import Permutations
+import permutation_search
+import rule_stats
 import networkx as nx
 import itertools
 import sys
@@ -17,50 +20,77 @@ class ReducibleFeature(object):
     # public static methods
     
     @staticmethod
-    def extract_rule_1_features(hypergraph):        
-        pendant_nodes_and_dipoles_subgraph = hypergraph.subgraph(hypergraph.nodes_with_1_neighbor)
-        cc = nx.connected_components(nx.Graph(pendant_nodes_and_dipoles_subgraph))
+    def extract_rule_1_features(hypergraph):
+        # the candidates are read from the ready set of the hypergraph and
+        # paired through the neighbors multiplicity, without building a subgraph;
+        # they are visited by node id, so the features do not depend on the
+        # iteration order of the set
+        pendant_nodes_and_dipoles = hypergraph.nodes_with_1_neighbor
+        already_checked = set()
         
-        for comp in cc:
-            comp_list = list(comp)
-            if len(comp_list) > 1:
-                if len(comp_list) > 2:
-                    sys.stderr.write("\n[ReducibleFeature] Error: Wrong nodes extracted.")
-                else:
-                    # dipole
-                    yield ReducibleFeature(1, 1, [comp_list[0]], [comp_list[1]])
-            else:
-                neighbor = hypergraph.neighbors(comp_list[0])[0]
-                if comp_list[0] != neighbor: # skip self-loops
-                    # pendant
-                    yield ReducibleFeature(1, 2, [comp_list[0]], [neighbor])
+        for node in sorted(pendant_nodes_and_dipoles):
+            if node in already_checked:
+                continue
+            already_checked.add(node)
+            neighbor = next(iter(hypergraph.neighbors_multiplicity[node]))
+            if neighbor in pendant_nodes_and_dipoles:
+                # dipole (node has the smaller id)
+                already_checked.add(neighbor)
+                yield ReducibleFeature(1, 1, [node], [neighbor])
+            elif node != neighbor: # skip self-loops
+                # pendant
+                yield ReducibleFeature(1, 2, [node], [neighbor])
     
     @staticmethod
     def extract_rule_2_features(hypergraph):
-        series_subgraph = hypergraph.subgraph(hypergraph.nodes_with_2_neighbors)
+        series_nodes = hypergraph.nodes_with_2_neighbors
+        
+        def series_neighbors(node):
+            return sorted(filter(lambda neighbor: neighbor in series_nodes, hypergraph.neighbors_multiplicity[node]))
+        
+        def walk(start, previous):
+            '''Follow the series nodes from start away from previous (towards the
+            series neighbor with the smaller id if previous is None).
+            :return The list of the visited nodes and True if the walk returned to start.
+            '''
+            path = [start]
+            node = start
+            while True:
+                next_nodes = filter(lambda neighbor: neighbor != previous, series_neighbors(node))
+                if not next_nodes:
+                    return path, False
+                previous, node = node, next_nodes[0]
+                if node == start:
+                    return path, True
+                path.append(node)
+        
+        # the nodes are visited by id, so a ring starts at its smallest node
+        # and a chain is oriented from its endpoint with the smaller id
+        rings = []
+        chains = []
+        already_checked = set()
+        for node in sorted(series_nodes):
+            if node in already_checked:
+                continue
+            # go to one end of the chain (or around the ring)
+            path, is_ring = walk(node, None)
+            if is_ring:
+                rings.append(path)
+            else:
+                path, _ = walk(path[-1], None)
+                if path[-1] < path[0]:
+                    path.reverse()
+                chains.append(path)
+            already_checked.update(path)
         
         # ring
-        rings = nx.cycle_basis(series_subgraph)
         for ring in rings:
             yield ReducibleFeature(2, 2, ring[1:], [ring[0]])
         
-        nodes_in_rings = itertools.chain(*rings)
-        series_subgraph.remove_nodes_from(nodes_in_rings)
-        
         # chain
-        def get_distinct_paths(graph_of_paths):
-            cc = nx.connected_components(graph_of_paths)
-            for comp in cc:
-                if len(comp) > 1:
-                    endpoints = filter(lambda node: len(nxext.get_all_neighbors(graph_of_paths, node)) == 1, comp)
-                    assert len(endpoints) == 2
-                    yield nx.shortest_path(graph_of_paths, endpoints[0], endpoints[1])
-                else:
-                    yield list(comp)
-        
-        for path in get_distinct_paths(series_subgraph):
+        for path in chains:
             if len(path) < 2:
-                neighbors = hypergraph.neighbors(path[0])
+                neighbors = sorted(hypergraph.neighbors(path[0]))
                 yield ReducibleFeature(2, 1, path, neighbors)
             else:
                 source = path[0]
@@ -73,30 +103,72 @@ class ReducibleFeature(object):
     
     @staticmethod
     def extract_degree_3_features(hypergraph):
+        # the neighbors of the nodes do not change during the extraction, so
+        # their sets are computed once (the sets should not be modified)
+        neighbors_sets = {}
+        def get_neighbors_set(node):
+            if node not in neighbors_sets:
+                neighbors_sets[node] = set(hypergraph.neighbors_multiplicity[node])
+            return neighbors_sets[node]
+        
+        def get_cycle_length(nodes):
+            '''Get the length of the only cycle of the subgraph induced by the nodes.
+            :return The length or None if the subgraph does not have exactly one
+            independent cycle.
+            '''
+            adj = {node: get_neighbors_set(node) & nodes for node in nodes}
+            edges_count = sum(map(len, adj.itervalues())) / 2
+            components_count = 0
+            unvisited = set(nodes)
+            while unvisited:
+                components_count += 1
+                stack = [unvisited.pop()]
+                while stack:
+                    for neighbor in adj[stack.pop()]:
+                        if neighbor in unvisited:
+                            unvisited.remove(neighbor)
+                            stack.append(neighbor)
+            if edges_count - len(nodes) + components_count != 1:
+                return None
+            
+            # the cycle is what remains after removing the nodes of degree 1 repeatedly
+            degrees = {node: len(neighbors) for node, neighbors in adj.iteritems()}
+            leaves = filter(lambda node: degrees[node] < 2, nodes)
+            removed = set(leaves)
+            while leaves:
+                leaf = leaves.pop()
+                for neighbor in adj[leaf]:
+                    if neighbor not in removed:
+                        degrees[neighbor] -= 1
+                        if degrees[neighbor] < 2:
+                            removed.add(neighbor)
+                            leaves.append(neighbor)
+            return len(nodes) - len(removed)
+        
         def get_triangles(nodes_with_3_neighbors):
             def is_triangle(node_with_3_neighbors):
                 neighbors = node_with_3_neighbors[1]
                 for pair in combinations(neighbors, 2):
-                    if len(hypergraph.edges(pair[0], pair[1])) > 0:
+                    if pair[1] in get_neighbors_set(pair[0]):
                         return True
                 return False
             
             return map(lambda neighborhood: ([neighborhood[0]], neighborhood[1]), filter(is_triangle, nodes_with_3_neighbors))
         
         def get_buddies(nodes_with_3_neighbors):
-            already_checked = []
+            already_checked = set()
             for neighborhood in nodes_with_3_neighbors:
                 node = neighborhood[0]
                 if node not in already_checked:
                     neighbors = neighborhood[1]
-                    neighbors_of_neighbors = map(lambda neighbor: set(hypergraph.neighbors(neighbor)), neighbors)
+                    neighbors_of_neighbors = map(get_neighbors_set, neighbors)
                     common_neighbors = reduce(lambda set1, set2: set1 & set2, neighbors_of_neighbors)
                     
                     buddy_nodes = [node]
                     for potential_buddy_node in common_neighbors:
-                        if potential_buddy_node != node and filter(lambda neigh: neigh[0] == potential_buddy_node, nodes_with_3_neighbors):
+                        if potential_buddy_node != node and potential_buddy_node in neighborhoods:
                             buddy_nodes.append(potential_buddy_node)
-                            already_checked += buddy_nodes
+                            already_checked.update(buddy_nodes)
                     
                     if len(buddy_nodes) < 2:
                         continue
@@ -108,28 +180,27 @@ class ReducibleFeature(object):
         
         # TODO: We consider also hubs with degree larger than 3. Is this correct?
         def get_cubes(nodes_with_3_neighbors):
-            nodes_degree_3 = set(map(lambda neighborhood: neighborhood[0], nodes_with_3_neighbors))
-            already_checked_hubs = []
+            nodes_degree_3 = hypergraph.nodes_with_3_neighbors
+            already_checked_hubs = set()
             for neighborhood in nodes_with_3_neighbors:
                 neighbors = neighborhood[1]
-                neighbors_of_neighbors = {neighbor: set(hypergraph.neighbors(neighbor)) for neighbor in neighbors}
+                neighbors_of_neighbors = {neighbor: get_neighbors_set(neighbor) for neighbor in neighbors}
                 for neigh in neighbors_of_neighbors.items():
                     # TODO: not sure about this condition, the definition of a hub in the paper is unclear
-                    if neigh[1].intersection(nodes_degree_3) == neigh[1] and neigh[0] not in already_checked_hubs:
-                        already_checked_hubs.append(neigh[0])
+                    if neigh[1] <= nodes_degree_3 and neigh[0] not in already_checked_hubs:
+                        already_checked_hubs.add(neigh[0])
                         hub_periphery = neigh[1]
-                        neighbors_of_hub_neighbors = {node: set(hypergraph.neighbors(node)) - set([neigh[0]]) for node in hub_periphery}
+                        neighbors_of_hub_neighbors = {node: get_neighbors_set(node) - set([neigh[0]]) for node in hub_periphery}
                         
                         # the periphery should form a ring
                         cube_peripheral_nodes = set([])
                         for n in neighbors_of_hub_neighbors.items():
                             cube_peripheral_nodes = cube_peripheral_nodes.union(n[1])
                         hub_ring_periphery = hub_periphery.union(cube_peripheral_nodes)
-                        periphery_subgraph = nx.Graph(hypergraph.subgraph(hub_ring_periphery))
-                        cycle = nx.cycle_basis(periphery_subgraph)
-                        if len(cycle) != 1:
+                        cycle_length = get_cycle_length(hub_ring_periphery)
+                        if cycle_length is None:
                             continue
-                        elif len(cycle[0]) != len(hub_periphery) * 2:
+                        elif cycle_length != len(hub_periphery) * 2:
                             # the ring around the hub should be of alternating reducible and peripheral nodes
                             continue
                         
@@ -147,47 +218,50 @@ class ReducibleFeature(object):
                             yield neigh[1], cube_peripheral_nodes.union(set([neigh[0]]))
         
         def get_raw_conflicts_and_isolates(features):
-            def get_raw_conflict_and_isolates(features, all_reducibles, checked_features, initial_feature):
-                def recursion(conflict_nodes, conflict_periphery, features, all_reducibles, checked_features, feature_to_check, isolates):
-                    if feature_to_check in checked_features:
-                        return
-                     
-                    reducible_periphery = set(filter(lambda node: node in all_reducibles, feature_to_check[1]))
-                     
-                    if len(reducible_periphery) > 0:
-                        checked_features.append(feature_to_check)
-                        reducibles_set = set(feature_to_check[0])
-                        conflict_nodes |= reducibles_set
-                        conflict_periphery |= set(feature_to_check[1]) - reducible_periphery
-                     
-                        for node in reducible_periphery:
-                            for node_feature in features:
-                                if node in node_feature[0] and node_feature not in checked_features:
-                                    recursion(conflict_nodes, conflict_periphery, features, all_reducibles, checked_features, node_feature, isolates)
-                     
-                    else:
-                        isolates.append((feature_to_check[0], feature_to_check[1]))
-                     
-                    return
-                 
-                isolates = []
-                conflict_nodes = set()
-                conflict_periphery = set()
-                recursion(conflict_nodes, conflict_periphery, features, all_reducibles, checked_features, initial_feature, isolates)
-                return (conflict_nodes, conflict_periphery) if conflict_nodes else None, isolates
-             
-            all_reducibles = map(lambda feature: feature[0], features)
-            all_reducibles = set(itertools.chain(*all_reducibles))
-            checked_features = []
+            '''Group the features into raw conflicts. A feature conflicts with the
+            features whose reducible nodes are in its periphery, the features
+            without reducible nodes in the periphery are isolates. The groups are
+            collected by a depth-first search over an index from the reducible
+            nodes to the features, so each feature is expanded only once.
+            :param features: A list of tuples (reducible_nodes, peripheral_nodes).
+            :return A tuple (raw_conflicts, isolates), where raw_conflicts is a
+            list of tuples (conflict_nodes, conflict_periphery) of sets.
+            '''
+            features_of_node = {}
+            for i, feature in enumerate(features):
+                for node in feature[0]:
+                    features_of_node.setdefault(node, []).append(i)
+            reducible_peripheries = map(lambda feature: set(filter(lambda node: node in features_of_node, feature[1])), features)
+            
+            checked_features = set()
             isolates = []
             raw_conflicts = []
-             
-            for feature in features:
-                conflict_feature, new_isolates = get_raw_conflict_and_isolates(features, all_reducibles, checked_features, feature)
-                isolates += new_isolates
-                if conflict_feature:
-                    raw_conflicts.append(conflict_feature)
-                     
+            
+            for i in range(len(features)):
+                conflict_nodes = set()
+                conflict_periphery = set()
+                stack = [iter([i])]
+                while stack:
+                    for j in stack[-1]:
+                        if j in checked_features:
+                            continue
+                        feature = features[j]
+                        reducible_periphery = reducible_peripheries[j]
+                        if reducible_periphery:
+                            checked_features.add(j)
+                            conflict_nodes |= set(feature[0])
+                            conflict_periphery |= set(feature[1]) - reducible_periphery
+                            # continue with the features of the reducible peripheral nodes
+                            stack.append(itertools.chain(*map(lambda node: features_of_node[node], reducible_periphery)))
+                            break
+                        else:
+                            isolates.append((feature[0], feature[1]))
+                    else:
+                        stack.pop()
+                
+                if conflict_nodes:
+                    raw_conflicts.append((conflict_nodes, conflict_periphery))
+            
             return raw_conflicts, isolates
         
         def get_triangle_conflicts(triangles):
@@ -197,16 +271,18 @@ class ReducibleFeature(object):
                 
                 # Identify conflicts (and possible isolates)
                 for raw_conflict in raw_conflicts:
-                    conflict_subgraph = nx.Graph(hypergraph.subgraph(raw_conflict[0] | raw_conflict[1]))
-                    nodes_in_subgraph = conflict_subgraph.number_of_nodes()
+                    # the conflict is classified on the neighbors sets, the
+                    # subgraph is only built for the rules which search it
+                    conflict_nodes = raw_conflict[0] | raw_conflict[1]
+                    nodes_in_subgraph = len(conflict_nodes)
                     len_reducible = len(raw_conflict[0])
                     len_periphery = len(raw_conflict[1])
-    #                 NxExtensions.visualize_graph(conflict_subgraph)
                      
                     # Rule 5.1 - Diamonds (or isolates)
                     if nodes_in_subgraph == 4:
                         if len_periphery == 3:
-                            if conflict_subgraph.number_of_edges() >= 4:
+                            edges_in_subgraph = sum(len(get_neighbors_set(node) & conflict_nodes) for node in conflict_nodes) / 2
+                            if edges_in_subgraph >= 4:
                                 # Rule 4.1 (isolate triangle)
                                 isolates.append(ReducibleFeature(4, 1, raw_conflict[0], raw_conflict[1]))
                                 continue
@@ -214,7 +290,7 @@ class ReducibleFeature(object):
                                 sys.stderr.write("\n[ReducibleFeature] Unrecognized triangle conflict containing 1 reducible node and < 4 edges.")
                         elif len_periphery == 2:
                             periphery_list = list(raw_conflict[1])
-                            if not conflict_subgraph.has_edge(periphery_list[0], periphery_list[1]):
+                            if periphery_list[1] not in get_neighbors_set(periphery_list[0]):
                                 # Rule 5.1.2
                                 conflicts.append(ReducibleFeature(5, 1, raw_conflict[0], raw_conflict[1], subsubrule = 2))
                                 continue
@@ -222,9 +298,8 @@ class ReducibleFeature(object):
                         conflicts.append(ReducibleFeature(5, 1, raw_conflict[0], raw_conflict[1], subsubrule = 1))
                         continue
                      
-                    # reducible_subgraph = H (from rule 5.2 in the paper of A&P)
-                    reducible_subgraph = conflict_subgraph.subgraph(raw_conflict[0])
-                    reducible_degrees = set(reducible_subgraph.degree().values())
+                    # the degrees in H (from rule 5.2 in the paper of A&P), the subgraph induced by the reducible nodes
+                    reducible_degrees = set(len(get_neighbors_set(node) & raw_conflict[0]) for node in raw_conflict[0])
                      
                     if len(reducible_degrees) == 1:
                         reducible_degree = next(iter(reducible_degrees))
@@ -242,6 +317,7 @@ class ReducibleFeature(object):
                          
                         elif reducible_degree == 2:
                             # Rule 5.2.3
+                            conflict_subgraph = nx.Graph(hypergraph.subgraph(conflict_nodes))
                             t_edges = []
                             three_cliques = filter(lambda clique: len(clique) == 3, nx.find_cliques_recursive(conflict_subgraph))
                             subgraph_H = conflict_subgraph.subgraph(raw_conflict[0])
@@ -297,11 +373,12 @@ class ReducibleFeature(object):
                                 continue
                          
                         elif reducible_degree == 3:
-                            if reducible_subgraph.number_of_nodes() == 6 and reducible_subgraph.number_of_edges() == 9:
-                                # Rule 5.2.5 (Prism)
+                            if len_reducible == 6:
+                                # Rule 5.2.5 (Prism), H is 3-regular with 9 edges
                                 conflicts.append(ReducibleFeature(5, 2, raw_conflict[0], raw_conflict[1], subsubrule=5))
                                 continue
                             else:
+                                reducible_subgraph = nx.Graph(hypergraph.subgraph(conflict_nodes)).subgraph(raw_conflict[0])
                                 # TODO: The explanation in the paper for this case is not clear.
                                 # For now extract all possible square configurations from the reducible subgraph.
                                 # If there are no squares, the graph is regarded as having tree-width > 3.
@@ -344,10 +421,9 @@ class ReducibleFeature(object):
              
             # Identify conflicts
             for raw_conflict in raw_conflicts:
-                conflict_subgraph = nx.Graph(hypergraph.subgraph(raw_conflict[0] | raw_conflict[1]))
-                nodes_in_subgraph = conflict_subgraph.number_of_nodes()
+                # the reducible and the peripheral nodes are disjoint
+                nodes_in_subgraph = len(raw_conflict[0]) + len(raw_conflict[1])
                 len_periphery = len(raw_conflict[1])
-#                 NxExtensions.visualize_graph(conflict_subgraph)
                  
                 if nodes_in_subgraph == 6:
                     if len_periphery == 2:
@@ -374,10 +450,9 @@ class ReducibleFeature(object):
              
             # Identify conflicts
             for raw_conflict in raw_conflicts:
-                conflict_subgraph = nx.Graph(hypergraph.subgraph(raw_conflict[0] | raw_conflict[1]))
-                nodes_in_subgraph = conflict_subgraph.number_of_nodes()
+                # the reducible and the peripheral nodes are disjoint
+                nodes_in_subgraph = len(raw_conflict[0]) + len(raw_conflict[1])
                 len_periphery = len(raw_conflict[1])
-#                 NxExtensions.visualize_graph(conflict_subgraph)
                  
                 if nodes_in_subgraph == 8:
                     # Rule 7.1 - Cube
@@ -391,6 +466,7 @@ class ReducibleFeature(object):
                     # Rule 7.2 - Hammock (second version)
                     elif len_periphery == 1 and len(raw_conflict[0]) == 7:
                         # chose one of the neighbors of the peripheral node to create a Hammock
+                        conflict_subgraph = nx.Graph(hypergraph.subgraph(raw_conflict[0] | raw_conflict[1]))
                         peripheral_neighbor = set([conflict_subgraph.neighbors(list(raw_conflict[1])[0])[0]])
                         conflicts.append(ReducibleFeature(7, 2, raw_conflict[0] - peripheral_neighbor, raw_conflict[1] | peripheral_neighbor))
                         continue
@@ -405,6 +481,7 @@ class ReducibleFeature(object):
             assert len(neighbors) == 3
             return node, neighbors
         nodes_with_3_neighbors = map(get_node_with_3_neighbors, hypergraph.nodes_with_3_neighbors)
+        neighborhoods = dict(nodes_with_3_neighbors)
         
         triangles = get_triangles(nodes_with_3_neighbors)
         triangle_conflicts = get_triangle_conflicts(triangles)
@@ -446,24 +523,12 @@ class ReducibleFeature(object):
         
         if compute_string:
             reducibles_labels = map(lambda reducible: hypergraph.node[reducible]["labels"][0], reducibles)
-            possible_labels = []
-            
-            for perm in perms:
-                possible_label = {}
-                # TODO: we remove the reducible nodes from the direction of the new edge
-                # However, this causes a change in the positions in the permutation.
-                # How should this be handled?
-                possible_label["perm"] = tuple(filter(lambda node: node not in reducibles, perm))
-                possible_label["label"] = list(reducibles_labels)
-                for edge in reducible_edges:
-                    possible_label["label"].append(Hypergraph.edge_to_string(hypergraph, edge, perm))
-                possible_label["label"] = ",".join(sorted(possible_label["label"]))
-                possible_labels.append(possible_label)
-            
-            possible_labels = sorted(possible_labels, key=lambda element: element["label"])
-            minimal_label = possible_labels[0]["label"]
-            minimal_perm_indices = filter(lambda i: possible_labels[i]["label"] == minimal_label, range(len(possible_labels)))
-            direction = set([possible_labels[i]["perm"] for i in minimal_perm_indices])
+            counters = rule_stats.active_stats.permutation_counters() if rule_stats.active_stats else None
+            minimal_label, minimal_perms = permutation_search.minimal_label(hypergraph, reducible_edges, perms, reducibles_labels, counters=counters)
+            # TODO: we remove the reducible nodes from the direction of the new edge
+            # However, this causes a change in the positions in the permutation.
+            # How should this be handled?
+            direction = set([tuple(filter(lambda node: node not in reducibles, perm)) for perm in minimal_perms])
         else:
             direction = [] # TODO: an empty direction may cause problems
         
@@ -513,6 +578,11 @@ class ReducibleFeature(object):
         nodes = set(self.reducible_nodes) | set(self.peripheral_nodes)
         return hypergraph.subgraph_with_labels(nodes)
     
+    def as_view(self, hypergraph):
+        '''Get a read-only view of the feature in the hypergraph (see Hypergraph.view).
+        '''
+        return hypergraph.view(set(self.reducible_nodes) | set(self.peripheral_nodes))
+    
     def number_of_nodes(self):
         return len(self.reducible_nodes) + len(self.peripheral_nodes)
     
@@ -730,7 +800,7 @@ class ReducibleFeature(object):
                 # K4
                 if compute_string:
                     label_template = u"(5.1.1;{0})"
-                    perms = permutations(self.reducible_nodes | self.peripheral_nodes)
+                    perms = Permutations(self.reducible_nodes | self.peripheral_nodes)
                 else:
                     perms = None
                     label_template = None
@@ -760,7 +830,7 @@ class ReducibleFeature(object):
                 if compute_string:
                     label_template = u"(5.2.1;{0})"
                     # TODO: nothing is mentioned about the permutations?
-                    perms = permutations(self.reducible_nodes | self.peripheral_nodes)
+                    perms = Permutations(self.reducible_nodes | self.peripheral_nodes)
                 else:
                     perms = None
                     label_template = None
@@ -822,7 +892,7 @@ class ReducibleFeature(object):
                     if compute_string:
                         label_template = u"(5.2.3.3;{0})"
                         # TODO: nothing is mentioned about the permutations?
-                        perms = permutations(self.reducible_nodes | self.peripheral_nodes)
+                        perms = Permutations(self.reducible_nodes | self.peripheral_nodes)
                     else:
                         perms = None
                         label_template = None
@@ -841,7 +911,7 @@ class ReducibleFeature(object):
                         separator = (set(hypergraph.neighbors(reducibles[0])) | set(hypergraph.neighbors(reducibles[1]))) - comp
                         if compute_string:
                             # TODO: nothing is mentioned about the permutations?
-                            perms = permutations(comp | separator)
+                            perms = Permutations(comp | separator)
                         else:
                             perms = None
                         _new_edges = ReducibleFeature.degree_3_reduction(hypergraph, reducibles, separator, perms, label_template, compute_string)
@@ -864,7 +934,7 @@ class ReducibleFeature(object):
                 if compute_string:
                     label_template = u"(5.2.5;{0})"
                     # TODO: nothing is mentioned about the permutations?
-                    perms = permutations(self.reducible_nodes)
+                    perms = Permutations(self.reducible_nodes)
                 else:
                     perms = None
                     label_template = None
@@ -884,7 +954,7 @@ class ReducibleFeature(object):
             if compute_string:
                 label_template = u"(6.1;{0})"
                 # TODO: nothing is mentioned about the permutations?
-                perms = permutations(self.reducible_nodes | self.peripheral_nodes)
+                perms = Permutations(self.reducible_nodes | self.peripheral_nodes)
             else:
                 perms = None
                 label_template = None
@@ -919,7 +989,7 @@ class ReducibleFeature(object):
             if compute_string:
                 label_template = u"(7.1;{0})"
                 # TODO: nothing is mentioned about the permutations?
-                perms = permutations(self.reducible_nodes)
+                perms = Permutations(self.reducible_nodes)
             else:
                 perms = None
                 label_template = None
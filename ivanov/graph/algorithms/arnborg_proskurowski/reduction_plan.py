@@ -0,0 +1,91 @@
+'''
+Created on Mar 24, 2016
+
+@author: Ivan Ivanov
+
+The sequence of reductions performed by run_algorithm on a graph, which can be
+replayed on the same graph with other labels.
+'''
+
+class ReductionStep(object):
+    '''One iteration of the reduction loop of run_algorithm:
+    - edges_groups: the groups of parallel edges merged by rule 0.2;
+    - hedges_groups: the groups of parallel hyperedges merged by rule 3;
+    - features: the features reduced by rule 1, 2 or 4-7.
+    The groups are lists of edge ids.
+    '''
+    
+    def __repr__(self):
+        return "ReductionStep({0}, {1}, {2})".format(self.edges_groups, self.hedges_groups, self.features)
+    
+    def __init__(self):
+        self.edges_groups = []
+        self.hedges_groups = []
+        self.features = []
+
+class ReductionPlan(object):
+    '''Records which rules were applied on which nodes and edges during the
+    reduction of a graph. The choice of the reducible features and of the groups
+    of parallel edges depends only on the structure of the graph, while the
+    labels only determine the strings and the directions of the new edges.
+    Thus the plan can be replayed on a graph with the same structure (the same
+    node and edge ids) but other labels, e.g. the graphs of successive
+    Weisfeiler-Lehman iterations, and only the labels are recomputed (see the
+    parameter plan of run_algorithm).
+    
+    Note that the plan is recorded with compute_string=True, since rule 3 is
+    skipped otherwise.
+    '''
+    
+    @staticmethod
+    def get_structure(hypergraph):
+        '''The incidence structure of a hypergraph: its nodes and the edge ids
+        for each set of endpoints.
+        '''
+        edges = {key: frozenset(edge_ids) for key, edge_ids in hypergraph.endpoints_index.iteritems() if edge_ids}
+        return frozenset(hypergraph.nodes_iter()), edges
+    
+    def start(self, hypergraph):
+        '''Start recording the reduction of a hypergraph (any recorded steps are discarded).'''
+        self.structure = ReductionPlan.get_structure(hypergraph)
+        self.steps = []
+        self.treewidth = None
+        self.canonical_string = None
+    
+    def add_step(self):
+        step = ReductionStep()
+        self.steps.append(step)
+        return step
+    
+    def finish(self, treewidth, canonical_string=None):
+        '''Finish the recording.
+        :param treewidth: The tree-width of the graph.
+        :param canonical_string: (optional) The canonical string if it does not
+        depend on the labels (e.g. u"Tree-width > 3"). None means that the
+        string is collected from the labels of the reduced graph.
+        '''
+        self.treewidth = treewidth
+        self.canonical_string = canonical_string
+    
+    def is_recorded(self):
+        return self.treewidth is not None
+    
+    def matches(self, hypergraph):
+        '''Check whether the plan was recorded on a hypergraph with the same structure.'''
+        return self.is_recorded() and self.structure == ReductionPlan.get_structure(hypergraph)
+    
+    def get_features(self):
+        '''Get the reduced features in the order of their reduction.'''
+        return [feature for step in self.steps for feature in step.features]
+    
+    def __len__(self):
+        return len(self.steps)
+    
+    def __repr__(self):
+        return "ReductionPlan(treewidth={0}, steps={1})".format(self.treewidth, len(self.steps))
+    
+    def __init__(self):
+        self.structure = None
+        self.steps = []
+        self.treewidth = None
+        self.canonical_string = None
@@ -0,0 +1,96 @@
+'''
+Created on Mar 23, 2016
+
+@author: Ivan Ivanov
+
+Statistics of the reduction rules applied by run_algorithm.
+'''
+
+import json
+
+class RuleStats(object):
+    '''Collects, over many calls of run_algorithm, how often each rule was
+    applied and how much time it took:
+    - "runs": the number of calls of run_algorithm;
+    - "iterations": the number of iterations of the reduction loop;
+    - "rules": for each rule function ("0", "1", "2", "3", "4-7") the number
+    of calls, the number of calls which modified the graph and the wall time
+    in seconds (including the extraction of the features);
+    - "features": for each full rule of a reduced feature (e.g. "5.2.3.1") the
+    number of reduced features and the wall time of their reduction;
+    - "permutations": the number of permutations which were labeled and the
+    number of branches which were pruned in degree_3_reduction;
+    - "treewidths": the number of graphs per result tree-width;
+    - "final_size": the total number of nodes and edges left after the reduction.
+    '''
+    
+    def add_run(self, treewidth, nodes, edges):
+        self.stats["runs"] += 1
+        treewidths = self.stats["treewidths"]
+        treewidths[str(treewidth)] = treewidths.get(str(treewidth), 0) + 1
+        self.stats["final_size"]["nodes"] += nodes
+        self.stats["final_size"]["edges"] += edges
+    
+    def add_iteration(self):
+        self.stats["iterations"] += 1
+    
+    def add_rule(self, rule, time, modified):
+        '''Record a call of a rule function.
+        :param rule: The name of the rule function ("0", "1", "2", "3" or "4-7").
+        :param time: The wall time of the call in seconds.
+        :param modified: True if the graph was modified.
+        '''
+        rule_stats = self.stats["rules"].setdefault(rule, {"calls": 0, "modified": 0, "time": 0.})
+        rule_stats["calls"] += 1
+        rule_stats["modified"] += 1 if modified else 0
+        rule_stats["time"] += time
+    
+    def add_feature(self, full_rule, time):
+        '''Record the reduction of a feature.
+        :param full_rule: See ReducibleFeature.get_full_rule.
+        :param time: The wall time of the reduction in seconds.
+        '''
+        feature_stats = self.stats["features"].setdefault(full_rule, {"count": 0, "time": 0.})
+        feature_stats["count"] += 1
+        feature_stats["time"] += time
+    
+    def permutation_counters(self):
+        '''The counters passed to permutation_search.minimal_label.'''
+        return self.stats["permutations"]
+    
+    def merge(self, other):
+        '''Add the statistics of another RuleStats (e.g. of another process).'''
+        def merge_dict(target, source):
+            for key, value in source.iteritems():
+                if type(value) is dict:
+                    merge_dict(target.setdefault(key, {}), value)
+                else:
+                    target[key] = target.get(key, 0) + value
+        merge_dict(self.stats, other.stats)
+    
+    def to_dict(self):
+        return json.loads(self.to_json())
+    
+    def to_json(self, indent=None):
+        return json.dumps(self.stats, indent=indent, sort_keys=True)
+    
+    def save_json(self, out_file):
+        with open(out_file, "w") as fp:
+            fp.write(self.to_json(indent=4))
+    
+    def __repr__(self):
+        return "RuleStats({0})".format(self.to_json())
+    
+    def __init__(self):
+        self.stats = {
+            "runs": 0,
+            "iterations": 0,
+            "rules": {},
+            "features": {},
+            "permutations": {"labeled": 0, "pruned": 0},
+            "treewidths": {},
+            "final_size": {"nodes": 0, "edges": 0}
+        }
+
+# the statistics collected by run_algorithm (None if disabled, see arnborg_proskurowski.enable_stats)
+active_stats = None
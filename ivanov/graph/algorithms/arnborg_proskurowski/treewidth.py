@@ -0,0 +1,250 @@
+'''
+Created on Mar 21, 2016
+
+@author: Ivan Ivanov
+
+Computation of the tree-width (up to 3) only, without labels and canonical
+strings. The graph is converted to plain integer adjacency sets and reduced by
+the rules of Arnborg & Proskurowski for partial 3-trees (islet, twig, series,
+triangle, buddy and cube). Vertices of lower degree are reduced first, so the
+highest rule which was needed gives the tree-width.
+'''
+
+from ivanov.graph.hypergraph import Hypergraph, HypergraphView
+from itertools import combinations
+
+def to_adjacency(graph):
+    '''Convert a graph to undirected adjacency sets of integers (without self-loops).
+    :param graph: A NetworkX graph, a Hypergraph or a HypergraphView.
+    :return A list of sets, one per node.
+    '''
+    nodes = list(graph.nodes_iter())
+    node_ids = {node: i for i, node in enumerate(nodes)}
+    adj = [set() for _ in nodes]
+    
+    if type(graph) in [Hypergraph, HypergraphView]:
+        for node in nodes:
+            adj[node_ids[node]].update(node_ids[neighbor] for neighbor in graph.neighbors(node))
+    else:
+        for u, v in graph.edges_iter():
+            adj[node_ids[u]].add(node_ids[v])
+            adj[node_ids[v]].add(node_ids[u])
+    
+    for i, neighbors in enumerate(adj):
+        neighbors.discard(i)
+    
+    return adj
+
+def reduce_adjacency(adj):
+    '''Reduce a graph given as adjacency sets. The sets are modified.
+    :param adj: A list (or dictionary) of adjacency sets of integers without self-loops.
+    :return The tree-width (0 to 3) or -1 if it is greater than 3.
+    '''
+    if type(adj) is list:
+        adj = dict(enumerate(adj))
+    # vertices by degree, only degrees up to 3 can be reduced
+    low = [set(), set(), set(), set()]
+    for v, neighbors in adj.iteritems():
+        if len(neighbors) <= 3:
+            low[len(neighbors)].add(v)
+    
+    def update_degree(v, old_degree):
+        if old_degree <= 3:
+            low[old_degree].discard(v)
+        if len(adj[v]) <= 3:
+            low[len(adj[v])].add(v)
+    
+    def remove_vertex(v):
+        if len(adj[v]) <= 3:
+            low[len(adj[v])].discard(v)
+        for u in adj.pop(v):
+            adj[u].remove(v)
+            update_degree(u, len(adj[u]) + 1)
+    
+    def make_clique(vertices):
+        for u, w in combinations(vertices, 2):
+            if w not in adj[u]:
+                degree_u = len(adj[u])
+                degree_w = len(adj[w])
+                adj[u].add(w)
+                adj[w].add(u)
+                update_degree(u, degree_u)
+                update_degree(w, degree_w)
+    
+    def find_buddy(v):
+        for u in adj[v]:
+            for w in adj[u]:
+                if w != v and len(adj[w]) == 3 and adj[w] == adj[v]:
+                    return w
+        return None
+    
+    def find_cube(v):
+        '''Find degree-3 vertices w and x, such that N(v) = {a, b, d},
+        N(w) = {a, c, d} and N(x) = {b, c, d}.
+        '''
+        for d in adj[v]:
+            a, b = [u for u in adj[v] if u != d]
+            for _ in range(2):
+                for w in adj[d]:
+                    if w == v or len(adj[w]) != 3 or a not in adj[w]:
+                        continue
+                    c = [u for u in adj[w] if u != a and u != d][0]
+                    if c == b:
+                        continue
+                    for x in adj[d]:
+                        if x != v and x != w and adj[x] == set([b, c, d]):
+                            return w, x, [a, b, c, d]
+                a, b = b, a
+        return None
+    
+    def reduce_degree_3():
+        for v in list(low[3]):
+            a, b, c = adj[v]
+            if b in adj[a] or c in adj[a] or c in adj[b]:
+                # triangle
+                remove_vertex(v)
+                make_clique([a, b, c])
+                return True
+            w = find_buddy(v)
+            if w is not None:
+                remove_vertex(v)
+                remove_vertex(w)
+                make_clique([a, b, c])
+                return True
+            cube = find_cube(v)
+            if cube is not None:
+                w, x, clique = cube
+                remove_vertex(v)
+                remove_vertex(w)
+                remove_vertex(x)
+                make_clique(clique)
+                return True
+        return False
+    
+    treewidth = 0
+    while adj:
+        if low[0]:
+            v = low[0].pop()
+            del adj[v]
+        elif low[1]:
+            treewidth = max(treewidth, 1)
+            remove_vertex(iter(low[1]).next())
+        elif low[2]:
+            treewidth = max(treewidth, 2)
+            v = iter(low[2]).next()
+            a, b = adj[v]
+            remove_vertex(v)
+            make_clique([a, b])
+        elif low[3] and reduce_degree_3():
+            treewidth = 3
+        else:
+            # all vertices have degree > 3 or no rule is applicable
+            return -1
+    
+    return treewidth
+
+def _pop_min_degree(buckets, min_degree):
+    while not buckets[min_degree]:
+        min_degree += 1
+    return buckets[min_degree].pop(), min_degree
+
+def get_degeneracy(adj, limit=None):
+    '''Compute the degeneracy of a graph (the maximal k such that its k-core is
+    not empty) by removing vertices of minimal degree. It is a lower bound for
+    the tree-width.
+    :param adj: A list (or dictionary) of adjacency sets (not modified).
+    :param limit: (optional) Stop as soon as the degeneracy reaches the limit.
+    :return The degeneracy (or a value >= limit).
+    '''
+    if type(adj) is list:
+        adj = dict(enumerate(adj))
+    degrees = {v: len(neighbors) for v, neighbors in adj.iteritems()}
+    buckets = [set() for _ in range(max(degrees.values() + [0]) + 1)]
+    for v, degree in degrees.iteritems():
+        buckets[degree].add(v)
+    
+    degeneracy = 0
+    min_degree = 0
+    for _ in range(len(adj)):
+        v, min_degree = _pop_min_degree(buckets, min_degree)
+        degeneracy = max(degeneracy, min_degree)
+        if limit is not None and degeneracy >= limit:
+            break
+        del degrees[v]
+        for u in adj[v]:
+            if u in degrees:
+                buckets[degrees[u]].remove(u)
+                degrees[u] -= 1
+                buckets[degrees[u]].add(u)
+        min_degree = max(min_degree - 1, 0)
+    
+    return degeneracy
+
+def get_contraction_degeneracy(adj, limit=None):
+    '''Compute the MMD+ (min-d) lower bound for the tree-width: repeatedly
+    contract a vertex of minimal degree into its neighbor of minimal degree.
+    The maximal of the minimal degrees is the minimal degree of a minor of the
+    graph, which is at most the tree-width.
+    :param adj: A list (or dictionary) of adjacency sets (not modified).
+    :param limit: (optional) Stop as soon as the bound reaches the limit.
+    :return The lower bound (or a value >= limit).
+    '''
+    if type(adj) is list:
+        adj = dict(enumerate(adj))
+    adj = {v: set(neighbors) for v, neighbors in adj.iteritems()}
+    buckets = [set() for _ in range(len(adj) + 1)]
+    for v, neighbors in adj.iteritems():
+        buckets[len(neighbors)].add(v)
+    
+    bound = 0
+    min_degree = 0
+    while adj:
+        v, min_degree = _pop_min_degree(buckets, min_degree)
+        bound = max(bound, min_degree)
+        if limit is not None and bound >= limit:
+            break
+        neighbors = adj.pop(v)
+        if not neighbors:
+            continue
+        u = min(neighbors, key=lambda w: (len(adj[w]), w))
+        old_degrees = {w: len(adj[w]) for w in neighbors}
+        for w in neighbors:
+            adj[w].remove(v)
+            if w != u:
+                adj[w].add(u)
+                adj[u].add(w)
+        for w in neighbors:
+            buckets[old_degrees[w]].remove(w)
+            buckets[len(adj[w])].add(w)
+            min_degree = min(min_degree, len(adj[w]))
+    
+    return bound
+
+def get_lower_bound(graph, limit=4):
+    '''A cheap lower bound for the tree-width of a graph: its degeneracy (the
+    k-core check) and, if it is below the limit, the MMD+ bound.
+    :param graph: A NetworkX graph, a Hypergraph or a HypergraphView.
+    :param limit: (default 4) Stop as soon as the bound reaches the limit.
+    :return The lower bound (or a value >= limit).
+    '''
+    adj = to_adjacency(graph)
+    bound = get_degeneracy(adj, limit)
+    if limit is None or bound < limit:
+        bound = max(bound, get_contraction_degeneracy(adj, limit))
+    return bound
+
+def get_treewidth(graph):
+    '''Compute the tree-width of a graph, if it is at most 3. The result is the
+    same as arnborg_proskurowski.get_treewidth, but only the structure of the
+    graph is processed.
+    :param graph: A NetworkX graph, a Hypergraph or a HypergraphView.
+    :return The tree-width (0 to 3) or -1 if it is greater than 3.
+    '''
+    return reduce_adjacency(to_adjacency(graph))
+
+def get_treewidths(graphs):
+    '''Compute the tree-widths of many graphs (see get_treewidth).
+    :param graphs: An iterable of graphs.
+    :return A list of tree-widths.
+    '''
+    return [get_treewidth(graph) for graph in graphs]
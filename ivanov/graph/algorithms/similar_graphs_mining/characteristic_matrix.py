@@ -6,6 +6,7 @@ Created on Jan 13, 2016
 from ivanov.graph.algorithms.similar_graphs_mining import feature_extraction,\
     shingle_extraction, fingerprint
 from ivanov.inout.serializable import Serializable
+from ivanov import memory
 import numpy as np
 import itertools
 
@@ -119,6 +120,18 @@ class CharacteristicMatrix(Serializable):
     def __getitem__(self, key):
         return self.sparse_matrix[key]
     
+    def memory_report(self):
+        '''Estimate the memory used by the parts of the matrix (see memory.deep_sizeof).
+        :return A dictionary mapping the component names to their sizes in bytes and "total" to the sum.
+        '''
+        components = [
+            ("sparse_matrix", [self.sparse_matrix]),
+            ("target_values", [getattr(self, "target_values", None)]),
+            ("wl_state", [getattr(self, "wl_state", None)]),
+            ("other", [self])
+        ]
+        return memory.components_report(components)
+    
     def __eq__(self, other):
         if isinstance(other, CharacteristicMatrix):
             return self.sparse_matrix == other.sparse_matrix
@@ -48,6 +48,7 @@ def process_raw_feature(raw_feature, hypergraph, max_nodes=6):
     :param max_nodes: (default value 6) A number of nodes that a pattern or a dynamic feature can
     have before being disassembled in subfeatures of size max_nodes.
     :return A collection containing one or more features depending on the type of the raw feature.
+    The features are read-only views of the hypergraph (see Hypergraph.view).
     '''
     assert type(raw_feature) is ReducibleFeature
     assert type(hypergraph) is Hypergraph
@@ -88,13 +89,13 @@ def process_raw_feature(raw_feature, hypergraph, max_nodes=6):
                 t = raw_feature.peripheral_nodes[1]
                 path = [s] + raw_feature.reducible_nodes + [t]
                 for subpath in sliding_window(path, max_nodes):
-                    yield hypergraph.subgraph_with_labels(set(subpath))
+                    yield hypergraph.view(set(subpath))
                 raise StopIteration
             elif rule == "2.2.0.0":
                 # ring: extract all subpaths of length max_nodes using a sliding window
                 cycle = raw_feature.peripheral_nodes + raw_feature.reducible_nodes
                 for subpath in sliding_window(cycle + cycle[:max_nodes - 1], max_nodes):
-                    yield hypergraph.subgraph_with_labels(set(subpath))
+                    yield hypergraph.view(set(subpath))
                 raise StopIteration
             elif rule == "4.2.0.0":
                 # buddy: If there are more than 3 buddies create a buddy
@@ -102,7 +103,7 @@ def process_raw_feature(raw_feature, hypergraph, max_nodes=6):
                 assert len(raw_feature.peripheral_nodes) == 3
                 buddy_nodes = raw_feature.reducible_nodes
                 for buddy_nodes_subgroup in itertools.combinations(buddy_nodes, max_nodes - 3):
-                    yield hypergraph.subgraph_with_labels(set(buddy_nodes_subgroup) | set(raw_feature.peripheral_nodes))
+                    yield hypergraph.view(set(buddy_nodes_subgroup) | set(raw_feature.peripheral_nodes))
                 raise StopIteration
             elif rule == "4.3.0.0":
                 # cube: similar approach as for wheel (5.2.3.1)
@@ -114,7 +115,7 @@ def process_raw_feature(raw_feature, hypergraph, max_nodes=6):
                     if len(ring) > 0:
                         ring = ring[0]
                         for subpath in sliding_window(ring + ring[:max_nodes - 1], max_nodes):
-                            yield hypergraph.subgraph_with_labels(set(subpath) | hub_node)
+                            yield hypergraph.view(set(subpath) | hub_node)
                         raise StopIteration
                     else:
                         # if there is no ring in the feature, treat it as a fixed feature
@@ -128,7 +129,7 @@ def process_raw_feature(raw_feature, hypergraph, max_nodes=6):
                     if len(ring) > 0:
                         ring = ring[0]
                         for subpath in sliding_window(ring + ring[:max_nodes - 1], max_nodes):
-                            yield hypergraph.subgraph_with_labels(set(subpath) | set(raw_feature.peripheral_nodes))
+                            yield hypergraph.view(set(subpath) | set(raw_feature.peripheral_nodes))
                         raise StopIteration
                     else:
                         # if there is no ring in the feature, treat it as a fixed feature
@@ -146,11 +147,11 @@ def process_raw_feature(raw_feature, hypergraph, max_nodes=6):
             neighbors = {node: nxext.get_all_neighbors(feature_graph, node) for node in nodes}
             for u, v in adj_nodes:
                 node_subgroup = set([u, v] + neighbors[u] + neighbors[v])
-                yield hypergraph.subgraph_with_labels(set(node_subgroup))
+                yield hypergraph.view(node_subgroup)
             raise StopIteration
     
     # fixed or pattern/dynamic with <= max_nodes number of nodes
-    yield raw_feature.as_subgraph(hypergraph)
+    yield raw_feature.as_view(hypergraph)
 
 def get_feature_lists(graph_database, wl_iterations=0, iterator=True, accumulate_wl_shingles=True):
     def get_features_lists_generator():
@@ -5,13 +5,14 @@ Created on Dec 30, 2015
 '''
 
 from ivanov.graph.algorithms import arnborg_proskurowski, weisfeiler_lehman
+from ivanov.graph.hypergraph import HypergraphView
 from ivanov.graph import nxext
 import networkx as nx
 
 def extract_shingles(feature):
     '''Extracts (naively) all shingles contained in a feature (a shingle is created for each
     possible way to remove multiple colors per node and parallel edges).
-    :param feature: A Networkx graph.
+    :param feature: A Networkx graph or a HypergraphView.
     :return A generator of shingles.
     '''
     def estimate_number_of_shingles(parallel_edge_free_features_count, nodes_colors):
@@ -27,7 +28,7 @@ def extract_shingles(feature):
             through all adjacent pairs of nodes.
             '''
             u, v = all_adj_nodes[i]
-            edges = nxext.get_edge_labels_and_dirs(feature, u, v)
+            edges = get_edge_labels_and_dirs(u, v)
             edges_count = len(edges)
             for j, edge in enumerate(edges):
                 if j < edges_count - 1:
@@ -47,9 +48,9 @@ def extract_shingles(feature):
                 else:
                     yield _new_feature
         
-        all_adj_nodes = list(nxext.get_all_adjacent_nodes(feature))
+        all_adj_nodes = list(get_adj_nodes())
         if len(all_adj_nodes) == 0:
-            return [feature]
+            return [feature.materialize() if is_view else feature]
         else:
             new_feature = nx.MultiDiGraph()
             new_feature.add_nodes_from(feature.nodes_iter(data=True))
@@ -78,6 +79,14 @@ def extract_shingles(feature):
         shingle = arnborg_proskurowski.get_canonical_representation(shingle_graph)
         return shingle
     
+    is_view = type(feature) is HypergraphView
+    if is_view:
+        get_adj_nodes = feature.get_adj_nodes
+        get_edge_labels_and_dirs = feature.get_edge_labels_and_dirs
+    else:
+        get_adj_nodes = lambda: nxext.get_all_adjacent_nodes(feature)
+        get_edge_labels_and_dirs = lambda u, v: nxext.get_edge_labels_and_dirs(feature, u, v)
+    
     nodes_colors = {node: feature.node[node]["labels"] for node in feature.nodes_iter()}
     colorings = get_all_colorings(nodes_colors)
     parallel_edge_free_features = list(get_all_parallel_edge_free_groupings())
@@ -117,6 +126,9 @@ def extract_w_shingles_for_each_wl_iter(hypergraph, wl_iterations=0, wl_state=No
         yield i, new_shingles, wl_state
 
 def extract_canon_repr_for_each_wl_iter(hypergraph, wl_iterations=0, wl_state=None, accumulate_wl_results=True):
+    # the WL iterations change only the labels, so the reduction is recorded
+    # once and replayed for the other iterations
+    plan = arnborg_proskurowski.ReductionPlan()
     for i in range(wl_iterations + 1):
         if i == 1:
             hypergraph, wl_state = weisfeiler_lehman.init(hypergraph, wl_state)
@@ -125,7 +137,7 @@ def extract_canon_repr_for_each_wl_iter(hypergraph, wl_iterations=0, wl_state=No
             hypergraph, wl_state = weisfeiler_lehman.iterate(hypergraph, wl_state, i)
         
         if i == wl_iterations or accumulate_wl_results:
-            canon_str = arnborg_proskurowski.get_canonical_representation(hypergraph)
+            canon_str = arnborg_proskurowski.get_canonical_representation(hypergraph, plan)
             if canon_str == u"Tree-width > 3":
                 # TODO: How to handle graphs with larger tree-width?
                 # for now ignore the graph
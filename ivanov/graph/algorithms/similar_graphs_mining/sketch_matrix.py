@@ -7,6 +7,7 @@ Created on Dec 21, 2015
 from ivanov.graph.algorithms.similar_graphs_mining.characteristic_matrix import CharacteristicMatrix
 from ivanov.graph.algorithms.similar_graphs_mining.min_hash_function import MinHashFunction
 from ivanov.inout.serializable import Serializable
+from ivanov import memory
 import numpy as np
 
 class SketchMatrix(Serializable):
@@ -97,6 +98,17 @@ class SketchMatrix(Serializable):
 #                     if h_of_i < self.matrix[l, j]:
 #                         self.matrix[l, j] = h_of_i
         
+    def memory_report(self):
+        '''Estimate the memory used by the parts of the sketch matrix (see memory.deep_sizeof).
+        :return A dictionary mapping the component names to their sizes in bytes and "total" to the sum.
+        '''
+        components = [
+            ("matrix", [self.matrix]),
+            ("hash_functions", [getattr(self, "hash_functions", None)]),
+            ("other", [self])
+        ]
+        return memory.components_report(components)
+    
     def __repr__(self):
         return str(self.matrix)
 
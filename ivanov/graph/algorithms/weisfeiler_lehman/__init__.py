@@ -7,8 +7,10 @@ Created on Oct 5, 2015
 import networkx as nx
 from ivanov.graph import nxext
 from ivanov.graph.hypergraph import Hypergraph
+from ivanov.graph.label_vocabulary import default_vocabulary
+from ivanov import memory
 
-def iterate(graph, wl_state, iteration, test_mode=False):
+def iterate(graph, wl_state, iteration, test_mode=False, vocabulary=None):
     '''Performs one iteration of the Weisfeiler-Lehman algorithm.
     :param graph: A Networkx graph or a Hypergraph
     :param wl_state: A dictionary containing 2 sub-dictionaries:
@@ -17,6 +19,8 @@ def iterate(graph, wl_state, iteration, test_mode=False):
     corresponding WL short unique labels; "next_labels" contains the next label
     number for each WL iteration.
     :param iteration: The current iteration number.
+    :param vocabulary: (optional) The LabelVocabulary to intern the new labels
+    in, by default default_vocabulary.
     :return A tuple of the form (new_graph, new_labels_list), where
     new_graph is the resulting graph from the iteration, new_labels_list
     is the new list of labels for the current iteration of the algorithm.
@@ -46,18 +50,19 @@ def iterate(graph, wl_state, iteration, test_mode=False):
                     n = u
                     e = v
                     k = 1
-                dir_perms = graph.node[e]["direction"]
-                dir_perm_0 = next(iter(dir_perms))
-                if len(dir_perm_0) > 2:
+                endpoints = graph.node[e]["endpoints"]
+                dir_mask = graph.node[e]["dir_mask"]
+                if len(endpoints) > 2:
                     raise Exception("Weisfeiler-Lehman is not implemented for hypergraphs with edges of order > 2.")
-                if len(dir_perms) != 1:
+                if n not in endpoints:
+                    raise Exception("Strange direction encoding of an edge. Are {0} and {1} connected?".format(u, v))
+                if dir_mask & (dir_mask - 1):
+                    # more than one permutation is allowed
                     res = 0
-                elif dir_perm_0.index(n) == 0:
+                elif len(endpoints) == 1 or graph.is_source(e, n):
                     res = k
-                elif dir_perm_0.index(n) == 1:
-                    res = -k
                 else:
-                    raise Exception("Strange direction encoding of an edge. Are {0} and {1} connected?".format(u, v))
+                    res = -k
             return "out" if res > 0 else "in" if res < 0 else "any"
         
         node_label = graph.node[node]["labels"][0]
@@ -77,7 +82,13 @@ def iterate(graph, wl_state, iteration, test_mode=False):
         
         return "{0};{1}".format(node_label, label_extension)
     
+    if vocabulary is None:
+        vocabulary = default_vocabulary
+    
     new_graph = graph.copy()
+    if type(new_graph) is Hypergraph:
+        # the labels are replaced in place
+        new_graph.unshare_attributes()
     
     if iteration not in wl_state["next_labels"]:
         wl_state["next_labels"][iteration] = 0
@@ -94,13 +105,13 @@ def iterate(graph, wl_state, iteration, test_mode=False):
             neighbors = graph.bipartite_graph.neighbors(node)
         new_node_label = get_new_label(node, neighbors)
         if new_node_label not in wl_state["labels"]:
-                wl_state["labels"][new_node_label] = "wl_{0}.{1}".format(iteration, wl_state["next_labels"][iteration])
+                wl_state["labels"][new_node_label] = vocabulary.intern("wl_{0}.{1}".format(iteration, wl_state["next_labels"][iteration]))
                 wl_state["next_labels"][iteration] += 1
         new_graph.node[node]["labels"] = [wl_state["labels"][new_node_label]]
     
     return new_graph, wl_state
     
-def init(graph, wl_state=None, test_mode=False):
+def init(graph, wl_state=None, test_mode=False, vocabulary=None):
     '''Initialize the graph for performing Weisfeiler-Lehman algorithm.
     :param graph: Can be a Networkx graph or a Hypergraph.
     :param wl_state: Optional. A dictionary containing 2 sub-dictionaries:
@@ -108,7 +119,12 @@ def init(graph, wl_state=None, test_mode=False):
     labels generated during the Weisfeiler & Lehman iterations to their
     corresponding WL short unique labels; "next_labels" contains the next label
     number for each WL iteration.
+    :param vocabulary: (optional) The LabelVocabulary to intern the new labels
+    in, by default default_vocabulary.
     '''
+    if vocabulary is None:
+        vocabulary = default_vocabulary
+    
     def init_labels(_graph):
         for node in _graph.node:
             if "labels" not in _graph.node[node]:
@@ -122,6 +138,9 @@ def init(graph, wl_state=None, test_mode=False):
                 _graph.node[node]["labels"] = [joined]
     
     new_graph = graph.copy()
+    if type(new_graph) is Hypergraph:
+        # the labels are replaced in place
+        new_graph.unshare_attributes()
     init_labels(new_graph)
     
     if wl_state is None:
@@ -138,7 +157,7 @@ def init(graph, wl_state=None, test_mode=False):
     for node in nodes:
         node_label = new_graph.node[node]["labels"][0]
         if node_label not in wl_state["labels"]:
-            wl_state["labels"][node_label] = "wl_0.{0}".format(wl_state["next_labels"][0])
+            wl_state["labels"][node_label] = vocabulary.intern("wl_0.{0}".format(wl_state["next_labels"][0]))
             wl_state["next_labels"][0] += 1
         new_graph.node[node]["labels"] = [wl_state["labels"][node_label]]
     
@@ -180,3 +199,10 @@ def is_stable(graph, new_graph, iteration=0):
         is_stable = True
     
     return is_stable
+
+def memory_report(wl_state):
+    '''Estimate the memory used by a wl_state (see memory.deep_sizeof).
+    :return A dictionary mapping the keys of the wl_state ("labels" and
+    "next_labels") to their sizes in bytes and "total" to the whole size.
+    '''
+    return memory.dict_report(wl_state)
@@ -0,0 +1,677 @@
+'''
+Created on Mar 7, 2016
+
+@author: Ivan Ivanov
+
+Represents a hypergraph with hyperedges of order at most 3 using integer
+ID's and flat incidence arrays instead of a networkx bipartite graph.
+'''
+
+from itertools import combinations
+from ivanov.inout.serializable import Serializable
+from ivanov.graph.hypergraph import Hypergraph, DIRECTION_FLAGS, PAIR_DIRECTIONS
+from ivanov.graph.label_vocabulary import LabelVocabulary
+from ivanov.graph import nxext, node_ordering
+from ivanov import memory
+import networkx as nx
+import numpy as np
+import array
+import os
+
+# version of the binary format written by CompactHypergraph.save_to_binary
+BINARY_FORMAT_VERSION = 1
+
+# dtype of the edge pointers (array.array "l")
+EDGE_PTR_DTYPE = np.dtype("i{0}".format(array.array("l").itemsize))
+
+# the arrays of the binary format: (attribute, typecode of the in-memory array
+# or None for a bytearray, numpy dtype)
+BINARY_ARRAYS = [
+    ("_node_flags", None, np.uint8),
+    ("_node_label", "i", np.int32),
+    ("_edge_ptr", "l", EDGE_PTR_DTYPE),
+    ("_edge_nodes", "i", np.int32),
+    ("_edge_labels", "i", np.int32),
+    ("_edge_dirs", "B", np.uint8),
+    ("_edge_flags", None, np.uint8)
+]
+
+def _as_numpy(values, dtype):
+    '''Get an array.array, a bytearray or a numpy array as a numpy array (without copying if possible).
+    '''
+    if isinstance(values, np.ndarray):
+        return values.astype(dtype, copy=False)
+    elif len(values) == 0:
+        return np.zeros(0, dtype=dtype)
+    else:
+        return np.frombuffer(values, dtype=dtype)
+
+def _to_array(values, typecode, dtype):
+    '''Copy a numpy array to a (writable) array.array or bytearray.
+    '''
+    data = np.ascontiguousarray(values, dtype=dtype).tostring()
+    if typecode is None:
+        return bytearray(data)
+    else:
+        result = array.array(typecode)
+        result.fromstring(data)
+        return result
+
+def _load_npy(file_name, mmap):
+    if mmap:
+        try:
+            return np.load(file_name, mmap_mode="r")
+        except ValueError:
+            # empty arrays cannot be memory-mapped
+            return np.load(file_name)
+    else:
+        return np.load(file_name)
+
+class NodeAttributesView(object):
+    '''A read-only mapping from the nodes of a CompactHypergraph to attribute
+    dictionaries of the same form as Hypergraph.node.
+    '''
+    
+    def __init__(self, hypergraph):
+        self.hypergraph = hypergraph
+    
+    def __getitem__(self, node):
+        if not self.hypergraph.has_node(node):
+            raise KeyError(node)
+        return {"labels": self.hypergraph.node_labels(node)}
+    
+    def __contains__(self, node):
+        return self.hypergraph.has_node(node)
+    
+    def __iter__(self):
+        return self.hypergraph.nodes_iter()
+    
+    def __len__(self):
+        return self.hypergraph.number_of_nodes()
+
+class CompactHypergraph(Serializable):
+    '''A compact snapshot of a hypergraph for storing, loading and walking large
+    graphs. It is not a backend of Hypergraph: it has its own API (integer node
+    and edge ID's) and the algorithms, which need a Hypergraph, run on the
+    Hypergraph returned by to_hypergraph.
+    
+    Nodes are non-negative integers and edges are numbered 0..m-1 in the order
+    they were added. The endpoints of the edges are kept in CSR form
+    (edge_ptr, edge_nodes) and the incidence lists (node -> edges) are built
+    from them with numpy on the first query after a modification. Labels are
+    stored as ID's in a LabelVocabulary and the direction of an edge is a bitmask over
+    the permutations of its endpoint positions. Removed nodes and edges are only
+    marked, so that the ID's of the rest stay stable.
+    
+    The ready sets used by Arnborg & Proskurowski are not maintained. Use
+    to_hypergraph to get a Hypergraph of the whole graph or a part of it.
+    '''
+    
+    @staticmethod
+    def get_node_index_map(nodes):
+        '''Get the mapping of the node ID's of a Hypergraph to the integer node ID's
+        of its CompactHypergraph (as used by from_hypergraph).
+        :param nodes: All node ID's of the Hypergraph.
+        :return A dictionary mapping u"n_i" to i if all node ID's are of this form,
+        otherwise mapping the node ID's in sorted order to 0, 1, 2, ...
+        '''
+        nodes = list(nodes)
+        try:
+            node_index_map = {node: int(node[2:]) for node in nodes}
+            if any(index < 0 for index in node_index_map.itervalues()):
+                raise ValueError
+        except ValueError:
+            node_index_map = {node: index for index, node in enumerate(sorted(nodes))}
+        return node_index_map
+    
+    @staticmethod
+    def from_hypergraph(hypergraph):
+        '''Convert a Hypergraph to a CompactHypergraph.
+        :param hypergraph: A Hypergraph.
+        :return A tuple (compact_hypergraph, node_index_map), where node_index_map maps
+        the node ID's in hypergraph to the integer node ID's in compact_hypergraph.
+        '''
+        nodes = hypergraph.nodes()
+        node_index_map = CompactHypergraph.get_node_index_map(nodes)
+        
+        compact_hypergraph = CompactHypergraph()
+        for node in nodes:
+            compact_hypergraph.add_node(node_index_map[node], hypergraph.node[node])
+        for edge in hypergraph.edges_iter():
+            edge_attr = hypergraph.edge(edge)
+            endpoints = [node_index_map[node] for node in hypergraph.endpoints(edge)]
+            direction = [tuple(node_index_map[node] for node in perm) for perm in hypergraph.edge_direction(edge)]
+            compact_hypergraph.add_edge(endpoints, direction, edge_attr["labels"][0])
+        
+        return compact_hypergraph, node_index_map
+    
+    @staticmethod
+    def load_from_binary(in_dir, mmap=True):
+        '''Load a CompactHypergraph saved by save_to_binary.
+        :param in_dir: The directory of the saved graph.
+        :param mmap: (default True) If True, the arrays are memory-mapped read-only
+        instead of being read, so loading takes almost no time and processes
+        which load the same graph share the pages of the files. A memory-mapped
+        graph cannot be modified (its copy can). If False, the arrays are read
+        into memory and the graph is modifiable.
+        :return A CompactHypergraph with its own LabelVocabulary.
+        '''
+        def load(name, mmap=mmap):
+            return _load_npy(os.path.join(in_dir, name + ".npy"), mmap)
+        
+        header = load("header", mmap=False)
+        if header[0] != BINARY_FORMAT_VERSION:
+            raise ValueError("Unsupported binary format version {0}.".format(header[0]))
+        
+        vocabulary_data = load("vocabulary_data", mmap=False).tostring()
+        vocabulary_ptr = load("vocabulary_ptr", mmap=False).tolist()
+        labels = [vocabulary_data[vocabulary_ptr[i] : vocabulary_ptr[i + 1]].decode("utf-8") for i in xrange(len(vocabulary_ptr) - 1)]
+        
+        compact_hypergraph = CompactHypergraph(vocabulary=LabelVocabulary(labels))
+        compact_hypergraph.nodes_count, compact_hypergraph.edges_count, compact_hypergraph.hedges_count = header[1:].tolist()
+        
+        for attr, typecode, dtype in BINARY_ARRAYS:
+            values = load(attr[1:])
+            if not mmap:
+                values = _to_array(values, typecode, dtype)
+            setattr(compact_hypergraph, attr, values)
+        
+        extra_nodes = load("extra_node_labels_nodes", mmap=False).tolist()
+        extra_ptr = load("extra_node_labels_ptr", mmap=False).tolist()
+        extra_ids = load("extra_node_labels_ids", mmap=False)
+        for i, node in enumerate(extra_nodes):
+            compact_hypergraph._extra_node_labels[node] = _to_array(extra_ids[extra_ptr[i] : extra_ptr[i + 1]], "i", np.int32)
+        
+        compact_hypergraph._incidence = load("node_ptr"), load("node_edges")
+        
+        return compact_hypergraph
+    
+    @property
+    def node(self):
+        return NodeAttributesView(self)
+    
+    def number_of_nodes(self):
+        return self.nodes_count
+    
+    def number_of_edges(self):
+        return self.edges_count
+    
+    def number_of_hedges(self):
+        return self.hedges_count
+    
+    def add_node(self, node, attr_dict=None):
+        assert node >= 0
+        
+        missing = node + 1 - len(self._node_flags)
+        if missing > 0:
+            self._node_flags.extend(bytearray(missing))
+            self._node_label.extend([-1] * missing)
+        
+        if not self._node_flags[node]:
+            self._node_flags[node] = 1
+            self.nodes_count += 1
+            self._incidence = None
+        
+        if attr_dict and "labels" in attr_dict:
+            self.set_node_labels(node, list(attr_dict["labels"]))
+    
+    def has_node(self, node):
+        return 0 <= node < len(self._node_flags) and self._node_flags[node] == 1
+    
+    def nodes_iter(self):
+        node_flags = self._node_flags
+        return (node for node in xrange(len(node_flags)) if node_flags[node] == 1)
+    
+    def nodes(self):
+        return list(self.nodes_iter())
+    
+    def add_edge(self, nodes, direction=None, label=u"0"):
+        endpoints = []
+        for node in nodes:
+            assert self.has_node(node)
+            if node not in endpoints:
+                endpoints.append(node)
+        order = len(endpoints)
+        assert 0 < order <= 3
+        
+        edge_id = len(self._edge_labels)
+        self._edge_nodes.extend(endpoints)
+        self._edge_ptr.append(len(self._edge_nodes))
+        self._edge_labels.append(self.vocabulary.get_id(label))
+        self._edge_dirs.append(Hypergraph.encode_direction(endpoints, direction))
+        self._edge_flags.append(1)
+        
+        self.edges_count += 1
+        if order == 3:
+            self.hedges_count += 1
+        self._incidence = None
+        
+        return edge_id
+    
+    def remove_node(self, node):
+        assert self.has_node(node)
+        
+        self.remove_edges_from(self.edges(node))
+        self._node_flags[node] = 0
+        self._node_label[node] = -1
+        self._extra_node_labels.pop(node, None)
+        self.nodes_count -= 1
+    
+    def remove_nodes_from(self, nodes):
+        for node in nodes:
+            self.remove_node(node)
+    
+    def remove_edge(self, edge_id):
+        assert self._edge_flags[edge_id] == 1
+        
+        self._edge_flags[edge_id] = 0
+        self.edges_count -= 1
+        if self._edge_order(edge_id) == 3:
+            self.hedges_count -= 1
+    
+    def remove_edges_from(self, edge_ids):
+        for edge_id in list(edge_ids):
+            self.remove_edge(edge_id)
+    
+    def has_edge(self, u, v, dir_code=0):
+        if next(self.edges_iter_dir(u, v, dir_code), None) is not None:
+            return True
+        else:
+            return False
+    
+    def edge(self, edge_id):
+        '''Get the attributes of an edge in the same form as Hypergraph.edge.
+        Note: the dictionary is created on each call, changing it has no effect.
+        '''
+        return {
+            "labels": [self.vocabulary.get_label(self._edge_labels[edge_id])],
+            "endpoints": tuple(self.endpoints(edge_id)),
+            "dir_mask": self._edge_dirs[edge_id]
+        }
+    
+    def edge_direction(self, edge_id):
+        '''Get the direction of an edge as a set of permutations of its endpoints.
+        '''
+        return Hypergraph.decode_direction(self.endpoints(edge_id), self._edge_dirs[edge_id])
+    
+    def edges(self, u=None, v=None):
+        return list(self.edges_iter(u, v))
+    
+    def edges_2_iter(self):
+        for edge in self.edges_iter():
+            if self._edge_order(edge) == 2:
+                yield edge
+    
+    def edges_2(self):
+        return list(self.edges_2_iter())
+    
+    def edges_iter(self, u=None, v=None):
+        edge_flags = self._edge_flags
+        if u is None:
+            return (edge for edge in xrange(len(edge_flags)) if edge_flags[edge] == 1)
+        
+        node_ptr, node_edges = self._get_incidence()
+        u_edges = (edge for edge in node_edges[node_ptr[u] : node_ptr[u + 1]].tolist() if edge_flags[edge] == 1)
+        if v is None:
+            return u_edges
+        else:
+            return (edge for edge in u_edges if v in self.endpoints(edge))
+    
+    def edges_iter_dir(self, u, v=None, dir_code=0):
+        '''Get edges incident to node u filtered by direction.
+        :param u: node id.
+        :param dir_code: Direction code - If 0 all edges are
+        returned, if 1 only outgoing edges are returned,
+        if -1 only incoming edges are returned.
+        '''
+        def filter_edges():
+            flag_index = 0 if dir_code > 0 else 1
+            for edge in self.edges_iter(u, v):
+                endpoints = self.endpoints(edge)
+                flags = DIRECTION_FLAGS[len(endpoints), self._edge_dirs[edge]][flag_index]
+                if flags[endpoints.index(u)]:
+                    yield edge
+        
+        if dir_code == 0:
+            return self.edges_iter(u, v)
+        else:
+            return filter_edges()
+    
+    def hedges_iter(self):
+        for edge in self.edges_iter():
+            if self._edge_order(edge) == 3:
+                yield edge
+    
+    def hedges(self, u=None, v=None, w=None):
+        if u is None:
+            return list(self.hedges_iter())
+        
+        hedges = []
+        for hedge in self.edges_iter(u):
+            if self._edge_order(hedge) == 3:
+                endpoints = self.endpoints(hedge)
+                if (v is None or v in endpoints) and (w is None or w in endpoints):
+                    hedges.append(hedge)
+        return hedges
+    
+    def degree(self, node):
+        return sum(1 for _ in self.edges_iter(node))
+    
+    def neighbors(self, node):
+        neighbors = set()
+        for edge in self.edges_iter(node):
+            neighbors.update(self.endpoints(edge))
+        neighbors.discard(node)
+        return list(neighbors)
+    
+    def endpoints(self, edge_id):
+        return self._edge_nodes[self._edge_ptr[edge_id] : self._edge_ptr[edge_id + 1]].tolist()
+    
+    def get_adj_nodes(self, nodes):
+        assert type(nodes) is set
+        
+        all_edges = set()
+        for node in nodes:
+            all_edges.update(self.edges_iter(node))
+        
+        adj_nodes = set()
+        for edge in all_edges:
+            for pair in combinations(self.endpoints(edge), 2):
+                if pair[0] in nodes and pair[1] in nodes:
+                    adj_nodes.add(tuple(sorted(pair)))
+        
+        return adj_nodes
+    
+    def subgraph(self, nodes):
+        assert type(nodes) is set
+        
+        subgraph = nx.Graph()
+        subgraph.add_nodes_from(nodes)
+        subgraph.add_edges_from(self.get_adj_nodes(nodes))
+        
+        return subgraph
+    
+    # hyperedges are shown as 3 edges
+    def subgraph_with_labels(self, nodes):
+        assert type(nodes) is set
+        
+        subgraph = nx.MultiDiGraph()
+        
+        for node in nodes:
+            subgraph.add_node(node, labels=self.node_labels(node))
+        
+        for u, v in self.get_adj_nodes(nodes):
+            for edge in self.edges_iter(u, v):
+                label = self.vocabulary.get_label(self._edge_labels[edge])
+                endpoints = self.endpoints(edge)
+                dir_code = PAIR_DIRECTIONS[len(endpoints), self._edge_dirs[edge]][endpoints.index(u), endpoints.index(v)]
+                if dir_code >= 0:
+                    subgraph.add_edge(u, v, label=label)
+                if dir_code <= 0:
+                    subgraph.add_edge(v, u, label=label)
+        
+        return subgraph
+    
+    def node_labels(self, node):
+        assert self.has_node(node)
+        
+        label_id = self._node_label[node]
+        if label_id < 0:
+            return []
+        labels = [self.vocabulary.get_label(label_id)]
+        if node in self._extra_node_labels:
+            labels += self.vocabulary.get_labels(self._extra_node_labels[node])
+        return labels
+    
+    def add_node_label(self, node_id, label):
+        labels = self.node_labels(node_id)
+        labels.append(label)
+        self.set_node_labels(node_id, labels)
+    
+    def set_node_labels(self, node_id, labels):
+        assert type(labels) is list
+        
+        label_ids = self.vocabulary.get_ids(labels)
+        self._node_label[node_id] = label_ids[0] if label_ids else -1
+        if len(label_ids) > 1:
+            self._extra_node_labels[node_id] = array.array("i", label_ids[1:])
+        else:
+            self._extra_node_labels.pop(node_id, None)
+    
+    def to_hypergraph(self, nodes=None):
+        '''Convert the graph or the subgraph induced by nodes to a Hypergraph.
+        The node with ID i gets the ID u"n_i" in the Hypergraph.
+        :param nodes: (optional) A set of nodes.
+        :return A Hypergraph.
+        '''
+        if nodes is None:
+            nodes = set(self.nodes_iter())
+        
+        hypergraph = Hypergraph()
+        for node in nodes:
+            hypergraph.add_node(node, attr_dict={"labels": self.node_labels(node)})
+        
+        edges = set()
+        for node in nodes:
+            edges.update(self.edges_iter(node))
+        for edge in edges:
+            endpoints = self.endpoints(edge)
+            if all(node in nodes for node in endpoints):
+                direction = set(tuple(Hypergraph.format_node_id(node) for node in perm) for perm in self.edge_direction(edge))
+                hypergraph.add_edge(set(Hypergraph.format_node_id(node) for node in endpoints),
+                                    direction, self.vocabulary.get_label(self._edge_labels[edge]))
+        
+        hypergraph.init_parallel_edges_groups()
+        hypergraph.init_nodes_with_n_neighbors()
+        
+        return hypergraph
+    
+    def to_nx_graph(self):
+        return self.subgraph_with_labels(set(self.nodes_iter()))
+    
+    def reorder(self, method="rcm"):
+        '''Renumber the nodes 0..n-1 so that adjacent nodes get close ID's (see
+        Hypergraph.reorder) and the edges in the order of their endpoints.
+        :param method: (default "rcm") "bfs", "rcm" or "degree".
+        :return A tuple (reordered_hypergraph, permutation), where permutation
+        is a numpy array with the new ID of each old node ID (-1 for ID's which
+        are not nodes).
+        '''
+        ordering = node_ordering.get_ordering(self.nodes_iter(), self.neighbors, method)
+        permutation = np.full(len(self._node_flags), -1, dtype=np.int64)
+        permutation[ordering] = np.arange(len(ordering))
+        
+        reordered_hypergraph = CompactHypergraph(vocabulary=self.vocabulary)
+        for node in ordering:
+            reordered_hypergraph.add_node(int(permutation[node]), {"labels": self.node_labels(node)})
+        
+        edge_keys = {edge: sorted(permutation[self.endpoints(edge)].tolist()) for edge in self.edges_iter()}
+        for edge in sorted(edge_keys, key=lambda edge: (edge_keys[edge], edge)):
+            endpoints = permutation[self.endpoints(edge)].tolist()
+            direction = [tuple(permutation[list(perm)].tolist()) for perm in self.edge_direction(edge)]
+            reordered_hypergraph.add_edge(endpoints, direction, self.vocabulary.get_label(self._edge_labels[edge]))
+        
+        return reordered_hypergraph, permutation
+    
+    def memory_report(self):
+        '''Estimate the memory used by the parts of the hypergraph (see memory.deep_sizeof).
+        Memory-mapped arrays (see load_from_binary) count only their headers. The
+        vocabulary is counted fully, even if it is shared with other graphs.
+        :return A dictionary mapping the component names to their sizes in bytes
+        and "total" to the sum.
+        '''
+        components = [
+            ("nodes", [self._node_flags, self._node_label, self._extra_node_labels]),
+            ("edges", [self._edge_ptr, self._edge_nodes, self._edge_labels, self._edge_dirs, self._edge_flags]),
+            ("incidence", [self._incidence]),
+            ("vocabulary", [self.vocabulary]),
+            ("other", [self])
+        ]
+        return memory.components_report(components)
+    
+    def save_to_binary(self, out_dir):
+        '''Save the graph in a columnar binary format: one .npy file per array
+        (the node and edge arrays, the incidence lists and the label ID's) and
+        the labels used by the graph as a vocabulary of UTF-8 strings. The label
+        ID's are renumbered to the saved vocabulary. See load_from_binary.
+        :param out_dir: The directory for the files (created if needed).
+        '''
+        def save(name, values):
+            np.save(os.path.join(out_dir, name + ".npy"), values)
+        
+        if not os.path.isdir(out_dir):
+            os.makedirs(out_dir)
+        
+        # keep only the used labels in the saved vocabulary
+        used_ids, node_label, edge_labels, extra_nodes, extra_ptr, extra_ids = self._renumber_labels()
+        
+        encoded_labels = [unicode(label).encode("utf-8") for label in self.vocabulary.get_labels(used_ids.tolist())]
+        vocabulary_ptr = np.zeros(len(encoded_labels) + 1, dtype=np.int64)
+        np.cumsum([len(label) for label in encoded_labels], out=vocabulary_ptr[1:])
+        
+        save("header", np.array([BINARY_FORMAT_VERSION, self.nodes_count, self.edges_count, self.hedges_count], dtype=np.int64))
+        save("vocabulary_data", np.frombuffer(b"".join(encoded_labels), dtype=np.uint8) if vocabulary_ptr[-1] else np.zeros(0, dtype=np.uint8))
+        save("vocabulary_ptr", vocabulary_ptr)
+        for attr, _, dtype in BINARY_ARRAYS:
+            if attr == "_node_label":
+                save(attr[1:], node_label)
+            elif attr == "_edge_labels":
+                save(attr[1:], edge_labels)
+            else:
+                save(attr[1:], _as_numpy(getattr(self, attr), dtype))
+        save("extra_node_labels_nodes", extra_nodes)
+        save("extra_node_labels_ptr", extra_ptr)
+        save("extra_node_labels_ids", extra_ids)
+        
+        node_ptr, node_edges = self._get_incidence()
+        save("node_ptr", np.asarray(node_ptr, dtype=np.int64))
+        save("node_edges", np.asarray(node_edges, dtype=np.int32))
+    
+    def copy(self):
+        new_hypergraph = CompactHypergraph()
+        new_hypergraph.__dict__.update(self.__dict__)
+        new_hypergraph._incidence = None
+        for attr, typecode, dtype in BINARY_ARRAYS:
+            values = getattr(self, attr)
+            if isinstance(values, np.ndarray):
+                # memory-mapped (see load_from_binary)
+                values = _to_array(values, typecode, dtype)
+            else:
+                values = values[:]
+            setattr(new_hypergraph, attr, values)
+        new_hypergraph._extra_node_labels = {node: labels[:] for node, labels in self._extra_node_labels.iteritems()}
+        return new_hypergraph
+    
+    # private methods
+    
+    def _renumber_labels(self):
+        '''Renumber the label ID's to the labels used by the graph.
+        :return A tuple (used_ids, node_label, edge_labels, extra_nodes,
+        extra_ptr, extra_ids) of numpy arrays: the used ID's of the vocabulary
+        in increasing order (the new ID of a label is its index in used_ids),
+        the renumbered first node labels and edge labels and the additional
+        node labels in CSR form (extra_nodes are sorted).
+        '''
+        node_label = _as_numpy(self._node_label, np.int32)
+        edge_labels = _as_numpy(self._edge_labels, np.int32)
+        extra_nodes = sorted(self._extra_node_labels)
+        extra_ids = [_as_numpy(self._extra_node_labels[node], np.int32) for node in extra_nodes]
+        extra_ptr = np.zeros(len(extra_nodes) + 1, dtype=np.int64)
+        np.cumsum([len(ids) for ids in extra_ids], out=extra_ptr[1:])
+        extra_ids = np.concatenate(extra_ids) if extra_ids else np.zeros(0, dtype=np.int32)
+        
+        used_ids = np.unique(np.concatenate((node_label[node_label >= 0], extra_ids, edge_labels)))
+        node_label = np.where(node_label >= 0, np.searchsorted(used_ids, node_label), -1).astype(np.int32)
+        edge_labels = np.searchsorted(used_ids, edge_labels).astype(np.int32)
+        extra_ids = np.searchsorted(used_ids, extra_ids).astype(np.int32)
+        
+        return used_ids, node_label, edge_labels, np.array(extra_nodes, dtype=np.int64), extra_ptr, extra_ids
+    
+    def _edge_order(self, edge_id):
+        return self._edge_ptr[edge_id + 1] - self._edge_ptr[edge_id]
+    
+    def _get_incidence(self):
+        '''Get the incidence lists in CSR form as a tuple (node_ptr, node_edges),
+        where the edges of node u are node_edges[node_ptr[u] : node_ptr[u + 1]].
+        '''
+        if self._incidence is None:
+            nodes_count = len(self._node_flags)
+            edge_ptr = _as_numpy(self._edge_ptr, EDGE_PTR_DTYPE)
+            edge_nodes = _as_numpy(self._edge_nodes, np.int32)
+            edge_sizes = np.diff(edge_ptr)
+            edge_of_entry = np.repeat(np.arange(len(edge_sizes), dtype=np.int32), edge_sizes)
+            node_edges = edge_of_entry[np.argsort(edge_nodes, kind="mergesort")]
+            node_ptr = np.zeros(nodes_count + 1, dtype=np.int64)
+            np.cumsum(np.bincount(edge_nodes, minlength=nodes_count), out=node_ptr[1:])
+            self._incidence = node_ptr, node_edges
+        
+        return self._incidence
+    
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        # the incidence lists are rebuilt on demand
+        state["_incidence"] = None
+        # only the labels used by the graph are pickled, in a vocabulary of their own
+        used_ids, node_label, edge_labels, extra_nodes, extra_ptr, extra_ids = self._renumber_labels()
+        state["vocabulary"] = LabelVocabulary(self.vocabulary.get_labels(used_ids.tolist()))
+        state["_node_label"] = _to_array(node_label, "i", np.int32)
+        state["_edge_labels"] = _to_array(edge_labels, "i", np.int32)
+        state["_extra_node_labels"] = {node: _to_array(extra_ids[extra_ptr[i] : extra_ptr[i + 1]], "i", np.int32)
+                                       for i, node in enumerate(extra_nodes.tolist())}
+        return state
+    
+    def __eq__(self, other):
+        if isinstance(other, self.__class__):
+            return self.__getstate__() == other.__getstate__()
+        else:
+            return False
+    
+    def __ne__(self, other):
+        return not self.__eq__(other)
+    
+    def __init__(self, nx_graph=None, vocabulary=None):
+        '''Constructor
+        :param nx_graph: (optional) A Networkx graph whose nodes are non-negative integers.
+        :param vocabulary: (optional) The LabelVocabulary for the labels. By default
+        the graph gets a vocabulary of its own.
+        '''
+        self.nodes_count = 0
+        self.edges_count = 0
+        self.hedges_count = 0
+        
+        # vocabulary of the node and edge labels
+        self.vocabulary = vocabulary if vocabulary is not None else LabelVocabulary()
+        
+        # nodes: presence flags, first label ID and additional label ID's (rare)
+        self._node_flags = bytearray()
+        self._node_label = array.array("i")
+        self._extra_node_labels = {}
+        
+        # edges: endpoints in CSR form, label ID's, direction masks and presence flags
+        self._edge_ptr = array.array("l", [0])
+        self._edge_nodes = array.array("i")
+        self._edge_labels = array.array("i")
+        self._edge_dirs = array.array("B")
+        self._edge_flags = bytearray()
+        
+        self._incidence = None
+        
+        if nx_graph is None:
+            return
+        
+        for node in nx_graph.nodes_iter():
+            self.add_node(node, nx_graph.node[node])
+        
+        if nx_graph.is_directed():
+            for u, v in nxext.get_all_adjacent_nodes(nx_graph):
+                for label, dir_code in nxext.get_edge_labels_and_dirs(nx_graph, u, v):
+                    if dir_code == 0:
+                        direction = None
+                    elif dir_code > 0:
+                        direction = [(u, v)]
+                    else:
+                        direction = [(v, u)]
+                    self.add_edge([u, v], direction, label)
+        else:
+            for u, v, edge_attr in nx_graph.edges_iter(data=True):
+                self.add_edge([u, v], label=edge_attr["label"])
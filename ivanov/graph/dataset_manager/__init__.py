@@ -9,7 +9,7 @@ from ivanov.graph.algorithms import arnborg_proskurowski, weisfeiler_lehman
 from ivanov.graph.hypergraph import Hypergraph
 from ivanov.graph import rdf, algorithms
 from scipy.sparse import csr_matrix
-from ivanov import inout
+from ivanov import inout, memory
 import networkx as nx
 import numpy as np
 import itertools
@@ -266,6 +266,15 @@ def process_record(record, wl_iterations, state, binary_target_labels=True, shin
         files[0].write("{0} {1}\n".format(data_instance[0], " ".join(["{0}:{1}".format(f, v) for f, v in data_instance[1]])))
         files[0].flush()
 
+def memory_report(state):
+    '''Estimate the memory used by the state of a data building job (see memory.deep_sizeof).
+    :param state: The state dictionary used by process_record (with "wl_state",
+    "shingle_id_map", etc.).
+    :return A dictionary mapping the keys of the state to their sizes in bytes
+    and "total" to the whole size.
+    '''
+    return memory.dict_report(state)
+
 def build_svmlight_chemical_data(in_files, wl_iterations, output_dir, format_rdf=False, compounds_targets_file=None, uri_prefix=None,
                                  shingles_type="features", window_size=5, accumulate_wl_shingles=True, fingerprints=False,
                                  sort_rdf_nodes_before_processing=True, state_input_file=None, state_output_file=None,
@@ -8,13 +8,87 @@ Represents a hypergraph with hyperedges of order at most 3.
 
 from itertools import permutations, combinations
 from ivanov.inout.serializable import Serializable
-from ivanov.graph import nxext
+from ivanov.graph.label_vocabulary import default_vocabulary
+from ivanov.graph import nxext, node_ordering
+from ivanov import memory
 from timeit import itertools
+from contextlib import contextmanager
 import networkx as nx
+import numpy as np
+import hashlib
+import weakref
 import copy
 
+# all permutations of the endpoint positions of edges of order 1, 2 and 3
+PERMUTATIONS = {order: list(permutations(range(order))) for order in [1, 2, 3]}
+PERMUTATION_INDICES = {order: {perm: i for i, perm in enumerate(PERMUTATIONS[order])} for order in PERMUTATIONS}
+
+def _compute_direction_tables():
+    '''The direction of an edge is encoded as a bitmask over PERMUTATIONS[order]
+    (the positions refer to the endpoints of the edge). For each edge order and
+    direction mask precompute:
+    - the allowed permutations of the endpoint positions;
+    - for every endpoint position whether the endpoint is a source (it is not
+    last in some of the allowed permutations) and whether it is a target (it is
+    not first in some of the allowed permutations);
+    - for every pair of positions (i, j) the direction between them (1 if i
+    always precedes j, -1 if j always precedes i, otherwise 0).
+    '''
+    allowed_perms = {}
+    flags = {}
+    pair_dirs = {}
+    for order, perms in PERMUTATIONS.items():
+        for dir_mask in range(1, 1 << len(perms)):
+            allowed = [perm for i, perm in enumerate(perms) if dir_mask & (1 << i)]
+            allowed_perms[order, dir_mask] = allowed
+            is_source = tuple(any(perm.index(pos) < order - 1 for perm in allowed) for pos in range(order))
+            is_target = tuple(any(perm.index(pos) > 0 for perm in allowed) for pos in range(order))
+            flags[order, dir_mask] = is_source, is_target
+            pair_dirs[order, dir_mask] = {}
+            for i, j in permutations(range(order), 2):
+                if not any(perm.index(i) < perm.index(j) for perm in allowed):
+                    pair_dirs[order, dir_mask][i, j] = -1
+                elif not any(perm.index(i) > perm.index(j) for perm in allowed):
+                    pair_dirs[order, dir_mask][i, j] = 1
+                else:
+                    pair_dirs[order, dir_mask][i, j] = 0
+    return allowed_perms, flags, pair_dirs
+
+ALLOWED_PERMUTATIONS, DIRECTION_FLAGS, PAIR_DIRECTIONS = _compute_direction_tables()
+
+MASK_64 = (1 << 64) - 1
+
+def _mix_64(x):
+    '''The finalizer of SplitMix64.
+    '''
+    x = ((x ^ (x >> 30)) * 0xbf58476d1ce4e5b9) & MASK_64
+    x = ((x ^ (x >> 27)) * 0x94d049bb133111eb) & MASK_64
+    return x ^ (x >> 31)
+
+def _hash_64_values(values):
+    '''Fold a sequence of 64-bit integers into one 64-bit integer (order-sensitive).
+    '''
+    h = 0xcbf29ce484222325
+    for value in values:
+        h = _mix_64((h * 0x100000001b3 + value) & MASK_64)
+    return h
+
+def _hash_64_label(label):
+    '''A 64-bit hash of a label, which does not depend on the process (unlike hash()).
+    '''
+    return int(hashlib.md5(unicode(label).encode("utf-8")).hexdigest()[:16], 16)
+
+def hash_colors(node_colors, edge_colors):
+    '''Fold the colors computed by Hypergraph.refine_colors into a 64-bit hash.
+    '''
+    return _hash_64_values([len(node_colors), len(edge_colors)] + sorted(node_colors.itervalues()) + sorted(edge_colors.itervalues()))
+
 class Hypergraph(Serializable):
-        
+    
+    # the attributes shared by shallow copies until a structural modification (see copy())
+    SHARED_STRUCTURE = frozenset(["nodes_registry", "edges_registry", "hedges_registry",
+                                  "neighbors_multiplicity", "endpoints_index", "hedges_pairs_index"])
+    
     @staticmethod
     def hedge_to_string(hypergraph, hedge_id, permutation):
         assert hedge_id.startswith(u"he_")
@@ -28,14 +102,53 @@ class Hypergraph(Serializable):
         assert edge_id.startswith(u"he_") or edge_id.startswith(u"e_")
         
         edge_attr = hypergraph.edge(edge_id)
+        positions = [unicode(permutation.index(node)) for node in edge_attr["endpoints"]]
+        return Hypergraph.edge_positions_to_string(edge_attr, positions)
+    
+    @staticmethod
+    def edge_positions_to_string(edge_attr, positions):
+        '''The same as edge_to_string, but takes the positions of the endpoints
+        in the permutation instead of the permutation.
+        :param edge_attr: The attributes of the edge.
+        :param positions: A list with the position (as unicode string) of each endpoint.
+        '''
         dir_encodings = []
-        for dir_perm in edge_attr["direction"]:
-            dir_encoding = map(lambda node: permutation.index(node), dir_perm)
-            dir_encodings.append(u"({0})".format(u",".join(unicode(enc) for enc in dir_encoding)))
+        for dir_perm in ALLOWED_PERMUTATIONS[len(positions), edge_attr["dir_mask"]]:
+            dir_encodings.append(u"({0})".format(u",".join(positions[pos] for pos in dir_perm)))
         hedge_label = edge_attr["labels"][0]
         hedge_dir_str = u"({0})".format(u",".join(sorted(dir_encodings)))
         return u"({0},{1})".format(hedge_label, hedge_dir_str)
     
+    @staticmethod
+    def encode_direction(endpoints, direction):
+        '''Encode the direction of an edge as a bitmask over PERMUTATIONS.
+        :param endpoints: The endpoints of the edge in the order, to which the
+        positions in the bitmask refer.
+        :param direction: An iterable of permutations of the endpoints. If empty or
+        None, all permutations are allowed (undirected edge).
+        :return The direction mask.
+        '''
+        perms = PERMUTATIONS[len(endpoints)]
+        if not direction:
+            return (1 << len(perms)) - 1
+        
+        positions = {node: pos for pos, node in enumerate(endpoints)}
+        dir_mask = 0
+        for dir_perm in direction:
+            perm = []
+            for node in dir_perm:
+                if positions[node] not in perm:
+                    perm.append(positions[node])
+            dir_mask |= 1 << PERMUTATION_INDICES[len(endpoints)][tuple(perm)]
+        return dir_mask
+    
+    @staticmethod
+    def decode_direction(endpoints, dir_mask):
+        '''The inverse of encode_direction.
+        :return A set of permutations of the endpoints.
+        '''
+        return set(tuple(endpoints[pos] for pos in perm) for perm in ALLOWED_PERMUTATIONS[len(endpoints), dir_mask])
+    
     @staticmethod
     def format_node_id(node):
         if unicode(node).startswith(u"n_"):
@@ -43,6 +156,109 @@ class Hypergraph(Serializable):
         else:
             return u"n_{0}".format(node)
     
+    @staticmethod
+    def _discard_from_index(index, key, edge_id):
+        edges = index[key]
+        edges.discard(edge_id)
+        if not edges:
+            del index[key]
+    
+    @staticmethod
+    def from_arrays(src, dst, edge_labels, node_labels, directed=True, vocabulary=None):
+        '''Build a hypergraph directly from arrays of edges (e.g. the triples of an
+        RDF graph) without creating a networkx graph first. The edges are grouped
+        by endpoints and label with numpy and the ready sets are filled from the
+        indices maintained during the construction.
+        :param src: Array of the source nodes (integers) of the edges.
+        :param dst: Array of the target nodes (integers) of the edges.
+        :param edge_labels: Array of the labels of the edges.
+        :param node_labels: A dictionary mapping each node to its label (or list of
+        labels), or a sequence whose i-th element is the label of node i. Every
+        node of an edge must have a label, otherwise a ValueError is raised.
+        :param directed: (default True) If True, two opposite edges with the same
+        label between the same nodes are merged into one undirected edge, the rest
+        stay directed (the same as the constructor does for directed graphs).
+        If False, all edges are undirected.
+        :param vocabulary: (optional) The LabelVocabulary to intern the labels
+        in, by default default_vocabulary.
+        :return A Hypergraph.
+        '''
+        if vocabulary is None:
+            vocabulary = default_vocabulary
+        hypergraph = Hypergraph()
+        
+        if hasattr(node_labels, "iteritems"):
+            node_labels_iter = node_labels.iteritems()
+        else:
+            node_labels_iter = enumerate(node_labels)
+        for node, labels in node_labels_iter:
+            if type(labels) is not list:
+                labels = [labels]
+            hypergraph.add_node(node, attr_dict={"labels": [vocabulary.intern(label) for label in labels]})
+        
+        src = np.asarray(src, dtype=np.int64)
+        dst = np.asarray(dst, dtype=np.int64)
+        assert len(src) == len(dst) == len(edge_labels)
+        
+        for node in np.unique(np.concatenate((src, dst))).tolist():
+            if Hypergraph.format_node_id(node) not in hypergraph.nodes_registry:
+                raise ValueError("The node {0} of an edge has no label in node_labels.".format(node))
+        
+        if len(src) > 0:
+            label_values, label_ids = np.unique(np.asarray(edge_labels), return_inverse=True)
+            label_values = [vocabulary.intern(label) for label in label_values.tolist()]
+            lo = np.minimum(src, dst)
+            hi = np.maximum(src, dst)
+            forward = src <= dst
+            
+            # group the edges by (lo, hi, label)
+            order = np.lexsort((label_ids, hi, lo))
+            lo = lo[order]
+            hi = hi[order]
+            label_ids = label_ids[order]
+            forward = forward[order]
+            new_group = (np.diff(lo) != 0) | (np.diff(hi) != 0) | (np.diff(label_ids) != 0)
+            starts = np.concatenate(([0], np.flatnonzero(new_group) + 1))
+            sizes = np.diff(np.append(starts, len(lo)))
+            group_index = np.repeat(np.arange(len(starts)), sizes)
+            forward_counts = np.bincount(group_index, weights=forward, minlength=len(starts)).astype(np.int64)
+            backward_counts = sizes - forward_counts
+            self_loops = lo[starts] == hi[starts]
+            
+            if directed:
+                undirected_counts = np.where(self_loops, sizes, np.minimum(forward_counts, backward_counts))
+                forward_counts = np.where(self_loops, 0, forward_counts - undirected_counts)
+                backward_counts = np.where(self_loops, 0, backward_counts - undirected_counts)
+            else:
+                undirected_counts = sizes
+                forward_counts = np.zeros(len(starts), dtype=np.int64)
+                backward_counts = forward_counts
+            
+            for group in xrange(len(starts)):
+                u = Hypergraph.format_node_id(lo[starts[group]])
+                v = Hypergraph.format_node_id(hi[starts[group]])
+                label = label_values[label_ids[starts[group]]]
+                endpoints = [u, v]
+                if u == v:
+                    u_to_v_mask = v_to_u_mask = undirected_mask = 1
+                else:
+                    # the masks refer to the sorted endpoints
+                    u_to_v_mask = 1 if u < v else 2
+                    v_to_u_mask = 3 - u_to_v_mask
+                    undirected_mask = 3
+                for dir_mask, count in [(undirected_mask, undirected_counts[group]),
+                                        (u_to_v_mask, forward_counts[group]),
+                                        (v_to_u_mask, backward_counts[group])]:
+                    for _ in xrange(count):
+                        hypergraph.add_edge(endpoints, label=label, dir_mask=dir_mask)
+        
+        # Initialize ready sets
+        hypergraph.parallel_edges_groups = {key: list(edges) for key, edges in hypergraph.endpoints_index.iteritems()
+                                            if len(key) == 2 and len(edges) > 1}
+        hypergraph.init_nodes_with_n_neighbors()
+        
+        return hypergraph
+    
     def number_of_nodes(self):
         return self.nodes_count
     
@@ -54,7 +270,10 @@ class Hypergraph(Serializable):
     
     def add_node(self, node, attr_dict):
         node_id = Hypergraph.format_node_id(node)
+        self.unshare_structure()
         self.bipartite_graph.add_node(node_id, attr_dict=attr_dict, bipartite=0)
+        self.nodes_registry.add(node_id)
+        self.neighbors_multiplicity[node_id] = {}
         if len(attr_dict["labels"]) > 1:
             self.nodes_with_more_labels.add(node_id)
         self.nodes_count += 1
@@ -64,36 +283,77 @@ class Hypergraph(Serializable):
         return self.bipartite_graph.has_node(node)
     
     def nodes_iter(self):
-        return itertools.ifilter(lambda node: self.bipartite_graph.node[node]["bipartite"] == 0, self.bipartite_graph.nodes_iter())
+        return iter(self.nodes_registry)
         
     def nodes(self):
         return list(self.nodes_iter())
     
-    def add_edge(self, nodes, direction=None, label=u"0"):
+    def add_edge(self, nodes, direction=None, label=u"0", dir_mask=None):
+        '''Add an edge or a hyperedge.
+        :param nodes: The endpoints of the edge.
+        :param direction: The permutations of the endpoints allowed by the edge
+        (if empty, the edge is undirected).
+        :param label: The label of the edge.
+        :param dir_mask: The direction as an already encoded mask (see
+        encode_direction) relative to the sorted endpoints. If given,
+        direction is ignored.
+        :return The edge id.
+        '''
         assert not filter(lambda n: not n.startswith(u"n_"), nodes)
         
+        if self.label_dag is not None:
+            label = self.label_dag.intern(label)
+        
+        self.unshare_structure()
+        
         nodes_set = set(nodes)
         if len(nodes_set) < 3:
             edge_id = u"e_" + unicode(self.next_edge_index)
             self.next_edge_index += 1
+            self.edges_registry.add(edge_id)
         else:
             edge_id = u"he_" + unicode(self.next_hedge_index)
             self.next_hedge_index += 1
             self.hedges_count += 1
+            self.hedges_registry.add(edge_id)
         
-        if not direction:
-            direction = set(permutations(nodes_set))
+        endpoints = tuple(sorted(nodes_set))
+        if dir_mask is None:
+            dir_mask = Hypergraph.encode_direction(endpoints, direction)
         
-        self.bipartite_graph.add_node(edge_id, direction=direction, labels=[label], bipartite=1)
+        self.bipartite_graph.add_node(edge_id, endpoints=endpoints, dir_mask=dir_mask, labels=[label], bipartite=1)
         self.edges_count += 1
         
         for node in nodes:
             self.bipartite_graph.add_edge(edge_id, node)
         
+        # update neighbors multiplicity
+        for u, v in permutations(nodes_set, 2):
+            u_neighbors = self.neighbors_multiplicity[u]
+            u_neighbors[v] = u_neighbors.get(v, 0) + 1
+        
+        # update endpoints index
+        key = frozenset(nodes_set)
+        if key in self.endpoints_index:
+            self.endpoints_index[key].add(edge_id)
+        else:
+            self.endpoints_index[key] = set([edge_id])
+        if len(nodes_set) > 2:
+            for pair in combinations(nodes_set, 2):
+                pair_key = frozenset(pair)
+                if pair_key in self.hedges_pairs_index:
+                    self.hedges_pairs_index[pair_key].add(edge_id)
+                else:
+                    self.hedges_pairs_index[pair_key] = set([edge_id])
+        
         # update self loops
         if len(nodes_set) == 1:
             self.self_loops.add(edge_id)
         
+        if self.batch_level > 0:
+            self.batch_touched_nodes |= nodes_set
+            self.batch_new_edges.add(edge_id)
+        
         return edge_id
         
     def remove_node(self, node):
@@ -101,8 +361,14 @@ class Hypergraph(Serializable):
         
         connected_edges = self.bipartite_graph.neighbors(node)
         self.remove_edges_from(connected_edges, unsafe=True)
+        self.unshare_structure()
         self.bipartite_graph.remove_node(node)
+        self.nodes_registry.remove(node)
+        del self.neighbors_multiplicity[node]
         self.nodes_count -= 1
+        
+        if self.batch_level > 0:
+            self.batch_touched_nodes.add(node)
     
     def safe_remove_node(self, node):
         neighbors = set(self.neighbors(node))
@@ -118,11 +384,32 @@ class Hypergraph(Serializable):
     def remove_edge(self, edge_id):
         assert edge_id.startswith(u"e_") or edge_id.startswith(u"he_")
         
+        self.unshare_structure()
+        
         # update parallel edges
         if edge_id.startswith(u"e_"):
             self.try_remove_from_parallel_edges_groups(edge_id)
+            self.edges_registry.remove(edge_id)
         else:
             self.try_remove_from_parallel_hedges_groups(edge_id)
+            self.hedges_registry.remove(edge_id)
+            self.hedges_count -= 1
+        
+        endpoints = self.bipartite_graph.neighbors(edge_id)
+        
+        # update endpoints index
+        Hypergraph._discard_from_index(self.endpoints_index, frozenset(endpoints), edge_id)
+        if len(endpoints) > 2:
+            for pair in combinations(endpoints, 2):
+                Hypergraph._discard_from_index(self.hedges_pairs_index, frozenset(pair), edge_id)
+        
+        # update neighbors multiplicity
+        for u, v in permutations(endpoints, 2):
+            u_neighbors = self.neighbors_multiplicity[u]
+            if u_neighbors[v] > 1:
+                u_neighbors[v] -= 1
+            else:
+                del u_neighbors[v]
         
         self.bipartite_graph.remove_node(edge_id)
         self.edges_count -= 1
@@ -130,6 +417,10 @@ class Hypergraph(Serializable):
         # update self loops
         if edge_id in self.self_loops:
             self.self_loops.remove(edge_id)
+        
+        if self.batch_level > 0:
+            self.batch_touched_nodes.update(endpoints)
+            self.batch_new_edges.discard(edge_id)
     
     def safe_remove_edge(self, edge_id):
         edge_endpoints = set(self.endpoints(edge_id))
@@ -152,6 +443,9 @@ class Hypergraph(Serializable):
     
     def has_edge(self, u, v, dir_code=0):
         assert u.startswith(u"n_") and v.startswith(u"n_")
+        if dir_code == 0 and u != v:
+            key = frozenset([u, v])
+            return key in self.endpoints_index or key in self.hedges_pairs_index
         if next(self.edges_iter_dir(u, v, dir_code), None):
             return True
         else:
@@ -161,12 +455,32 @@ class Hypergraph(Serializable):
         assert edge_id.startswith(u"e_") or edge_id.startswith(u"he_")
         return self.bipartite_graph.node[edge_id]
     
+    def edge_direction(self, edge_id):
+        '''Get the direction of an edge as a set of permutations of its endpoints.
+        '''
+        edge_attr = self.edge(edge_id)
+        return Hypergraph.decode_direction(edge_attr["endpoints"], edge_attr["dir_mask"])
+    
+    def is_source(self, edge_id, node):
+        '''Check if the edge can be directed out of the node.
+        '''
+        edge_attr = self.edge(edge_id)
+        endpoints = edge_attr["endpoints"]
+        return DIRECTION_FLAGS[len(endpoints), edge_attr["dir_mask"]][0][endpoints.index(node)]
+    
+    def is_target(self, edge_id, node):
+        '''Check if the edge can be directed into the node.
+        '''
+        edge_attr = self.edge(edge_id)
+        endpoints = edge_attr["endpoints"]
+        return DIRECTION_FLAGS[len(endpoints), edge_attr["dir_mask"]][1][endpoints.index(node)]
+    
     def edges(self, u=None, v=None):
         return list(self.edges_iter(u, v))
     
     def edges_2_iter(self):
-        for edge in self.edges_iter():
-            if len(self.endpoints(edge)) == 2:
+        for edge in self.edges_registry:
+            if edge not in self.self_loops:
                 yield edge
     
     def edges_2(self):
@@ -174,9 +488,7 @@ class Hypergraph(Serializable):
     
     def edges_iter(self, u=None, v=None):
         def all_edges():
-            for x in self.bipartite_graph.nodes_iter():
-                if self.bipartite_graph.node[x]["bipartite"] == 1:
-                    yield x
+            return itertools.chain(self.edges_registry, self.hedges_registry)
         def edges_of_u_v(_u_edges, _v):
             for edge in u_edges:
                 if v in self.endpoints(edge):
@@ -189,7 +501,13 @@ class Hypergraph(Serializable):
                 return u_edges
             
             assert v.startswith(u"n_")
-            return edges_of_u_v(u_edges, v)
+            if u == v:
+                return edges_of_u_v(u_edges, v)
+            key = frozenset([u, v])
+            edges = list(self.endpoints_index.get(key, []))
+            if key in self.hedges_pairs_index:
+                edges += self.hedges_pairs_index[key]
+            return iter(edges)
         else:
             return all_edges()
     
@@ -201,16 +519,12 @@ class Hypergraph(Serializable):
         if -1 only incoming edges are returned.
         '''
         def filter_edges():
-            if dir_code < 0:
-                for edge in self.edges_iter(u, v):
-                    edge_dir = self.edge(edge)["direction"]
-                    if any(map(lambda dir_perm: dir_perm.index(u) > 0, edge_dir)):
-                        yield edge
-            elif dir_code > 0:
-                for edge in self.edges_iter(u, v):
-                    edge_dir = self.edge(edge)["direction"]
-                    if any(map(lambda dir_perm: dir_perm.index(u) < len(dir_perm) - 1, edge_dir)):
-                        yield edge
+            flag_index = 1 if dir_code < 0 else 0
+            for edge in self.edges_iter(u, v):
+                edge_attr = self.edge(edge)
+                endpoints = edge_attr["endpoints"]
+                if DIRECTION_FLAGS[len(endpoints), edge_attr["dir_mask"]][flag_index][endpoints.index(u)]:
+                    yield edge
         
         if dir_code == 0:
             return self.edges_iter(u, v)
@@ -218,9 +532,7 @@ class Hypergraph(Serializable):
             return filter_edges()
     
     def hedges_iter(self):
-        for edge in self.edges_iter():
-            if edge.startswith(u"he_"):
-                yield edge
+        return iter(self.hedges_registry)
     
     def hedges(self, u=None, v=None, w=None):
         if u:
@@ -230,27 +542,16 @@ class Hypergraph(Serializable):
                 if w:
                     assert w.startswith(u"n_")
             
-            u_edges = self.bipartite_graph.neighbors(u)
-            u_hedges = filter(lambda edge: edge.startswith(u"he_"), u_edges)
-            if len(u_hedges) == 0:
-                return []
-            elif not v:
-                return u_hedges
+            if not v:
+                u_edges = self.bipartite_graph.neighbors(u)
+                return filter(lambda edge: edge.startswith(u"he_"), u_edges)
+            elif not w:
+                return list(self.hedges_pairs_index.get(frozenset([u, v]), []))
             else:
-                if not w:
-                    hedges = []
-                    for hedge in u_hedges:
-                        nodes = self.bipartite_graph.neighbors(hedge)
-                        if v in nodes:
-                            hedges.append(hedge)
-                    return hedges
-                else:
-                    hedges = []
-                    for hedge in u_hedges:
-                        nodes = self.bipartite_graph.neighbors(hedge)
-                        if not set(nodes) ^ set([u, v, w]):
-                            hedges.append(hedge)
-                    return hedges
+                key = frozenset([u, v, w])
+                if len(key) < 3:
+                    return []
+                return list(self.endpoints_index.get(key, []))
         else:
             return list(self.hedges_iter())
     
@@ -258,6 +559,11 @@ class Hypergraph(Serializable):
         assert node.startswith(u"n_")
         return self.bipartite_graph.degree(node)
     
+    def neighbors_count(self, node):
+        '''Get the number of distinct neighbors of a node in constant time.
+        '''
+        return len(self.neighbors_multiplicity[node])
+    
     def neighbors(self, node):
         assert node.startswith(u"n_")
         
@@ -287,6 +593,15 @@ class Hypergraph(Serializable):
         
         return adj_nodes
     
+    def view(self, nodes):
+        '''Get a read-only view of the subgraph induced by the given nodes. The
+        view does not copy anything, so it reflects the current state of the
+        hypergraph and should not be used after nodes of it are removed.
+        :param nodes: A collection of node ids.
+        :return A HypergraphView.
+        '''
+        return HypergraphView(self, nodes)
+    
     def subgraph(self, nodes):
         assert type(nodes) is set
 
@@ -316,10 +631,13 @@ class Hypergraph(Serializable):
             edges = self.edges(pair[0], pair[1])
             for edge in edges:
                 edge_attr = self.edge(edge)
-                if not any(map(lambda dir_perm: dir_perm.index(pair[0]) < dir_perm.index(pair[1]), edge_attr["direction"])):
+                endpoints = edge_attr["endpoints"]
+                pair_dirs = PAIR_DIRECTIONS[len(endpoints), edge_attr["dir_mask"]]
+                edge_dir = pair_dirs[endpoints.index(pair[0]), endpoints.index(pair[1])]
+                if edge_dir < 0:
                     # edge direction = -1
                     subgraph.add_edge(pair[1], pair[0], label=edge_attr["labels"][0])
-                elif not any(map(lambda dir_perm: dir_perm.index(pair[0]) > dir_perm.index(pair[1]), edge_attr["direction"])):
+                elif edge_dir > 0:
                     # edge direction = 1
                     subgraph.add_edge(pair[0], pair[1], label=edge_attr["labels"][0])
                 else:
@@ -332,6 +650,9 @@ class Hypergraph(Serializable):
     def add_node_label(self, node_id, label):
         assert node_id.startswith(u"n_")
         
+        if self.label_dag is not None:
+            label = self.label_dag.intern(label)
+        self.unshare_attributes()
         labels = self.bipartite_graph.node[node_id]["labels"]
         labels.append(label)
         if len(labels) > 1:
@@ -341,6 +662,9 @@ class Hypergraph(Serializable):
         assert node_id.startswith(u"n_")
         assert type(labels) is list
         
+        if self.label_dag is not None:
+            labels = map(self.label_dag.intern, labels)
+        self.unshare_attributes()
         self.bipartite_graph.node[node_id]["labels"] = labels
         if len(labels) > 1:
             self.nodes_with_more_labels.add(node_id)
@@ -356,7 +680,7 @@ class Hypergraph(Serializable):
         self.update_parallel_edges_groups(self.edges_2_iter(), init_mode=True)
     
     def try_remove_from_parallel_edges_groups(self, edge_id):
-        key = u",".join(sorted(self.endpoints(edge_id)))
+        key = frozenset(self.endpoints(edge_id))
         if key in self.parallel_edges_groups:
             edges = self.parallel_edges_groups[key]
             if edge_id in edges:
@@ -370,7 +694,7 @@ class Hypergraph(Serializable):
             new_keys = []
             for edge in new_edges:
                 assert edge.startswith(u"e_")
-                key = u",".join(sorted(self.endpoints(edge)))
+                key = frozenset(self.endpoints(edge))
                 if self.parallel_edges_groups.has_key(key):
                     self.parallel_edges_groups[key].append(edge)
                 else:
@@ -384,15 +708,15 @@ class Hypergraph(Serializable):
             for edge_id in new_edges:
                 assert edge_id.startswith(u"e_")
                 if edge_id not in self.self_loops:
-                    endpoints = tuple(sorted(self.endpoints(edge_id)))
-                    if endpoints not in checked_endpoints:
-                        checked_endpoints.add(endpoints)
-                        self.check_for_parallel_edges(endpoints[0], endpoints[1])
+                    key = frozenset(self.endpoints(edge_id))
+                    if key not in checked_endpoints:
+                        checked_endpoints.add(key)
+                        self.check_for_parallel_edges(*key)
     
     def check_for_parallel_edges(self, u, v):
-        par_edges = filter(lambda edge_id: edge_id.startswith(u"e_"), self.edges(u, v))
+        key = frozenset([u, v])
+        par_edges = self.endpoints_index.get(key, [])
         if len(par_edges) > 1:
-            key = u",".join(sorted([u, v]))
             self.parallel_edges_groups[key] = set(par_edges)
     
     def reset_parallel_edges_groups(self):
@@ -403,7 +727,7 @@ class Hypergraph(Serializable):
         self.update_parallel_hedges_groups(self.hedges_iter(), init_mode=True)
     
     def try_remove_from_parallel_hedges_groups(self, hedge_id):
-        key = u",".join(sorted(self.endpoints(hedge_id)))
+        key = frozenset(self.endpoints(hedge_id))
         if key in self.parallel_hedges_groups:
             hedges = self.parallel_hedges_groups[key]
             if hedge_id in hedges:
@@ -417,7 +741,7 @@ class Hypergraph(Serializable):
             new_keys = []
             for hedge in new_hedges:
                 assert hedge.startswith(u"he_")
-                key = u",".join(sorted(self.endpoints(hedge)))
+                key = frozenset(self.endpoints(hedge))
                 if self.parallel_hedges_groups.has_key(key):
                     self.parallel_hedges_groups[key].append(hedge)
                 else:
@@ -431,16 +755,16 @@ class Hypergraph(Serializable):
             for hedge_id in new_hedges:
                 assert hedge_id.startswith(u"he_")
                 if hedge_id not in self.self_loops:
-                    endpoints = tuple(sorted(self.endpoints(hedge_id)))
-                    if endpoints not in checked_endpoints:
-                        checked_endpoints.add(endpoints)
-                        self.check_for_parallel_hedges(endpoints[0], endpoints[1], endpoints[2])
+                    key = frozenset(self.endpoints(hedge_id))
+                    if key not in checked_endpoints:
+                        checked_endpoints.add(key)
+                        self.check_for_parallel_hedges(*key)
     
     def check_for_parallel_hedges(self, u, v, w):
-        par_hedges = self.hedges(u, v, w)
+        key = frozenset([u, v, w])
+        par_hedges = self.endpoints_index.get(key, [])
         if len(par_hedges) > 1:
-            key = u",".join(sorted([u, v, w]))
-            self.parallel_hedges_groups[key] = par_hedges
+            self.parallel_hedges_groups[key] = list(par_hedges)
     
     def reset_parallel_hedges_groups(self):
         self.parallel_hedges_groups = {}
@@ -452,7 +776,7 @@ class Hypergraph(Serializable):
         self.reset_nodes_with_n_neighbors()
         
         for node in self.nodes_iter():
-            neighbors_count = len(self.neighbors(node))
+            neighbors_count = len(self.neighbors_multiplicity[node])
             if neighbors_count == 1:
                 self.nodes_with_1_neighbor.add(node)
             elif neighbors_count == 2:
@@ -467,8 +791,8 @@ class Hypergraph(Serializable):
         new_nodes_with_2_neighbors = set()
         new_nodes_with_3_neighbors = set()
         for node in candidate_nodes:
-            if self.bipartite_graph.has_node(node):
-                neighbors_count = len(self.neighbors(node))
+            if node in self.neighbors_multiplicity:
+                neighbors_count = len(self.neighbors_multiplicity[node])
                 if neighbors_count == 1:
                     new_nodes_with_1_neighbor.add(node)
                 elif neighbors_count == 2:
@@ -497,14 +821,285 @@ class Hypergraph(Serializable):
         self.nodes_with_2_neighbors = set()
         self.nodes_with_3_neighbors = set()
     
+    @contextmanager
+    def batch(self):
+        '''Defer the maintenance of the ready sets (nodes with 1, 2 or 3 neighbors
+        and the parallel edges and hyperedges groups) until the end of a block of
+        modifications. The nodes touched and the edges added inside the block
+        are recorded and the ready sets are updated once for this region on exit,
+        as done by commit_batch. Nested batches are committed by the outermost one.
+        Usage:
+            with hypergraph.batch():
+                hypergraph.remove_edges_from(edges, unsafe=True)
+                hypergraph.add_edge(endpoints)
+        '''
+        self.batch_level += 1
+        try:
+            yield self
+        finally:
+            self.batch_level -= 1
+            if self.batch_level == 0:
+                self.commit_batch()
+    
+    def commit_batch(self):
+        '''Update the ready sets for the nodes touched and the edges added since
+        the last commit. Called automatically on exit from batch().
+        '''
+        new_hedges = set(filter(lambda edge_id: edge_id.startswith(u"he_"), self.batch_new_edges))
+        self.update_parallel_edges_groups(self.batch_new_edges - new_hedges)
+        self.update_parallel_hedges_groups(new_hedges)
+        self.update_nodes_with_n_neighbors(self.batch_touched_nodes)
+        self.nodes_with_more_labels -= self.batch_touched_nodes - self.nodes_registry
+        
+        self.batch_touched_nodes = set()
+        self.batch_new_edges = set()
+    
+    def reorder(self, method="rcm"):
+        '''Renumber the nodes so that adjacent nodes get close ID's, which improves
+        the memory locality of whole-graph passes once the hypergraph is converted
+        to an integer-backed CompactHypergraph or an array format. The edges are
+        renumbered in the order of their endpoints.
+        :param method: (default "rcm") The node ordering: "bfs" (breadth-first
+        search), "rcm" (reverse Cuthill-McKee) or "degree" (decreasing degree).
+        :return A tuple (reordered_hypergraph, node_map), where node_map maps the
+        old node ID's to the new ones. The new ID's are n_0, n_1, ..., so an
+        integer ID i of the original graph (e.g. in uri_node_map) becomes
+        int(node_map[u"n_{i}"][2:]).
+        '''
+        ordering = node_ordering.get_ordering(sorted(self.nodes_iter()), lambda node: self.neighbors_multiplicity[node], method)
+        node_map = {node: u"n_{0}".format(i) for i, node in enumerate(ordering)}
+        
+        reordered_hypergraph = Hypergraph()
+        for node in ordering:
+            attr_dict = dict(self.node[node])
+            attr_dict["labels"] = list(attr_dict["labels"])
+            reordered_hypergraph.add_node(node_map[node], attr_dict=attr_dict)
+        
+        edge_keys = {}
+        for edge in self.edges_iter():
+            edge_keys[edge] = sorted(int(node_map[node][2:]) for node in self.endpoints(edge))
+        for edge in sorted(edge_keys, key=lambda edge: (edge_keys[edge], edge)):
+            edge_attr = self.edge(edge)
+            direction = set(tuple(node_map[node] for node in perm) for perm in self.edge_direction(edge))
+            reordered_hypergraph.add_edge(set(node_map[node] for node in edge_attr["endpoints"]), direction, edge_attr["labels"][0])
+        
+        reordered_hypergraph.init_parallel_edges_groups()
+        reordered_hypergraph.init_parallel_hedges_groups()
+        reordered_hypergraph.init_nodes_with_n_neighbors()
+        
+        return reordered_hypergraph, node_map
+    
+    def structural_hash(self, include_labels=True, iterations=None):
+        '''Compute a deterministic 64-bit hash of the hypergraph, which is invariant
+        under renaming of the nodes and edges. The nodes and edges are colored by
+        refine_colors and the final coloring is folded into a digest (see
+        hash_colors). Note: isomorphic hypergraphs always have the same hash,
+        but (as for any hash) different hypergraphs may collide, e.g. ones which
+        color refinement cannot distinguish.
+        :param include_labels: (default True) If True, the node and edge labels
+        are part of the hash. Otherwise only the structure (including the edge
+        directions) is hashed.
+        :param iterations: (optional) The number of refinement iterations. By
+        default the refinement is performed until the coloring is stable.
+        :return A non-negative integer smaller than 2^64.
+        '''
+        node_colors, edge_colors = self.refine_colors(include_labels, iterations)
+        return hash_colors(node_colors, edge_colors)
+    
+    def refine_colors(self, include_labels=True, iterations=None):
+        '''Color the nodes and edges by Weisfeiler-Lehman style color refinement
+        of the bipartite graph, where each node is connected to its edges by a
+        role encoding whether the node is a source and/or a target of the edge.
+        The colors do not depend on the names of the nodes and edges.
+        :param include_labels: (default True) If True, the initial colors are
+        given by the node and edge labels.
+        :param iterations: (optional) The number of refinement iterations. By
+        default the refinement is performed until the coloring is stable.
+        :return A tuple (node_colors, edge_colors) of dictionaries mapping the
+        nodes and the edges to 64-bit colors.
+        '''
+        node_colors = {}
+        for node in self.nodes_registry:
+            if include_labels:
+                node_colors[node] = _hash_64_values(sorted(map(_hash_64_label, self.node[node]["labels"])))
+            else:
+                node_colors[node] = 0
+        
+        edge_colors = {}
+        edge_roles = {}
+        node_roles = {node: [] for node in self.nodes_registry}
+        for edge in itertools.chain(self.edges_registry, self.hedges_registry):
+            edge_attr = self.edge(edge)
+            endpoints = edge_attr["endpoints"]
+            is_source, is_target = DIRECTION_FLAGS[len(endpoints), edge_attr["dir_mask"]]
+            edge_roles[edge] = []
+            for i, node in enumerate(endpoints):
+                role = 1 + is_source[i] + 2 * is_target[i]
+                edge_roles[edge].append((node, role))
+                node_roles[node].append((edge, role))
+            label_hash = _hash_64_label(edge_attr["labels"][0]) if include_labels else 0
+            edge_colors[edge] = _hash_64_values([len(endpoints), label_hash])
+        
+        colors_count = len(set(node_colors.itervalues())) + len(set(edge_colors.itervalues()))
+        i = 0
+        while iterations is None or i < iterations:
+            new_edge_colors = {}
+            for edge, roles in edge_roles.iteritems():
+                signature = sorted(_hash_64_values([node_colors[node], role]) for node, role in roles)
+                new_edge_colors[edge] = _hash_64_values([edge_colors[edge]] + signature)
+            new_node_colors = {}
+            for node, roles in node_roles.iteritems():
+                signature = sorted(_hash_64_values([edge_colors[edge], role]) for edge, role in roles)
+                new_node_colors[node] = _hash_64_values([node_colors[node]] + signature)
+            node_colors = new_node_colors
+            edge_colors = new_edge_colors
+            i += 1
+            
+            if iterations is None:
+                new_colors_count = len(set(node_colors.itervalues())) + len(set(edge_colors.itervalues()))
+                if new_colors_count == colors_count:
+                    break
+                colors_count = new_colors_count
+        
+        return node_colors, edge_colors
+    
     def to_nx_graph(self):
         return self.subgraph_with_labels(set(self.nodes_iter()))
     
+    def memory_report(self):
+        '''Estimate the memory used by the parts of the hypergraph (see memory.deep_sizeof).
+        :return A dictionary mapping the component names to their sizes in bytes
+        and "total" to the sum. The labels are counted with the node and edge
+        attributes, even though they are interned in the shared vocabulary. An
+        adjacency structure shared with a copy (see copy()) is counted fully.
+        '''
+        node_attributes = []
+        edge_attributes = []
+        for vertex, attr in self.bipartite_graph.node.iteritems():
+            if vertex in self.nodes_registry:
+                node_attributes.append(attr)
+            else:
+                edge_attributes.append(attr)
+        
+        ready_sets = [self.nodes_with_1_neighbor, self.nodes_with_2_neighbors, self.nodes_with_3_neighbors,
+                      self.nodes_with_more_labels, self.self_loops]
+        components = [
+            ("adjacency", [self.bipartite_graph.adj]),
+            ("node_attributes", node_attributes),
+            ("edge_attributes", edge_attributes),
+            ("registries", [self.nodes_registry, self.edges_registry, self.hedges_registry]),
+            ("neighbors_multiplicity", [self.neighbors_multiplicity]),
+            ("endpoints_index", [self.endpoints_index, self.hedges_pairs_index]),
+            ("ready_sets", ready_sets),
+            ("parallel_groups", [self.parallel_edges_groups, self.parallel_hedges_groups]),
+            ("other", [self])
+        ]
+        
+        return memory.components_report(components)
+    
     def visualize(self):
         nxext.visualize_graph(self.bipartite_graph, bipartite=True, edge_labels=False)
     
-    def copy(self):
-        return copy.deepcopy(self)
+    def copy(self, deep=False):
+        '''Copy the hypergraph.
+        :param deep: If True, the whole hypergraph is deep-copied. Otherwise the
+        structure (the adjacency of the bipartite graph, the registries, the
+        neighbors multiplicities and the endpoints indices) and the node and edge
+        attributes (including the labels) are shared between the copy and the
+        original (copy-on-write). A hypergraph gets its own structure on its first
+        structural modification (see unshare_structure) and its own attributes
+        on its first label modification (see unshare_attributes), but only if
+        another hypergraph sharing them is still alive, so the last owner does
+        not copy anything. Only the ready sets are copied right away.
+        :return A copy of the hypergraph.
+        '''
+        if deep:
+            return copy.deepcopy(self)
+        
+        new_bipartite_graph = nx.Graph()
+        new_bipartite_graph.graph = dict(self.bipartite_graph.graph)
+        new_bipartite_graph.node = self.bipartite_graph.node
+        new_bipartite_graph.adj = self.bipartite_graph.adj
+        new_bipartite_graph.edge = new_bipartite_graph.adj
+        
+        new_hypergraph = Hypergraph.__new__(Hypergraph)
+        for attr, value in self.__dict__.iteritems():
+            if attr in ["bipartite_graph", "node", "structure_owners", "attributes_owners"]:
+                continue
+            elif attr in Hypergraph.SHARED_STRUCTURE:
+                pass
+            elif type(value) is set:
+                value = set(value)
+            elif type(value) is dict:
+                value = {key: copy.copy(group) for key, group in value.iteritems()}
+            new_hypergraph.__dict__[attr] = value
+        new_hypergraph.bipartite_graph = new_bipartite_graph
+        new_hypergraph.node = new_bipartite_graph.node
+        
+        # the hypergraphs sharing the structure and the attributes: id -> weak reference
+        for owners_attr in ["structure_owners", "attributes_owners"]:
+            owners = getattr(self, owners_attr)
+            if owners is None:
+                owners = {id(self): weakref.ref(self)}
+                setattr(self, owners_attr, owners)
+            owners[id(new_hypergraph)] = weakref.ref(new_hypergraph)
+            setattr(new_hypergraph, owners_attr, owners)
+        
+        return new_hypergraph
+    
+    def _leave_owners(self, owners_attr):
+        '''Stop sharing the structure or the attributes (see copy()).
+        :return True if another live hypergraph still shares them, i.e. they
+        have to be copied.
+        '''
+        owners = getattr(self, owners_attr)
+        setattr(self, owners_attr, None)
+        del owners[id(self)]
+        for owner_ref in owners.itervalues():
+            if owner_ref() is not None:
+                return True
+        return False
+    
+    def unshare_structure(self):
+        '''Give the hypergraph its own adjacency structure, if it is still shared
+        with a copy (see copy()). Has to be called before modifying the bipartite graph.
+        '''
+        if self.structure_owners is not None and self._leave_owners("structure_owners"):
+            adj = {vertex: dict(nbrs) for vertex, nbrs in self.bipartite_graph.adj.iteritems()}
+            self.bipartite_graph.adj = adj
+            self.bipartite_graph.edge = adj
+            if self.attributes_owners is not None:
+                # the vertices are added to and removed from its own dictionary, the attributes stay shared
+                self.bipartite_graph.node = dict(self.bipartite_graph.node)
+                self.node = self.bipartite_graph.node
+            self.nodes_registry = set(self.nodes_registry)
+            self.edges_registry = set(self.edges_registry)
+            self.hedges_registry = set(self.hedges_registry)
+            self.neighbors_multiplicity = {node: dict(neighbors) for node, neighbors in self.neighbors_multiplicity.iteritems()}
+            self.endpoints_index = {key: set(edges) for key, edges in self.endpoints_index.iteritems()}
+            self.hedges_pairs_index = {key: set(hedges) for key, hedges in self.hedges_pairs_index.iteritems()}
+    
+    def unshare_attributes(self):
+        '''Give the hypergraph its own node and edge attributes, if they are still
+        shared with a copy (see copy()). Has to be called before modifying the
+        attributes (e.g. the labels) in place.
+        '''
+        if self.attributes_owners is not None and self._leave_owners("attributes_owners"):
+            node = {}
+            for vertex, attr in self.bipartite_graph.node.iteritems():
+                new_attr = dict(attr)
+                if "labels" in new_attr:
+                    new_attr["labels"] = list(new_attr["labels"])
+                node[vertex] = new_attr
+            self.bipartite_graph.node = node
+            self.node = node
+    
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        # a pickled or deep-copied hypergraph has its own structure and attributes
+        state["structure_owners"] = None
+        state["attributes_owners"] = None
+        return state
     
     # NOTE: does not check isomorphism
     def __eq__(self, other):
@@ -514,6 +1109,9 @@ class Hypergraph(Serializable):
             # do not compare networkx graphs
             del self_dict["bipartite_graph"]
             del other_dict["bipartite_graph"]
+            for attr in ["structure_owners", "attributes_owners"]:
+                self_dict.pop(attr, None)
+                other_dict.pop(attr, None)
             return self_dict == other_dict
         else:
             return False
@@ -521,9 +1119,19 @@ class Hypergraph(Serializable):
     def __ne__(self, other):
         return not self.__eq__(other)
 
-    def __init__(self, nx_graph = nx.Graph()):
+    def __init__(self, nx_graph = nx.Graph(), vocabulary=None):
+        '''Constructor
+        :param nx_graph: (optional) A Networkx graph or a HypergraphView.
+        :param vocabulary: (optional) The LabelVocabulary to intern the labels
+        of the graph in, by default default_vocabulary.
+        '''
+        if vocabulary is None:
+            vocabulary = default_vocabulary
         self.bipartite_graph = nx.Graph()
         self.node = self.bipartite_graph.node
+        # the hypergraphs sharing the structure and the attributes with this one (see copy())
+        self.structure_owners = None
+        self.attributes_owners = None
         self.next_edge_index = 0
         self.next_hedge_index = 0
         
@@ -531,6 +1139,27 @@ class Hypergraph(Serializable):
         self.edges_count = 0
         self.hedges_count = 0
         
+        # registries of the vertices of the bipartite graph
+        self.nodes_registry = set()
+        self.edges_registry = set()
+        self.hedges_registry = set()
+        
+        # node -> {neighbor: number of edges shared with the neighbor}
+        self.neighbors_multiplicity = {}
+        
+        # frozenset of endpoints -> ids of the edges with exactly these endpoints
+        self.endpoints_index = {}
+        # frozenset of two nodes -> ids of the hyperedges containing both nodes
+        self.hedges_pairs_index = {}
+        
+        # nodes touched and edges added inside a batch (see batch())
+        self.batch_level = 0
+        self.batch_touched_nodes = set()
+        self.batch_new_edges = set()
+        
+        # (optional) a LabelDAG interning the labels of the added edges and node labels
+        self.label_dag = None
+        
         # ready sets
         self.reset_nodes_with_more_labels()
         self.reset_self_loops()
@@ -538,13 +1167,22 @@ class Hypergraph(Serializable):
         
         # add nodes
         for node in nx_graph.nodes_iter():
-            self.add_node(node, attr_dict=copy.deepcopy(nx_graph.node[node]))
+            attr_dict = copy.deepcopy(nx_graph.node[node])
+            attr_dict["labels"] = [vocabulary.intern(label) for label in attr_dict["labels"]]
+            self.add_node(node, attr_dict=attr_dict)
         
         # add edges of order 2
+        if type(nx_graph) is HypergraphView:
+            # hyperedges of the viewed hypergraph are split to edges as in subgraph_with_labels
+            get_adj_nodes = nx_graph.get_adj_nodes
+            get_edge_labels_and_dirs = nx_graph.get_edge_labels_and_dirs
+        else:
+            get_adj_nodes = lambda: nxext.get_all_adjacent_nodes(nx_graph)
+            get_edge_labels_and_dirs = lambda u, v: nxext.get_edge_labels_and_dirs(nx_graph, u, v)
         if nx_graph.is_directed():
-            adj_nodes = nxext.get_all_adjacent_nodes(nx_graph)
+            adj_nodes = get_adj_nodes()
             for pair in adj_nodes:
-                edges = nxext.get_edge_labels_and_dirs(nx_graph, pair[0], pair[1])
+                edges = get_edge_labels_and_dirs(pair[0], pair[1])
                 u = Hypergraph.format_node_id(pair[0])
                 v = Hypergraph.format_node_id(pair[1])
                 for edge in edges:
@@ -555,7 +1193,7 @@ class Hypergraph(Serializable):
                         direction = set([(u, v)])
                     else:
                         direction = set([(v, u)])
-                    self.add_edge(set([u, v]), direction=direction, label=copy.deepcopy(edge[0]))
+                    self.add_edge(set([u, v]), direction=direction, label=vocabulary.intern(edge[0]))
         else:
             for edge_endpoints in nx_graph.edges_iter():
                 u = u"n_{0}".format(edge_endpoints[0])
@@ -563,11 +1201,140 @@ class Hypergraph(Serializable):
                 if nx_graph.is_multigraph():
                     edges = nx_graph[edge_endpoints[0]][edge_endpoints[1]]
                     for i in range(len(edges)):
-                        self.add_edge(set([u, v]), label=edges[i]["label"])
+                        self.add_edge(set([u, v]), label=vocabulary.intern(edges[i]["label"]))
                 else:
                     edge_label = nx_graph.edge[edge_endpoints[0]][edge_endpoints[1]]["label"]
-                    self.add_edge(set([u, v]), label=copy.deepcopy(edge_label))
+                    self.add_edge(set([u, v]), label=vocabulary.intern(edge_label))
         
         # Initialize ready sets
         self.init_parallel_edges_groups()
         self.init_nodes_with_n_neighbors()
+
+
+class ViewNodeAttributes(object):
+    '''A read-only mapping from the nodes of a HypergraphView to their attribute
+    dictionaries in the viewed hypergraph.
+    '''
+    
+    def __init__(self, hypergraph, nodes_set):
+        self.hypergraph = hypergraph
+        self.nodes_set = nodes_set
+    
+    def __getitem__(self, node):
+        if node not in self.nodes_set:
+            raise KeyError(node)
+        return self.hypergraph.node[node]
+    
+    def __contains__(self, node):
+        return node in self.nodes_set
+    
+    def __iter__(self):
+        return iter(self.nodes_set)
+    
+    def __len__(self):
+        return len(self.nodes_set)
+
+class HypergraphView(object):
+    '''A read-only view of the subgraph of a Hypergraph induced by a set of nodes.
+    It answers the node, neighbor, edge and label queries of the subgraph from
+    the hypergraph itself, without building a new graph. Like subgraph_with_labels,
+    the view contains the edges and hyperedges with at least two endpoints in
+    the node set. A networkx graph can be obtained by materialize(). The view
+    can also be passed where a feature graph is expected (the Hypergraph
+    constructor and shingle extraction accept it directly).
+    '''
+    
+    def number_of_nodes(self):
+        return len(self.nodes_set)
+    
+    def has_node(self, node):
+        return node in self.nodes_set
+    
+    def nodes_iter(self, data=False):
+        if data:
+            return ((node, self.node[node]) for node in self.nodes_set)
+        else:
+            return iter(self.nodes_set)
+    
+    def nodes(self, data=False):
+        return list(self.nodes_iter(data))
+    
+    def is_directed(self):
+        return True
+    
+    def edge(self, edge_id):
+        return self.hypergraph.edge(edge_id)
+    
+    def endpoints(self, edge_id):
+        '''Get the endpoints of an edge, which are in the view.
+        '''
+        return filter(lambda node: node in self.nodes_set, self.hypergraph.endpoints(edge_id))
+    
+    def edges_iter(self, u=None, v=None):
+        def all_edges():
+            checked_edges = set()
+            for node in self.nodes_set:
+                for edge in self.hypergraph.edges_iter(node):
+                    if edge not in checked_edges:
+                        checked_edges.add(edge)
+                        if len(self.endpoints(edge)) > 1:
+                            yield edge
+        
+        if u:
+            assert u in self.nodes_set
+            if v:
+                assert v in self.nodes_set
+            return (edge for edge in self.hypergraph.edges_iter(u, v) if len(self.endpoints(edge)) > 1)
+        else:
+            return all_edges()
+    
+    def edges(self, u=None, v=None):
+        return list(self.edges_iter(u, v))
+    
+    def neighbors(self, node):
+        assert node in self.nodes_set
+        return filter(lambda neighbor: neighbor in self.nodes_set, self.hypergraph.neighbors_multiplicity[node])
+    
+    def get_adj_nodes(self):
+        '''Get the pairs of adjacent nodes in the view as sorted tuples.
+        '''
+        return self.hypergraph.get_adj_nodes(set(self.nodes_set))
+    
+    def get_edge_labels_and_dirs(self, u, v):
+        '''Get the labels and the direction codes of the edges between u and v
+        in the same form as nxext.get_edge_labels_and_dirs for the materialized
+        view (a hyperedge counts as an edge between each pair of its endpoints).
+        '''
+        edges_u_to_v = []
+        edges_v_to_u = []
+        for edge in self.edges_iter(u, v):
+            edge_attr = self.edge(edge)
+            endpoints = edge_attr["endpoints"]
+            pair_dirs = PAIR_DIRECTIONS[len(endpoints), edge_attr["dir_mask"]]
+            edge_dir = pair_dirs[endpoints.index(u), endpoints.index(v)]
+            if edge_dir >= 0:
+                edges_u_to_v.append(edge_attr["labels"][0])
+            if edge_dir <= 0:
+                edges_v_to_u.append(edge_attr["labels"][0])
+        return nxext.merge_edge_labels_and_dirs(edges_u_to_v, edges_v_to_u)
+    
+    def materialize(self, with_labels=True):
+        '''Build a networkx graph of the view.
+        :param with_labels: (default True) If True, a MultiDiGraph with the node
+        and edge labels is built (as by Hypergraph.subgraph_with_labels). Otherwise
+        an unlabeled nx.Graph (as by Hypergraph.subgraph).
+        '''
+        if with_labels:
+            return self.hypergraph.subgraph_with_labels(set(self.nodes_set))
+        else:
+            return self.hypergraph.subgraph(set(self.nodes_set))
+    
+    def __init__(self, hypergraph, nodes):
+        '''Constructor
+        :param hypergraph: The viewed Hypergraph.
+        :param nodes: The node ids of the induced subgraph.
+        '''
+        assert not filter(lambda n: not hypergraph.has_node(n), nodes)
+        self.hypergraph = hypergraph
+        self.nodes_set = frozenset(nodes)
+        self.node = ViewNodeAttributes(hypergraph, self.nodes_set)
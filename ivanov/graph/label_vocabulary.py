@@ -0,0 +1,98 @@
+'''
+Created on Mar 9, 2016
+
+@author: Ivan Ivanov
+
+A vocabulary of interned node and edge labels.
+'''
+
+from ivanov.inout.serializable import Serializable
+import array
+
+class LabelVocabulary(Serializable):
+    '''Maps label strings to consecutive int32 ID's. Each distinct label is stored
+    only once. Hypergraph, Weisfeiler-Lehman and the RDF coloring use it only
+    for string interning: they keep the labels as strings (the canonical strings
+    are built from them), but equal labels are the same object returned by
+    intern. The int32 ID's are used by CompactHypergraph, which keeps a
+    vocabulary of its own.
+    '''
+    
+    MAX_LABELS = 2 ** 31 - 1
+    
+    def get_id(self, label):
+        '''Get the ID of a label. The label is added to the vocabulary if needed.
+        '''
+        label_id = self.label_ids.get(label)
+        if label_id is None:
+            label_id = len(self.labels)
+            assert label_id < LabelVocabulary.MAX_LABELS
+            self.label_ids[label] = label_id
+            self.labels.append(label)
+        return label_id
+    
+    def get_ids(self, labels):
+        '''Get the ID's of a list of labels as an int32 array.
+        '''
+        return array.array("i", [self.get_id(label) for label in labels])
+    
+    def get_label(self, label_id):
+        return self.labels[label_id]
+    
+    def get_labels(self, label_ids):
+        return [self.labels[label_id] for label_id in label_ids]
+    
+    def intern(self, label):
+        '''Get the instance of the label stored in the vocabulary (the label is
+        added if needed). Equal labels interned in the same vocabulary are the
+        same object.
+        '''
+        return self.labels[self.get_id(label)]
+    
+    def clear(self):
+        '''Remove all labels. The ID's given out before are no longer valid, so
+        the vocabulary should be cleared only when the graphs, which refer to
+        it by ID (e.g. CompactHypergraph), are not used anymore (e.g. between
+        two datasets).
+        '''
+        self.labels = []
+        self.label_ids = {}
+    
+    def __contains__(self, label):
+        return label in self.label_ids
+    
+    def __len__(self):
+        return len(self.labels)
+    
+    def __eq__(self, other):
+        if isinstance(other, self.__class__):
+            return self.labels == other.labels
+        else:
+            return False
+    
+    def __ne__(self, other):
+        return not self.__eq__(other)
+    
+    def __init__(self, labels=None):
+        '''Constructor
+        :param labels: (optional) Initial labels.
+        '''
+        self.labels = []
+        self.label_ids = {}
+        if labels:
+            for label in labels:
+                self.get_id(label)
+
+# the vocabulary, in which Hypergraph, Weisfeiler-Lehman and the RDF coloring
+# intern their labels, if no vocabulary is passed to them. It grows with every
+# distinct label, so it should be reset for each dataset (as mine_similar_nodes
+# does at the start of a run) or a dataset can be processed with its own vocabulary.
+default_vocabulary = LabelVocabulary()
+
+def reset_default_vocabulary():
+    '''Clear the default vocabulary (see LabelVocabulary.clear). This is safe at any
+    time, because the graphs, which use the default vocabulary, keep their labels
+    as strings; the labels interned before are just not shared with the ones
+    interned after the reset.
+    '''
+    default_vocabulary.clear()
@@ -0,0 +1,90 @@
+'''
+Created on Mar 14, 2016
+
+@author: Ivan Ivanov
+
+Node orderings which place adjacent nodes close to each other, so that
+renumbering the nodes improves the memory locality of graph traversals.
+'''
+
+from collections import deque
+
+def bfs_ordering(nodes, neighbors):
+    '''Order the nodes by breadth-first search. Each connected component is
+    started from its first node in nodes.
+    :param nodes: The nodes in a deterministic order (e.g. sorted).
+    :param neighbors: A function which returns the neighbors of a node.
+    :return A list of the nodes in the new order.
+    '''
+    ordering = []
+    visited = set()
+    for start in nodes:
+        if start in visited:
+            continue
+        visited.add(start)
+        queue = deque([start])
+        while queue:
+            node = queue.popleft()
+            ordering.append(node)
+            for neighbor in sorted(neighbors(node)):
+                if neighbor not in visited:
+                    visited.add(neighbor)
+                    queue.append(neighbor)
+    return ordering
+
+def reverse_cuthill_mckee_ordering(nodes, neighbors):
+    '''Order the nodes by the reverse Cuthill-McKee algorithm, which reduces the
+    bandwidth of the adjacency matrix. Each connected component is started from
+    a node of minimum degree and the neighbors are visited by increasing degree.
+    :param nodes: The nodes in a deterministic order (e.g. sorted).
+    :param neighbors: A function which returns the neighbors of a node.
+    :return A list of the nodes in the new order.
+    '''
+    nodes = list(nodes)
+    degrees = {node: len(neighbors(node)) for node in nodes}
+    ordering = []
+    visited = set()
+    for start in sorted(nodes, key=lambda node: degrees[node]):
+        if start in visited:
+            continue
+        visited.add(start)
+        queue = deque([start])
+        while queue:
+            node = queue.popleft()
+            ordering.append(node)
+            new_neighbors = [neighbor for neighbor in neighbors(node) if neighbor not in visited]
+            new_neighbors.sort(key=lambda neighbor: (degrees[neighbor], neighbor))
+            for neighbor in new_neighbors:
+                visited.add(neighbor)
+                queue.append(neighbor)
+    ordering.reverse()
+    return ordering
+
+def degree_ordering(nodes, neighbors):
+    '''Order the nodes by decreasing degree, so that the hubs, which are visited
+    most often, are stored together.
+    :param nodes: The nodes in a deterministic order (e.g. sorted).
+    :param neighbors: A function which returns the neighbors of a node.
+    :return A list of the nodes in the new order.
+    '''
+    nodes = list(nodes)
+    degrees = {node: len(neighbors(node)) for node in nodes}
+    # sorted is stable, so nodes of equal degree keep their order
+    return sorted(nodes, key=lambda node: -degrees[node])
+
+ORDERINGS = {
+    "bfs": bfs_ordering,
+    "rcm": reverse_cuthill_mckee_ordering,
+    "degree": degree_ordering
+}
+
+def get_ordering(nodes, neighbors, method="rcm"):
+    '''Order the nodes by one of the methods in ORDERINGS.
+    :param nodes: The nodes in a deterministic order (e.g. sorted).
+    :param neighbors: A function which returns the neighbors of a node.
+    :param method: (default "rcm") "bfs", "rcm" (reverse Cuthill-McKee) or "degree".
+    :return A list of the nodes in the new order.
+    '''
+    if method not in ORDERINGS:
+        raise ValueError("Unknown node ordering '{0}'.".format(method))
+    return ORDERINGS[method](nodes, neighbors)
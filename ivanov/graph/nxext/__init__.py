@@ -62,9 +62,19 @@ def get_self_loops(graph):
     return filter(lambda edge: edge[0] == edge[1], graph.edges_iter())
 
 def get_edge_labels_and_dirs(graph, u, v):
-    labels_and_dirs = []
     edges_u_to_v = get_edge_labels_raw(graph, u, v)
     edges_v_to_u = get_edge_labels_raw(graph, v, u)
+    return merge_edge_labels_and_dirs(edges_u_to_v, edges_v_to_u)
+
+def merge_edge_labels_and_dirs(edges_u_to_v, edges_v_to_u):
+    '''Pair the labels of the edges u -> v with equal labels of the edges v -> u.
+    :param edges_u_to_v: The labels of the edges directed from u to v.
+    :param edges_v_to_u: The labels of the edges directed from v to u (the
+    list is modified).
+    :return A list of tuples (label, dir_code), where dir_code is 0 for a pair
+    of opposite edges, 1 for u -> v and -1 for v -> u.
+    '''
+    labels_and_dirs = []
     for edge_label in edges_u_to_v:
         if edge_label in edges_v_to_u:
             labels_and_dirs.append((edge_label, 0))
@@ -9,6 +9,7 @@ from SPARQLWrapper import SPARQLWrapper, JSON
 from rdflib import Graph as RDFGraph
 from RDFClosure import convert_graph
 from rdflib import RDF, RDFS, OWL
+from ivanov.graph.label_vocabulary import default_vocabulary
 from ivanov import helpers
 import networkx as nx
 import rdflib
@@ -23,7 +24,7 @@ def read_graph(in_files, file_format=None):
     return rdf_graph
 
 def convert_rdf_to_nx_graph(in_files, labels="colors", discard_classes=True, test_mode=False, return_colors=False,
-                            base_colors=None, next_color_id=None, encode_boolean_value_in_color=False):
+                            base_colors=None, next_color_id=None, encode_boolean_value_in_color=False, vocabulary=None):
     '''Converts an RDFLib graph to a Networkx graph.
     :param in_files: Files containing the RDF data.
     :param labels (optional): Set labels of the Networkx graph to be: (by default) "colors" - nodes have the 
@@ -35,6 +36,7 @@ def convert_rdf_to_nx_graph(in_files, labels="colors", discard_classes=True, tes
     :param base_colors: A pre-difined mapping of RDF types to color id's to be used and extended.
     :param next_color_id: An integer with which the new color id's will start.
     :param encode_boolean_value_in_color: When a node is of type boolean literal, append the boolean value to the type of the node.
+    :param vocabulary: (optional) The LabelVocabulary to intern the colors in, by default default_vocabulary.
     :return: (nx_graph, uri_node_map[, colors, next_color_id])
     '''
     assert type(in_files) in [list, set]
@@ -42,10 +44,12 @@ def convert_rdf_to_nx_graph(in_files, labels="colors", discard_classes=True, tes
     rdf_graph = read_graph(in_files)
     return convert_rdf_graph_to_nx_graph(rdf_graph, labels=labels, discard_classes=discard_classes, test_mode=test_mode,
                                          return_colors=return_colors, base_colors=base_colors, next_color_id=next_color_id,
-                                         encode_boolean_value_in_color=encode_boolean_value_in_color)
+                                         encode_boolean_value_in_color=encode_boolean_value_in_color, vocabulary=vocabulary)
 
 def convert_rdf_graph_to_nx_graph(rdf_graph, labels="colors", discard_classes=True, test_mode=False, return_colors=False,
-                                  base_colors=None, next_color_id=None, encode_boolean_value_in_color=False):
+                                  base_colors=None, next_color_id=None, encode_boolean_value_in_color=False, vocabulary=None):
+    if vocabulary is None:
+        vocabulary = default_vocabulary
     nx_graph = nx.MultiDiGraph()
     
     if test_mode:
@@ -78,10 +82,10 @@ def convert_rdf_graph_to_nx_graph(rdf_graph, labels="colors", discard_classes=Tr
             color_id = next_color_id
         else:
             colors = {
-                thing_uri: "0",
+                thing_uri: vocabulary.intern("0"),
 #                 u"bnode": "1", # TODO: is the bnode color needed?
 #                 u"literal": "2", # TODO: is the literal color needed?
-                u"http://www.w3.org/2001/XMLSchema#string": "1" # default literal type
+                u"http://www.w3.org/2001/XMLSchema#string": vocabulary.intern("1") # default literal type
             }
             color_id = 2
         
@@ -110,7 +114,7 @@ def convert_rdf_graph_to_nx_graph(rdf_graph, labels="colors", discard_classes=Tr
                     for node_type in types:
                         node_type_raw = unicode(node_type)
                         if node_type_raw not in colors:
-                            colors[node_type_raw] = str(color_id)
+                            colors[node_type_raw] = vocabulary.intern(str(color_id))
                             color_id += 1
                         node_colors.add(colors[node_type_raw])
                 elif node_kind is Literal:
@@ -123,7 +127,7 @@ def convert_rdf_graph_to_nx_graph(rdf_graph, labels="colors", discard_classes=Tr
                                 bool_value_str = unicode(node._value)
                                 datatype += '_' + bool_value_str
                         if datatype not in colors:
-                            colors[datatype] = str(color_id)
+                            colors[datatype] = vocabulary.intern(str(color_id))
                             color_id += 1
                     else:
                         datatype = u"http://www.w3.org/2001/XMLSchema#string"
@@ -149,7 +153,7 @@ def convert_rdf_graph_to_nx_graph(rdf_graph, labels="colors", discard_classes=Tr
             o_id = uri_node_map[unicode(o)]
             p_raw = unicode(p)
             if p_raw not in colors:
-                    colors[p_raw] = str(color_id)
+                    colors[p_raw] = vocabulary.intern(str(color_id))
                     color_id += 1
             nx_graph.add_edge(s_id, o_id, label=colors[p_raw])
     
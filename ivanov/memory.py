@@ -0,0 +1,93 @@
+'''
+Created on Mar 16, 2016
+
+@author: Ivan Ivanov
+
+Estimation of the memory used by objects and containers.
+'''
+
+from collections import deque
+import numpy as np
+import types
+import array
+import sys
+
+# objects which are not owned by the measured data (code, classes, modules)
+SKIPPED_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType,
+                 types.MethodType, types.ClassType)
+
+def deep_sizeof(obj, seen=None):
+    '''Estimate the memory used by an object and all objects reachable from it
+    through containers and instance attributes (in bytes). Each object is
+    counted once. The data of numpy arrays is counted only if the array owns
+    it, so memory-mapped arrays count only their headers.
+    :param obj: Any object.
+    :param seen: (optional) A set of the id's of objects which were already
+    counted. It is updated, so it can be shared between calls to count the
+    objects referenced from several places only once.
+    :return The number of bytes.
+    '''
+    if seen is None:
+        seen = set()
+    
+    size = 0
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, SKIPPED_TYPES):
+            continue
+        seen.add(id(current))
+        
+        size += sys.getsizeof(current)
+        if isinstance(current, (np.ndarray, array.array, bytearray, basestring)):
+            continue
+        elif isinstance(current, dict):
+            stack.extend(current.iterkeys())
+            stack.extend(current.itervalues())
+        elif isinstance(current, (list, tuple, set, frozenset, deque)):
+            stack.extend(current)
+        else:
+            if hasattr(current, "__dict__"):
+                stack.append(current.__dict__)
+            for slot in getattr(type(current), "__slots__", ()):
+                if hasattr(current, slot):
+                    stack.append(getattr(current, slot))
+    
+    return size
+
+def components_report(components, seen=None):
+    '''Build a memory report of named components.
+    :param components: A list of tuples (name, objects), where objects is a
+    list of the objects belonging to the component.
+    :param seen: (optional) See deep_sizeof.
+    :return A dictionary mapping each component name to its size in bytes
+    and "total" to the sum. Objects shared between components are counted
+    for the first one only.
+    '''
+    if seen is None:
+        seen = set()
+    
+    report = {}
+    for name, objects in components:
+        report[name] = sum(deep_sizeof(obj, seen) for obj in objects)
+    report["total"] = sum(report.itervalues())
+    
+    return report
+
+def dict_report(container, seen=None):
+    '''Build a memory report of a dictionary with one component per key
+    (e.g. of a wl_state or of the state of a dataset_manager job).
+    :param container: A dictionary.
+    :param seen: (optional) See deep_sizeof.
+    :return A dictionary mapping each key of the container to the size of
+    its value in bytes and "total" to the size of the whole container.
+    '''
+    if seen is None:
+        seen = set()
+    
+    seen.add(id(container))
+    components = [(key, [key, container[key]]) for key in sorted(container)]
+    report = components_report(components, seen)
+    report["total"] += sys.getsizeof(container)
+    
+    return report
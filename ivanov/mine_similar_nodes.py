@@ -6,10 +6,14 @@ Created on Jan 13, 2016
 
 from ivanov.graph.algorithms.similar_graphs_mining.characteristic_matrix import CharacteristicMatrix
 from ivanov.graph.algorithms.similar_graphs_mining.sketch_matrix import SketchMatrix
-from ivanov.graph.algorithms import similar_nodes_mining
+from ivanov.graph.algorithms import similar_nodes_mining, arnborg_proskurowski
+from ivanov.graph.compact_hypergraph import CompactHypergraph
+from ivanov.graph.label_vocabulary import reset_default_vocabulary
 from ivanov.graph.hypergraph import Hypergraph
-from ivanov.graph import rdf
+from ivanov.graph import rdf, nxext, node_ordering
 from ivanov import inout
+from functools import partial
+import networkx as nx
 import helpers
 import time
 
@@ -25,8 +29,13 @@ time_format = "%H:%M:%S, %d.%m.%Y"
 
 path = "../output_2/"
 
+# a file to memoize the canonical representations of the shingles across runs (None disables the cache)
+canonical_cache_file = None
+
 def calculate_ch_matrix():
     in_files = helpers.datasets[dataset]["files"]
+    # do not keep the labels of a previously processed dataset
+    reset_default_vocabulary()
     
     print "Converting RDF to NetworkX graph started at", time.strftime(time_format)
     start = time.time()
@@ -34,28 +43,46 @@ def calculate_ch_matrix():
     print "Converting RDF to NetworkX graph took", time.time() - start, "s"
     print "-----------------------------------------"
     
-    print "Saving NodeID map started at", time.strftime(time_format)
+    print "Reordering graph started at", time.strftime(time_format)
     start = time.time()
-    inout.save_to_file(node_id_map, path + "{0}_node_id_map".format(dataset))
-    print "Saving NodeID map took", time.time() - start, "s"
+    # the node ID's from the RDF conversion follow rdflib's iteration order;
+    # the graph is reordered before building the hypergraph, so that only one hypergraph is kept in memory
+    ordering = node_ordering.get_ordering(sorted(graph.nodes_iter()), partial(nxext.get_all_neighbors, graph), "rcm")
+    node_map = {node: i for i, node in enumerate(ordering)}
+    graph = nx.relabel_nodes(graph, node_map)
+    node_id_map = {uri: node_map[node] for uri, node in node_id_map.iteritems()}
+    print "Reordering graph took", time.time() - start, "s"
     print "-----------------------------------------"
     
     print "Building hypergraph started at", time.strftime(time_format)
     start = time.time()
     hypergraph = Hypergraph(graph)
+    del graph
     print "Building hypergraph took", time.time() - start, "s"
     print "-----------------------------------------"
     
+    print "Saving NodeID map started at", time.strftime(time_format)
+    start = time.time()
+    inout.save_to_file(node_id_map, path + "{0}_node_id_map".format(dataset))
+    print "Saving NodeID map took", time.time() - start, "s"
+    print "-----------------------------------------"
+    
     print "Saving hypergraph started at", time.strftime(time_format)
     start = time.time()
-    hypergraph.save_to_file(path + "{0}_hgraph".format(dataset))
+    compact_hypergraph, _ = CompactHypergraph.from_hypergraph(hypergraph)
+    compact_hypergraph.save_to_binary(path + "{0}_hgraph_bin".format(dataset))
+    del compact_hypergraph
     print "Saving hypergraph took", time.time() - start, "s"
     print "-----------------------------------------"
     
     print "Building characteristic matrix started at", time.strftime(time_format)
     start = time.time()
     rballs_database, index_node_map = similar_nodes_mining.extract_rballs_database(hypergraph, r_in=r_in, r_out=r_out, r_all=r_all)
+    if canonical_cache_file:
+        arnborg_proskurowski.enable_cache(cache_file=canonical_cache_file)
     ch_matrix = CharacteristicMatrix(rballs_database, hypergraph.number_of_nodes(), wl_iterations=wl_iterations, print_progress=True)
+    if canonical_cache_file:
+        print "Canonical representations cache:", arnborg_proskurowski.disable_cache().stats()
     print "Building characteristic matrix took", time.time() - start, "s"
     print "-----------------------------------------"
     
@@ -82,7 +109,10 @@ def load_ch_matrix():
     
     print "Reading hypergraph started at", time.strftime(time_format)
     start = time.time()
-    hypergraph = Hypergraph.load_from_file(path + "{0}_hgraph".format(dataset))
+    # memory-mapped, the node ID's are the integer ID's of node_id_map (u"n_i" in the hypergraph of calculate_ch_matrix,
+    # index_node_map is mapped to them below); the r-balls can be extracted from it directly and to_hypergraph converts
+    # (a part of) it if needed
+    hypergraph = CompactHypergraph.load_from_binary(path + "{0}_hgraph_bin".format(dataset))
     print "Reading hypergraph took", time.time() - start, "s"
     print "-----------------------------------------"
     
@@ -95,6 +125,9 @@ def load_ch_matrix():
     print "Reading Column index to Node map started at", time.strftime(time_format)
     start = time.time()
     index_node_map = inout.load_from_file(path + "{0}_index_node_map".format(dataset))
+    # the saved map has the node ID's of the hypergraph of calculate_ch_matrix, which are all of its nodes
+    node_index_map = CompactHypergraph.get_node_index_map(index_node_map.itervalues())
+    index_node_map = {index: node_index_map[node] for index, node in index_node_map.iteritems()}
     print "Reading Column index to Node map took", time.time() - start, "s"
     print "-----------------------------------------"
     
@@ -130,6 +163,9 @@ def load_sketch_matrix():
     print "Reading Column index to Node map started at", time.strftime(time_format)
     start = time.time()
     index_node_map = inout.load_from_file(path + "{0}_index_node_map".format(dataset))
+    # the saved map has the node ID's of the hypergraph of calculate_ch_matrix, which are all of its nodes
+    node_index_map = CompactHypergraph.get_node_index_map(index_node_map.itervalues())
+    index_node_map = {index: node_index_map[node] for index, node in index_node_map.iteritems()}
     print "Reading Column index to Node map took", time.time() - start, "s"
     print "-----------------------------------------"
     
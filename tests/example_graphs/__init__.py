@@ -773,66 +773,66 @@ snm_dummy_graph_features_2 = []
 
 # ring
 snm_dummy_graph_features_2.append(nx.MultiDiGraph())
+snm_dummy_graph_features_2[-1].add_node(1, labels=["b", "r"])
 snm_dummy_graph_features_2[-1].add_node(2, labels=["b"])
 snm_dummy_graph_features_2[-1].add_node(3, labels=["b", "r"])
 snm_dummy_graph_features_2[-1].add_node(4, labels=["r"])
 snm_dummy_graph_features_2[-1].add_node(5, labels=["b"])
 snm_dummy_graph_features_2[-1].add_node(6, labels=["b", "r"])
-snm_dummy_graph_features_2[-1].add_node(7, labels=["r"])
+snm_dummy_graph_features_2[-1].add_edge(2, 1, label="n")
 snm_dummy_graph_features_2[-1].add_edge(3, 2, label="g")
 snm_dummy_graph_features_2[-1].add_edge(3, 4, label="n")
 snm_dummy_graph_features_2[-1].add_edge(4, 5, label="n")
 snm_dummy_graph_features_2[-1].add_edge(6, 5, label="g")
-snm_dummy_graph_features_2[-1].add_edge(6, 7, label="n")
 
 snm_dummy_graph_features_2.append(nx.MultiDiGraph())
-snm_dummy_graph_features_2[-1].add_node(1, labels=["b", "r"])
 snm_dummy_graph_features_2[-1].add_node(2, labels=["b"])
 snm_dummy_graph_features_2[-1].add_node(3, labels=["b", "r"])
 snm_dummy_graph_features_2[-1].add_node(4, labels=["r"])
 snm_dummy_graph_features_2[-1].add_node(5, labels=["b"])
 snm_dummy_graph_features_2[-1].add_node(6, labels=["b", "r"])
-snm_dummy_graph_features_2[-1].add_edge(2, 1, label="n")
+snm_dummy_graph_features_2[-1].add_node(7, labels=["r"])
 snm_dummy_graph_features_2[-1].add_edge(3, 2, label="g")
 snm_dummy_graph_features_2[-1].add_edge(3, 4, label="n")
 snm_dummy_graph_features_2[-1].add_edge(4, 5, label="n")
 snm_dummy_graph_features_2[-1].add_edge(6, 5, label="g")
+snm_dummy_graph_features_2[-1].add_edge(6, 7, label="n")
 
 snm_dummy_graph_features_2.append(nx.MultiDiGraph())
-snm_dummy_graph_features_2[-1].add_node(1, labels=["b", "r"])
-snm_dummy_graph_features_2[-1].add_node(2, labels=["b"])
 snm_dummy_graph_features_2[-1].add_node(3, labels=["b", "r"])
 snm_dummy_graph_features_2[-1].add_node(4, labels=["r"])
 snm_dummy_graph_features_2[-1].add_node(5, labels=["b"])
-snm_dummy_graph_features_2[-1].add_node(9, labels=["b"])
-snm_dummy_graph_features_2[-1].add_edge(2, 1, label="n")
-snm_dummy_graph_features_2[-1].add_edge(3, 2, label="g")
+snm_dummy_graph_features_2[-1].add_node(6, labels=["b", "r"])
+snm_dummy_graph_features_2[-1].add_node(7, labels=["r"])
+snm_dummy_graph_features_2[-1].add_node(8, labels=["b"])
 snm_dummy_graph_features_2[-1].add_edge(3, 4, label="n")
 snm_dummy_graph_features_2[-1].add_edge(4, 5, label="n")
-snm_dummy_graph_features_2[-1].add_edge(9, 1, label="n")
+snm_dummy_graph_features_2[-1].add_edge(6, 5, label="g")
+snm_dummy_graph_features_2[-1].add_edge(6, 7, label="n")
+snm_dummy_graph_features_2[-1].add_edge(7, 8, label="n")
 
 snm_dummy_graph_features_2.append(nx.MultiDiGraph())
-snm_dummy_graph_features_2[-1].add_node(1, labels=["b", "r"])
-snm_dummy_graph_features_2[-1].add_node(2, labels=["b"])
-snm_dummy_graph_features_2[-1].add_node(3, labels=["b", "r"])
 snm_dummy_graph_features_2[-1].add_node(4, labels=["r"])
+snm_dummy_graph_features_2[-1].add_node(5, labels=["b"])
+snm_dummy_graph_features_2[-1].add_node(6, labels=["b", "r"])
+snm_dummy_graph_features_2[-1].add_node(7, labels=["r"])
 snm_dummy_graph_features_2[-1].add_node(8, labels=["b"])
 snm_dummy_graph_features_2[-1].add_node(9, labels=["b"])
-snm_dummy_graph_features_2[-1].add_edge(2, 1, label="n")
-snm_dummy_graph_features_2[-1].add_edge(3, 2, label="g")
-snm_dummy_graph_features_2[-1].add_edge(3, 4, label="n")
+snm_dummy_graph_features_2[-1].add_edge(4, 5, label="n")
+snm_dummy_graph_features_2[-1].add_edge(6, 5, label="g")
+snm_dummy_graph_features_2[-1].add_edge(6, 7, label="n")
+snm_dummy_graph_features_2[-1].add_edge(7, 8, label="n")
 snm_dummy_graph_features_2[-1].add_edge(9, 8, label="g")
-snm_dummy_graph_features_2[-1].add_edge(9, 1, label="n")
 
 snm_dummy_graph_features_2.append(nx.MultiDiGraph())
 snm_dummy_graph_features_2[-1].add_node(1, labels=["b", "r"])
-snm_dummy_graph_features_2[-1].add_node(2, labels=["b"])
-snm_dummy_graph_features_2[-1].add_node(3, labels=["b", "r"])
+snm_dummy_graph_features_2[-1].add_node(5, labels=["b"])
+snm_dummy_graph_features_2[-1].add_node(6, labels=["b", "r"])
 snm_dummy_graph_features_2[-1].add_node(7, labels=["r"])
 snm_dummy_graph_features_2[-1].add_node(8, labels=["b"])
 snm_dummy_graph_features_2[-1].add_node(9, labels=["b"])
-snm_dummy_graph_features_2[-1].add_edge(2, 1, label="n")
-snm_dummy_graph_features_2[-1].add_edge(3, 2, label="g")
+snm_dummy_graph_features_2[-1].add_edge(6, 5, label="g")
+snm_dummy_graph_features_2[-1].add_edge(6, 7, label="n")
 snm_dummy_graph_features_2[-1].add_edge(7, 8, label="n")
 snm_dummy_graph_features_2[-1].add_edge(9, 8, label="g")
 snm_dummy_graph_features_2[-1].add_edge(9, 1, label="n")
@@ -852,45 +852,45 @@ snm_dummy_graph_features_2[-1].add_edge(9, 1, label="n")
 
 snm_dummy_graph_features_2.append(nx.MultiDiGraph())
 snm_dummy_graph_features_2[-1].add_node(1, labels=["b", "r"])
-snm_dummy_graph_features_2[-1].add_node(5, labels=["b"])
-snm_dummy_graph_features_2[-1].add_node(6, labels=["b", "r"])
+snm_dummy_graph_features_2[-1].add_node(2, labels=["b"])
+snm_dummy_graph_features_2[-1].add_node(3, labels=["b", "r"])
 snm_dummy_graph_features_2[-1].add_node(7, labels=["r"])
 snm_dummy_graph_features_2[-1].add_node(8, labels=["b"])
 snm_dummy_graph_features_2[-1].add_node(9, labels=["b"])
-snm_dummy_graph_features_2[-1].add_edge(6, 5, label="g")
-snm_dummy_graph_features_2[-1].add_edge(6, 7, label="n")
+snm_dummy_graph_features_2[-1].add_edge(2, 1, label="n")
+snm_dummy_graph_features_2[-1].add_edge(3, 2, label="g")
 snm_dummy_graph_features_2[-1].add_edge(7, 8, label="n")
 snm_dummy_graph_features_2[-1].add_edge(9, 8, label="g")
 snm_dummy_graph_features_2[-1].add_edge(9, 1, label="n")
 
 snm_dummy_graph_features_2.append(nx.MultiDiGraph())
+snm_dummy_graph_features_2[-1].add_node(1, labels=["b", "r"])
+snm_dummy_graph_features_2[-1].add_node(2, labels=["b"])
+snm_dummy_graph_features_2[-1].add_node(3, labels=["b", "r"])
 snm_dummy_graph_features_2[-1].add_node(4, labels=["r"])
-snm_dummy_graph_features_2[-1].add_node(5, labels=["b"])
-snm_dummy_graph_features_2[-1].add_node(6, labels=["b", "r"])
-snm_dummy_graph_features_2[-1].add_node(7, labels=["r"])
 snm_dummy_graph_features_2[-1].add_node(8, labels=["b"])
 snm_dummy_graph_features_2[-1].add_node(9, labels=["b"])
-snm_dummy_graph_features_2[-1].add_edge(4, 5, label="n")
-snm_dummy_graph_features_2[-1].add_edge(6, 5, label="g")
-snm_dummy_graph_features_2[-1].add_edge(6, 7, label="n")
-snm_dummy_graph_features_2[-1].add_edge(7, 8, label="n")
+snm_dummy_graph_features_2[-1].add_edge(2, 1, label="n")
+snm_dummy_graph_features_2[-1].add_edge(3, 2, label="g")
+snm_dummy_graph_features_2[-1].add_edge(3, 4, label="n")
 snm_dummy_graph_features_2[-1].add_edge(9, 8, label="g")
+snm_dummy_graph_features_2[-1].add_edge(9, 1, label="n")
 
 snm_dummy_graph_features_2.append(nx.MultiDiGraph())
+snm_dummy_graph_features_2[-1].add_node(1, labels=["b", "r"])
+snm_dummy_graph_features_2[-1].add_node(2, labels=["b"])
 snm_dummy_graph_features_2[-1].add_node(3, labels=["b", "r"])
 snm_dummy_graph_features_2[-1].add_node(4, labels=["r"])
 snm_dummy_graph_features_2[-1].add_node(5, labels=["b"])
-snm_dummy_graph_features_2[-1].add_node(6, labels=["b", "r"])
-snm_dummy_graph_features_2[-1].add_node(7, labels=["r"])
-snm_dummy_graph_features_2[-1].add_node(8, labels=["b"])
+snm_dummy_graph_features_2[-1].add_node(9, labels=["b"])
+snm_dummy_graph_features_2[-1].add_edge(2, 1, label="n")
+snm_dummy_graph_features_2[-1].add_edge(3, 2, label="g")
 snm_dummy_graph_features_2[-1].add_edge(3, 4, label="n")
 snm_dummy_graph_features_2[-1].add_edge(4, 5, label="n")
-snm_dummy_graph_features_2[-1].add_edge(6, 5, label="g")
-snm_dummy_graph_features_2[-1].add_edge(6, 7, label="n")
-snm_dummy_graph_features_2[-1].add_edge(7, 8, label="n")
+snm_dummy_graph_features_2[-1].add_edge(9, 1, label="n")
 
 # chain
-snm_dummy_graph_features_2 += snm_dummy_graph_features_2[6:] + snm_dummy_graph_features_2[:2]
+snm_dummy_graph_features_2 += snm_dummy_graph_features_2[:5]
 
 # other
 snm_dummy_graph_features_2.append(nx.MultiDiGraph())
@@ -960,7 +960,7 @@ snm_dummy_graph_features_2[-1].add_edge(2, 4, label="n")
 snm_dummy_graph_features_2[-1].add_edge(3, 4, label="n")
 
 # wheel
-for feature in snm_dummy_graph_features_2[4:0:-1] + snm_dummy_graph_features_2[0:1] + snm_dummy_graph_features_2[8:4:-1]:
+for feature in snm_dummy_graph_features_2[6:9] + snm_dummy_graph_features_2[:6]:
     snm_dummy_graph_features_2.append(feature.copy())
     snm_dummy_graph_features_2[-1].add_node(10, labels=["G"])
     for node in snm_dummy_graph_features_2[-1].nodes_iter():
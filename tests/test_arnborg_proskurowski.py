@@ -5,9 +5,18 @@ Created on Dec 28, 2015
 '''
 
 from ivanov.graph.algorithms.arnborg_proskurowski.reducible_feature import ReducibleFeature
-from ivanov.graph.algorithms import arnborg_proskurowski
+from ivanov.graph.algorithms.arnborg_proskurowski import permutation_search, treewidth
+from ivanov.graph.algorithms.arnborg_proskurowski.canonical_cache import CanonicalCache
+from ivanov.graph.algorithms import arnborg_proskurowski, weisfeiler_lehman
+from ivanov.graph.hypergraph import Hypergraph
+from itertools import permutations
 from tests import example_graphs
+import networkx as nx
 import unittest
+import importlib
+import tempfile
+import shutil
+import os
 
 class TestArnborgProskurowski(unittest.TestCase):
     def common_asserts(self, tw, tw_exp, canon_str, canon_str_exp, features, features_exp):
@@ -17,16 +26,16 @@ class TestArnborgProskurowski(unittest.TestCase):
 
     def testTW_2(self):
         features_exp = [
-            ReducibleFeature(1, 2, ["n_4"], ["n_15"]),
-            ReducibleFeature(1, 2, ["n_8"], ["n_12"]),
             ReducibleFeature(1, 2, ["n_1"], ["n_13"]),
             ReducibleFeature(1, 2, ["n_3"], ["n_14"]),
-            ReducibleFeature(2, 1, ["n_9", "n_10", "n_11"], ["n_12", "n_12"]),
+            ReducibleFeature(1, 2, ["n_4"], ["n_15"]),
+            ReducibleFeature(1, 2, ["n_8"], ["n_12"]),
+            ReducibleFeature(2, 1, ["n_11", "n_10", "n_9"], ["n_12", "n_12"]),
+            ReducibleFeature(2, 1, ["n_2"], ["n_13", "n_14"]),
             ReducibleFeature(2, 1, ["n_5", "n_6", "n_7"], ["n_15", "n_15"]),
-            ReducibleFeature(2, 1, ["n_2"], ["n_14", "n_13"]),
-            ReducibleFeature(2, 1, ["n_14"], ["n_15", "n_13"]),
-            ReducibleFeature(2, 1, ["n_12"], ["n_15", "n_13"]),
-            ReducibleFeature(1, 1, ["n_15"], ["n_13"])
+            ReducibleFeature(2, 1, ["n_12"], ["n_13", "n_15"]),
+            ReducibleFeature(2, 1, ["n_14"], ["n_13", "n_15"]),
+            ReducibleFeature(1, 1, ["n_13"], ["n_15"])
         ]
         canon_str_exp = "(1.1;(0.1;(0),(1.2;(0,((0,1),(1,0))),(0))),((0.2;((2.1;((0.2;((2.1;(0,((0,1),(1,0))),(0),(0,((0,1),(1,0)))),((0,1),(1,0))),(0,((0,1),(1,0)))),((0,1),(1,0))),(0.1;(0),(1.2;(0,((0,1),(1,0))),(0))),(0,((0,1),(1,0)))),((0,1))),((2.1;(0,((0,1),(1,0))),(0.1;(0.1;(0),(1.2;(0,((0,1),(1,0))),(0))),(2.1;(0,((0,1),(1,0))),(0),(0,((0,1),(1,0))),(0),(0,((0,1),(1,0))),(0),(0,((0,1),(1,0))))),(0,((0,1),(1,0)))),((0,1),(1,0))),(0,((0,1),(1,0)))),((0,1))),(0.1;(0.1;(0),(1.2;(0,((0,1),(1,0))),(0))),(2.1;(0,((0,1),(1,0))),(0),(0,((0,1),(1,0))),(0),(0,((0,1),(1,0))),(0),(0,((0,1),(1,0))))))"
         tw, canon_str, features = arnborg_proskurowski.run_algorithm(example_graphs.ap_graph_tw_2, return_features=True)
@@ -38,7 +47,7 @@ class TestArnborgProskurowski(unittest.TestCase):
        
     def testTW_2_ring(self):
         features_exp = [
-            ReducibleFeature(2, 2, ["n_1", "n_2", "n_3", "n_4"], ["n_5"]),
+            ReducibleFeature(2, 2, ["n_2", "n_3", "n_4", "n_5"], ["n_1"]),
         ]
         canon_str_exp = "(2.2;1,(a,((0,1))),2,(b,((0,1))),3,(c,((0,1))),4,(d,((0,1))),5,(e,((0,1))))"
         tw, canon_str, features = arnborg_proskurowski.run_algorithm(example_graphs.ap_ring_graph, return_features=True)
@@ -68,12 +77,12 @@ class TestArnborgProskurowski(unittest.TestCase):
             ReducibleFeature(5, 2, set([u'n_7', u'n_8', u'n_9']), set([u'n_201', u'n_202', u'n_203']), 3, 1),
             ReducibleFeature(5, 2, set([u'n_52', u'n_53', u'n_51', u'n_54']), set([u'n_202', u'n_203', u'n_204']), 2, 0),
             ReducibleFeature(5, 2, set([u'n_136', u'n_134', u'n_135', u'n_132', u'n_133', u'n_131']), set([]), 5, 0),
-            ReducibleFeature(2, 2, [u'n_243', u'n_223'], [u'n_233'], 0, 0),
+            ReducibleFeature(2, 2, [u'n_233', u'n_243'], [u'n_223'], 0, 0),
             ReducibleFeature(5, 2, set([u'n_80', u'n_76', u'n_77', u'n_71', u'n_72', u'n_73']), set([]), 5, 0),
             ReducibleFeature(5, 1, set([u'n_23', u'n_24']), set([u'n_201', u'n_202']), 1, 0),
             ReducibleFeature(5, 2, set([u'n_125', u'n_124', u'n_127', u'n_126', u'n_123', u'n_122']), set([u'n_142', u'n_141']), 4, 0),
             ReducibleFeature(5, 2, set([u'n_52', u'n_51']), set([u'n_202', u'n_203', u'n_204']), 1, 0),
-            ReducibleFeature(2, 1, [u'n_125', u'n_124'], [u'n_142', u'n_141'], 0, 0),
+            ReducibleFeature(2, 1, [u'n_124', u'n_125'], [u'n_141', u'n_142'], 0, 0),
             ReducibleFeature(4, 1, [u'n_201'], [u'n_202', u'n_203', u'n_204'], 0, 0),
             ReducibleFeature(6, 1, set([u'n_146', u'n_145', u'n_144', u'n_143', u'n_142', u'n_141']), set([]), 0, 0),
             ReducibleFeature(6, 2, set([u'n_151', u'n_152', u'n_154', u'n_155']), set([u'n_203', u'n_204']), 0, 0),
@@ -88,6 +97,270 @@ class TestArnborgProskurowski(unittest.TestCase):
         canon_str_1 = arnborg_proskurowski.get_canonical_representation(example_graphs.ap_graph_tw_3)
         features_1 = arnborg_proskurowski.get_reduced_features(example_graphs.ap_graph_tw_3)
         self.common_asserts(tw_1, 3, canon_str_1, canon_str_exp, features_1, features_exp)
+    
+    def testMinimalLabel(self):
+        cube = nx.MultiDiGraph()
+        for node in range(8):
+            cube.add_node(node, labels=[u"v"])
+        for i, (u, v) in enumerate(nx.convert_node_labels_to_integers(nx.hypercube_graph(3)).edges()):
+            cube.add_edge(u, v, label=[u"a", u"b"][i % 3 == 0])
+        cube.add_edge(7, 6, label=u"a")
+        hypergraph = Hypergraph(cube)
+        edges = hypergraph.edges()
+        nodes = hypergraph.nodes()
+        for perms in [permutation_search.Permutations(nodes), [perm + (nodes[0],) for perm in permutations(nodes[1:])]]:
+            labels = [(u"(7.1;{0})".format(u",".join(sorted([u"v"] + [Hypergraph.edge_to_string(hypergraph, edge, perm) for edge in edges]))), perm) for perm in perms]
+            minimal_label_exp = min(labels)[0]
+            minimal_perms_exp = set(perm for label, perm in labels if label == minimal_label_exp)
+            minimal_label, minimal_perms = permutation_search.minimal_label(hypergraph, edges, perms, [u"v"], u"(7.1;{0})")
+            self.assertEqual(minimal_label, minimal_label_exp)
+            self.assertEqual(set(minimal_perms), minimal_perms_exp)
+    
+    def testCanonicalCache(self):
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        file_name = os.path.join(temp_dir, "canonical_cache.tmp")
+        graphs = [example_graphs.ap_graph_tw_2, example_graphs.ap_ring_graph, example_graphs.ap_graph_tw_3]
+        results_exp = [arnborg_proskurowski.run_algorithm(graph) for graph in graphs]
+        cache = arnborg_proskurowski.enable_cache(max_size=2, cache_file=file_name)
+        try:
+            for graph, result_exp in zip(graphs + graphs[-1:], results_exp + results_exp[-1:]):
+                self.assertEqual(arnborg_proskurowski.get_canonical_representation(graph), result_exp[1])
+            self.assertEqual(cache.stats(), {"hits": 1, "misses": 3, "evictions": 1, "size": 2})
+        finally:
+            arnborg_proskurowski.disable_cache()
+        cache = arnborg_proskurowski.enable_cache(cache_file=file_name)
+        try:
+            self.assertEqual(len(cache), 2)
+            self.assertEqual(arnborg_proskurowski.get_canonical_representation(graphs[2]), results_exp[2][1])
+            self.assertEqual(cache.stats()["hits"], 1)
+        finally:
+            arnborg_proskurowski.disable_cache()
+    
+    def testCanonicalCache_HashCollision(self):
+        # K3,3 and the triangular prism are not distinguished by color refinement
+        k33 = nx.MultiDiGraph(nx.complete_bipartite_graph(3, 3))
+        prism = nx.MultiDiGraph(nx.circular_ladder_graph(3))
+        for graph in [k33, prism]:
+            for node in graph.nodes_iter():
+                graph.node[node]["labels"] = [u"0"]
+            for u, v, data in graph.edges_iter(data=True):
+                data["label"] = u"0"
+        self.assertEqual(Hypergraph(k33).structural_hash(), Hypergraph(prism).structural_hash())
+        results_exp = [arnborg_proskurowski.run_algorithm(graph) for graph in [k33, prism]]
+        self.assertNotEqual(results_exp[0][1], results_exp[1][1])
+        cache = arnborg_proskurowski.enable_cache()
+        try:
+            self.assertEqual(arnborg_proskurowski.get_canonical_representation(k33), results_exp[0][1])
+            self.assertEqual(arnborg_proskurowski.get_canonical_representation(prism), results_exp[1][1])
+            self.assertEqual(arnborg_proskurowski.get_canonical_representation(prism), results_exp[1][1])
+            self.assertEqual(cache.stats(), {"hits": 1, "misses": 2, "evictions": 0, "size": 1})
+        finally:
+            arnborg_proskurowski.disable_cache()
+    
+    def testCanonicalCache_ExactKey(self):
+        graph = example_graphs.ap_graph_tw_2
+        relabeled = nx.relabel_nodes(graph, {node: u"x_{0}".format(node) for node in graph.nodes_iter()})
+        result_exp = arnborg_proskurowski.run_algorithm(graph)
+        cache = CanonicalCache()
+        hypergraph = Hypergraph(relabeled)
+        key = cache.get_key(hypergraph)
+        self.assertTrue(key[2], "The representative should be canonical.")
+        self.assertEqual(key, cache.get_key(Hypergraph(graph)))
+        cache.put(Hypergraph(graph), result_exp)
+        # a hit on a canonical representative must not need an isomorphism test
+        # (the package attribute canonical_cache is the enabled cache, not the module)
+        canonical_cache = importlib.import_module(CanonicalCache.__module__)
+        is_isomorphic = canonical_cache.is_isomorphic
+        canonical_cache.is_isomorphic = None
+        try:
+            self.assertEqual(cache.get(hypergraph, key), result_exp)
+        finally:
+            canonical_cache.is_isomorphic = is_isomorphic
+    
+    def testCanonicalCache_MaxRepresentatives(self):
+        k33 = nx.MultiDiGraph(nx.complete_bipartite_graph(3, 3))
+        prism = nx.MultiDiGraph(nx.circular_ladder_graph(3))
+        for graph in [k33, prism]:
+            for node in graph.nodes_iter():
+                graph.node[node]["labels"] = [u"0"]
+            for u, v, data in graph.edges_iter(data=True):
+                data["label"] = u"0"
+        # too many orderings for a canonical representative, so the hits are verified by isomorphism tests
+        cache = CanonicalCache(max_representatives=1, max_orderings=1)
+        self.assertFalse(cache.get_key(Hypergraph(k33))[2])
+        cache.put(Hypergraph(k33), (3, u"k33"))
+        self.assertEqual(cache.get(Hypergraph(k33)), (3, u"k33"))
+        cache.put(Hypergraph(prism), (3, u"prism"))
+        self.assertEqual(cache.get(Hypergraph(prism)), (3, u"prism"))
+        self.assertEqual(cache.get(Hypergraph(k33)), None)
+        self.assertEqual(cache.stats(), {"hits": 2, "misses": 1, "evictions": 0, "size": 1})
+    
+    def testTreewidth(self):
+        graphs = [example_graphs.ap_graph_tw_2, example_graphs.ap_ring_graph, example_graphs.ap_graph_tw_3, example_graphs.snm_dummy_graph, nx.MultiDiGraph()]
+        graphs += [nx.MultiDiGraph(nx.path_graph(4)), nx.MultiDiGraph(nx.cycle_graph(5)), nx.MultiDiGraph(nx.complete_graph(5))]
+        graphs += [nx.MultiDiGraph(nx.convert_node_labels_to_integers(nx.hypercube_graph(3))), nx.MultiDiGraph(nx.complete_bipartite_graph(3, 3))]
+        for graph in graphs[5:]:
+            for node in graph.nodes_iter():
+                graph.node[node]["labels"] = [u"0"]
+            for u, v, data in graph.edges_iter(data=True):
+                data["label"] = u"0"
+        tws_exp = [arnborg_proskurowski.run_algorithm(graph, compute_string=False)[0] for graph in graphs]
+        self.assertEqual(tws_exp, [2, 2, 3, 2, 0, 1, 2, -1, 3, 3])
+        self.assertEqual(treewidth.get_treewidths(graphs), tws_exp)
+        self.assertEqual([arnborg_proskurowski.get_treewidth(Hypergraph(graph)) for graph in graphs], tws_exp)
+    
+    def testLowerBound(self):
+        k5 = nx.MultiDiGraph(nx.complete_graph(5))
+        grid = nx.MultiDiGraph(nx.convert_node_labels_to_integers(nx.grid_2d_graph(5, 5)))
+        cube = nx.MultiDiGraph(nx.convert_node_labels_to_integers(nx.hypercube_graph(3)))
+        for graph in [k5, grid, cube]:
+            for node in graph.nodes_iter():
+                graph.node[node]["labels"] = [u"0"]
+            for u, v, data in graph.edges_iter(data=True):
+                data["label"] = u"0"
+        adj = treewidth.to_adjacency(grid)
+        self.assertEqual(treewidth.get_degeneracy(adj), 2)
+        self.assertEqual(treewidth.get_contraction_degeneracy(adj), 4)
+        self.assertEqual(treewidth.get_lower_bound(k5), 4)
+        self.assertEqual(treewidth.get_lower_bound(cube), 3)
+        for graph in [k5, grid, cube, example_graphs.ap_graph_tw_3]:
+            self.assertEqual(arnborg_proskurowski.run_algorithm(graph, check_lower_bound=True), arnborg_proskurowski.run_algorithm(graph))
+        self.assertEqual(arnborg_proskurowski.run_algorithm(grid, return_features=True, check_lower_bound=True), (-1, u"Tree-width > 3", []))
+    
+    def testRunAlgorithmMany(self):
+        graphs = [example_graphs.ap_graph_tw_2, example_graphs.ap_ring_graph, example_graphs.ap_graph_tw_3, Hypergraph(example_graphs.ap_graph_tw_2)]
+        results_exp = [arnborg_proskurowski.run_algorithm(graph) for graph in graphs]
+        self.assertEqual(list(arnborg_proskurowski.run_algorithm_many(graphs, processes=2, chunksize=1)), results_exp)
+        self.assertEqual(list(arnborg_proskurowski.run_algorithm_many(iter(graphs), processes=1)), results_exp)
+        unordered_results = sorted(arnborg_proskurowski.run_algorithm_many(graphs, processes=2, ordered=False, chunk_weight=50))
+        self.assertEqual(unordered_results, list(enumerate(results_exp)))
+        features_exp = [arnborg_proskurowski.run_algorithm(graph, return_features=True, compute_string=False) for graph in graphs]
+        self.assertEqual(list(arnborg_proskurowski.run_algorithm_many(graphs, processes=2, return_features=True, compute_string=False)), features_exp)
+    
+    def testExtractRule1And2Features(self):
+        graph = nx.MultiDiGraph()
+        for node in range(10):
+            graph.add_node(node, labels=[u"v"])
+        # a dipole, a pendant node, a chain and a ring
+        for u, v in [(0, 1), (3, 2), (2, 4), (4, 5), (5, 6), (6, 2), (7, 8), (8, 9), (9, 7)]:
+            graph.add_edge(u, v, label=u"a")
+        hypergraph = Hypergraph(graph)
+        
+        def get_nodes(features):
+            return sorted(map(lambda feature: (feature.get_full_rule(), sorted(feature.reducible_nodes + feature.peripheral_nodes)), features))
+        
+        rule_1_features = list(ReducibleFeature.extract_rule_1_features(hypergraph))
+        self.assertEqual(get_nodes(rule_1_features), [("1.1.0.0", [u"n_0", u"n_1"]), ("1.2.0.0", [u"n_2", u"n_3"])])
+        rule_2_features = list(ReducibleFeature.extract_rule_2_features(hypergraph))
+        self.assertEqual(get_nodes(rule_2_features), [("2.1.0.0", [u"n_2", u"n_2", u"n_4", u"n_5", u"n_6"]), ("2.2.0.0", [u"n_7", u"n_8", u"n_9"])])
+        # the features are oriented by node id
+        self.assertEqual(rule_1_features[0], ReducibleFeature(1, 1, [u"n_0"], [u"n_1"]))
+        self.assertEqual(rule_2_features, [ReducibleFeature(2, 2, [u"n_8", u"n_9"], [u"n_7"]), ReducibleFeature(2, 1, [u"n_4", u"n_5", u"n_6"], [u"n_2", u"n_2"])])
+    
+    def testExtractDegree3FeaturesLongConflict(self):
+        # a ring of triangles, all triangles are in one long conflict
+        graph = nx.MultiDiGraph()
+        triangles = 700
+        for node in range(3 * triangles):
+            graph.add_node(node, labels=[u"v"])
+        for i in range(triangles):
+            a, b, c = 3 * i, 3 * i + 1, 3 * i + 2
+            for u, v in [(a, b), (b, c), (c, a), (c, (c + 1) % (3 * triangles))]:
+                graph.add_edge(u, v, label=u"a")
+        hypergraph = Hypergraph(graph)
+        self.assertEqual(ReducibleFeature.extract_degree_3_features(hypergraph), [])
+    
+    def testExtractDegree3Features(self):
+        bases = [nx.hypercube_graph(3), nx.complete_bipartite_graph(3, 3), nx.circular_ladder_graph(3)]
+        rules_exp = ["7.1.0.0", "6.1.0.0", "5.2.5.0"]
+        for base, rule_exp in zip(bases, rules_exp):
+            base = nx.convert_node_labels_to_integers(base)
+            graph = nx.MultiDiGraph()
+            for node in base.nodes():
+                graph.add_node(node, labels=[u"v"])
+            for u, v in base.edges():
+                graph.add_edge(u, v, label=u"a")
+            features = ReducibleFeature.extract_degree_3_features(Hypergraph(graph))
+            self.assertEqual(len(features), 1)
+            self.assertEqual(features[0].get_full_rule(), rule_exp)
+            self.assertEqual(set(features[0].reducible_nodes), set(Hypergraph(graph).nodes()))
+    
+    def testLabelDAG(self):
+        graphs = [example_graphs.ap_graph_tw_2, example_graphs.ap_ring_graph, example_graphs.ap_graph_tw_3, example_graphs.snm_dummy_graph_2]
+        label_dag = arnborg_proskurowski.LabelDAG()
+        for graph in graphs:
+            treewidth_exp, canon_str_exp = arnborg_proskurowski.run_algorithm(graph)
+            treewidth, label_id = arnborg_proskurowski.run_algorithm(graph, label_dag=label_dag)
+            self.assertEqual(treewidth, treewidth_exp)
+            self.assertLess(len(label_id), len(canon_str_exp))
+            # the rendered string is the canonical string
+            self.assertEqual(label_dag.render(label_id), canon_str_exp)
+            # also if the ID's are built in another DAG
+            other_label_dag = arnborg_proskurowski.LabelDAG()
+            self.assertEqual(other_label_dag.render(arnborg_proskurowski.run_algorithm(graph, label_dag=other_label_dag)[1]), canon_str_exp)
+        # the ID's compare like the rendered labels
+        label_ids = [label_dag.intern(label) for label in [u"(2.1;a,b)", u"(2.1;a)", u"(1.2;x)", u"(2.1;(1.2;x))", u"(2.1;a,c)"]]
+        label_ids.append(label_dag.intern(u"(2.1;{0},{1})".format(label_ids[1], label_ids[0])))
+        label_ids.append(label_dag.intern(u"(2.1;{0},{1})".format(label_ids[1], label_ids[2])))
+        self.assertIn(label_ids[-1], label_dag)
+        self.assertEqual(label_dag.intern(label_ids[-1]), label_ids[-1])
+        self.assertEqual(label_dag.intern(u"(2.1;a)"), label_ids[1])
+        rendered = map(label_dag.render, label_ids)
+        self.assertEqual(rendered[-1], u"(2.1;(2.1;a),(1.2;x))")
+        self.assertEqual(sorted(label_ids), map(lambda label: label_ids[rendered.index(label)], sorted(rendered)))
+        self.assertEqual(sorted(label_ids, key=label_dag.get_rank), sorted(label_ids))
+        # labels which are not labels of a rule are not interned
+        self.assertEqual(label_dag.intern(u"a"), u"a")
+        self.assertEqual(label_dag.intern(u"(2.1;a),(2.1;b)"), u"(2.1;a),(2.1;b)")
+        self.assertNotIn(u"a", label_dag)
+    
+    def testRuleStats(self):
+        graphs = [example_graphs.ap_graph_tw_2, example_graphs.ap_ring_graph, example_graphs.ap_graph_tw_3]
+        stats = arnborg_proskurowski.enable_stats()
+        try:
+            results = [arnborg_proskurowski.run_algorithm(graph, return_features=True) for graph in graphs]
+        finally:
+            self.assertIs(arnborg_proskurowski.disable_stats(), stats)
+        arnborg_proskurowski.run_algorithm(graphs[0])
+        
+        stats_dict = stats.to_dict()
+        self.assertEqual(stats_dict["runs"], 3)
+        self.assertEqual(stats_dict["treewidths"], {"2": 2, "3": 1})
+        self.assertEqual(stats_dict["rules"]["0"]["calls"], stats_dict["iterations"])
+        self.assertEqual(sum(feature["count"] for feature in stats_dict["features"].values()), sum(len(result[2]) for result in results))
+        self.assertGreater(stats_dict["features"]["7.1.0.0"]["count"], 0)
+        self.assertGreater(stats_dict["permutations"]["labeled"], 0)
+        
+        stats.merge(stats)
+        self.assertEqual(stats.to_dict()["runs"], 6)
+        self.assertEqual(stats.to_dict()["rules"]["0"]["calls"], 2 * stats_dict["iterations"])
+    
+    def testReductionPlan(self):
+        graphs = [example_graphs.ap_graph_tw_2, example_graphs.ap_ring_graph, example_graphs.ap_graph_tw_3]
+        for graph in graphs:
+            plan = arnborg_proskurowski.ReductionPlan()
+            hypergraph = Hypergraph(graph)
+            result = arnborg_proskurowski.run_algorithm(hypergraph, plan=plan)
+            self.assertEqual(result, arnborg_proskurowski.run_algorithm(hypergraph))
+            self.assertTrue(plan.is_recorded())
+            # the same labels
+            self.assertEqual(arnborg_proskurowski.run_algorithm(hypergraph, plan=plan), result)
+            # other labels
+            hypergraph, wl_state = weisfeiler_lehman.init(hypergraph)
+            for i in range(1, 3):
+                hypergraph, wl_state = weisfeiler_lehman.iterate(hypergraph, wl_state, i)
+                treewidth, canon_str, features = arnborg_proskurowski.run_algorithm(hypergraph, return_features=True, plan=plan)
+                treewidth_exp, canon_str_exp, features_exp = arnborg_proskurowski.run_algorithm(hypergraph, return_features=True)
+                self.assertEqual(treewidth, treewidth_exp)
+                self.assertEqual(canon_str, canon_str_exp)
+                self.assertEqual(len(features), len(features_exp))
+        
+        # a graph with another structure is recorded anew
+        hypergraph = Hypergraph(graphs[0])
+        arnborg_proskurowski.run_algorithm(hypergraph, plan=plan)
+        self.assertTrue(plan.matches(hypergraph))
+        self.assertEqual(arnborg_proskurowski.run_algorithm(hypergraph, plan=plan), arnborg_proskurowski.run_algorithm(hypergraph))
 
 if __name__ == "__main__":
     #import sys;sys.argv = ['', 'Test.testName']
@@ -4,20 +4,94 @@ Created on Dec 18, 2015
 @author: Ivan Ivanov
 '''
 
-from ivanov.graph.algorithms import weisfeiler_lehman
+from ivanov.graph.algorithms import weisfeiler_lehman, arnborg_proskurowski
+from ivanov.graph.compact_hypergraph import CompactHypergraph
+from ivanov.graph.label_vocabulary import LabelVocabulary, default_vocabulary, reset_default_vocabulary
 from ivanov.graph.hypergraph import Hypergraph
-from ivanov.graph import algorithms, rdf
+from ivanov.graph import algorithms, rdf, node_ordering, nxext
+from ivanov import memory
 from tests import example_graphs
+import networkx as nx
+import numpy as np
+import pickle
 import unittest
+import tempfile
+import shutil
+import os
 
 class TestGraph(unittest.TestCase):
     def testHypergraph_Copy(self):
         dummy_hypergraph = Hypergraph(example_graphs.gt_dummy_graph)
         dummy_copy = dummy_hypergraph.copy()
         self.assertEqual(dummy_hypergraph, dummy_copy, "The copy was not correct.")
+        dummy_deep_copy = dummy_hypergraph.copy(deep=True)
+        self.assertEqual(dummy_hypergraph, dummy_deep_copy, "The deep copy was not correct.")
+    
+    def testHypergraph_CopyOnWrite(self):
+        dummy_hypergraph = Hypergraph(example_graphs.gt_dummy_graph)
+        dummy_copy = dummy_hypergraph.copy()
+        # the indices are shared until the first structural modification
+        self.assertIs(dummy_copy.neighbors_multiplicity, dummy_hypergraph.neighbors_multiplicity)
+        self.assertIs(dummy_copy.endpoints_index, dummy_hypergraph.endpoints_index)
+        self.assertIs(dummy_copy.nodes_registry, dummy_hypergraph.nodes_registry)
+        dummy_copy.safe_remove_node("n_6")
+        self.assertIsNot(dummy_copy.neighbors_multiplicity, dummy_hypergraph.neighbors_multiplicity)
+        dummy_copy.add_edge(set(["n_1", "n_2", "n_3"]))
+        dummy_copy.add_node_label("n_1", "x")
+        self.assertEqual(len(dummy_hypergraph.nodes()), 16)
+        self.assertEqual(set(dummy_hypergraph.edges_iter("n_6")), set(["e_5", "e_9", "e_13", "e_28"]))
+        self.assertEqual(dummy_hypergraph.hedges(), [])
+        self.assertEqual(len(dummy_hypergraph.node["n_1"]["labels"]), 1)
+        self.assertEqual(dummy_hypergraph, Hypergraph(example_graphs.gt_dummy_graph), "The copy modified the original.")
+        self.assertEqual(len(dummy_copy.nodes()), 15)
+        self.assertFalse(dummy_copy.bipartite_graph.has_node("n_6"))
+        # the original gets its own structure when it is modified
+        dummy_copy = dummy_hypergraph.copy()
+        dummy_hypergraph.add_edge(set(["n_1", "n_2"]))
+        self.assertEqual(dummy_copy, Hypergraph(example_graphs.gt_dummy_graph), "The original modified the copy.")
+        dummy_hypergraph.add_node_label("n_1", "y")
+        self.assertEqual(dummy_copy, Hypergraph(example_graphs.gt_dummy_graph), "The original modified the labels of the copy.")
+        self.assertEqual(len(dummy_hypergraph.node["n_1"]["labels"]), 2)
+        # the last owner of a shared structure does not copy it
+        dummy_copy = dummy_hypergraph.copy()
+        node_attributes = dummy_hypergraph.node
+        neighbors_multiplicity = dummy_hypergraph.neighbors_multiplicity
+        del dummy_copy
+        dummy_hypergraph.add_edge(set(["n_1", "n_3"]))
+        dummy_hypergraph.add_node_label("n_2", "z")
+        self.assertIs(dummy_hypergraph.neighbors_multiplicity, neighbors_multiplicity)
+        self.assertIs(dummy_hypergraph.node, node_attributes)
+
+    def testHypergraph_CopySharing(self):
+        graph = nx.gnm_random_graph(1000, 3000, seed=1)
+        for node in graph.nodes_iter():
+            graph.node[node]["labels"] = [str(node % 7)]
+        for u, v in graph.edges_iter():
+            graph.edge[u][v]["label"] = str((u + v) % 3)
+        hypergraph = Hypergraph(graph)
+        for _ in range(10):
+            hypergraph_copy = hypergraph.copy()
+            # nothing of the structure and the attributes is copied by copy()
+            for attr in Hypergraph.SHARED_STRUCTURE:
+                self.assertIs(getattr(hypergraph_copy, attr), getattr(hypergraph, attr), attr)
+            self.assertIs(hypergraph_copy.bipartite_graph.adj, hypergraph.bipartite_graph.adj)
+            self.assertIs(hypergraph_copy.node, hypergraph.node)
+            # the first structural modification of the original copies the structure, but not the attributes
+            hypergraph.add_edge(set(["n_1", "n_2"]))
+            for attr in Hypergraph.SHARED_STRUCTURE:
+                self.assertIsNot(getattr(hypergraph_copy, attr), getattr(hypergraph, attr), attr)
+            self.assertIsNot(hypergraph_copy.bipartite_graph.adj, hypergraph.bipartite_graph.adj)
+            self.assertIs(hypergraph_copy.node["n_1"], hypergraph.node["n_1"])
+            # the first label modification copies the attributes
+            hypergraph.add_node_label("n_1", "x")
+            self.assertIsNot(hypergraph_copy.node["n_1"], hypergraph.node["n_1"])
+            self.assertEqual(hypergraph_copy.number_of_edges() + 1, hypergraph.number_of_edges())
+            self.assertEqual(len(hypergraph_copy.node["n_1"]["labels"]) + 1, len(hypergraph.node["n_1"]["labels"]))
 
     def testHypergraph_ReadWrite(self):
-        file_name = "test_files/dummy_hypergraph.tmp"
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        file_name = os.path.join(temp_dir, "dummy_hypergraph.tmp")
         dummy_hypergraph = Hypergraph(example_graphs.gt_dummy_graph)
         dummy_hypergraph.save_to_file(file_name)
         read_hypergraph = Hypergraph.load_from_file(file_name)
@@ -29,12 +103,328 @@ class TestGraph(unittest.TestCase):
         self.assertEqual(set(dummy_hypergraph.edges_iter("n_6")), set(["e_5", "e_9", "e_13", "e_28"]))
         self.assertEqual(set(dummy_hypergraph.edges_iter("n_5", "n_1")), set(["e_15"]))
     
+    def testHypergraph_Registries(self):
+        dummy_hypergraph = Hypergraph(example_graphs.gt_dummy_graph)
+        dummy_hypergraph.add_edge(set(["n_1", "n_2", "n_3"]))
+        self.assertEqual(set(dummy_hypergraph.hedges_iter()), set(["he_0"]))
+        self.assertEqual(len(list(dummy_hypergraph.edges_iter())), 33)
+        dummy_hypergraph.remove_node("n_6")
+        self.assertEqual(len(dummy_hypergraph.nodes()), 15)
+        self.assertEqual(len(list(dummy_hypergraph.edges_iter())), 29)
+        self.assertTrue(not set(["e_5", "e_9", "e_13", "e_28"]) & set(dummy_hypergraph.edges_iter()))
+        dummy_hypergraph.remove_edge("he_0")
+        self.assertEqual(dummy_hypergraph.hedges(), [])
+        self.assertEqual(dummy_hypergraph.number_of_hedges(), 0)
+    
+    def testHypergraph_EndpointsIndex(self):
+        dummy_hypergraph = Hypergraph(example_graphs.gt_dummy_graph)
+        hedge_1 = dummy_hypergraph.add_edge(set(["n_1", "n_2", "n_3"]))
+        hedge_2 = dummy_hypergraph.add_edge(set(["n_1", "n_2", "n_3"]))
+        edge = dummy_hypergraph.add_edge(set(["n_1", "n_5"]))
+        self.assertTrue(dummy_hypergraph.has_edge("n_2", "n_3"))
+        self.assertFalse(dummy_hypergraph.has_edge("n_2", "n_16"))
+        self.assertEqual(set(dummy_hypergraph.edges("n_5", "n_1")), set(["e_15", edge]))
+        self.assertEqual(set(dummy_hypergraph.hedges("n_3", "n_1", "n_2")), set([hedge_1, hedge_2]))
+        self.assertEqual(set(dummy_hypergraph.hedges("n_3", "n_1")), set([hedge_1, hedge_2]))
+        dummy_hypergraph.update_parallel_edges_groups([edge])
+        dummy_hypergraph.update_parallel_hedges_groups([hedge_1])
+        self.assertEqual(dummy_hypergraph.parallel_edges_groups[frozenset(["n_1", "n_5"])], set(["e_15", edge]))
+        self.assertEqual(set(dummy_hypergraph.parallel_hedges_groups[frozenset(["n_1", "n_2", "n_3"])]), set([hedge_1, hedge_2]))
+        dummy_hypergraph.remove_edge(hedge_1)
+        dummy_hypergraph.remove_edge(edge)
+        self.assertEqual(dummy_hypergraph.edges("n_5", "n_1"), ["e_15"])
+        self.assertEqual(dummy_hypergraph.hedges("n_1", "n_2", "n_3"), [hedge_2])
+    
+    def testHypergraph_DirectionEncoding(self):
+        dummy_hypergraph = Hypergraph(example_graphs.gt_dummy_graph)
+        direction = set([("n_3", "n_1", "n_2"), ("n_3", "n_2", "n_1")])
+        hedge = dummy_hypergraph.add_edge(set(["n_1", "n_2", "n_3"]), direction=direction)
+        self.assertEqual(dummy_hypergraph.edge_direction(hedge), direction)
+        self.assertTrue(dummy_hypergraph.is_source(hedge, "n_3"))
+        self.assertFalse(dummy_hypergraph.is_target(hedge, "n_3"))
+        self.assertTrue(dummy_hypergraph.is_source(hedge, "n_1") and dummy_hypergraph.is_target(hedge, "n_1"))
+        self.assertEqual(Hypergraph.edge_to_string(dummy_hypergraph, hedge, ("n_3", "n_1", "n_2")), u"(0,((0,1,2),(0,2,1)))")
+        edge = dummy_hypergraph.add_edge(set(["n_1", "n_2"]))
+        self.assertEqual(dummy_hypergraph.edge_direction(edge), set([("n_1", "n_2"), ("n_2", "n_1")]))
+        self.assertTrue(hedge in dummy_hypergraph.edges_iter_dir("n_3", dir_code=1))
+        self.assertFalse(hedge in dummy_hypergraph.edges_iter_dir("n_3", dir_code=-1))
+    
+    def testHypergraph_FromArrays(self):
+        def edges_signature(hypergraph):
+            return sorted((hypergraph.edge(e)["endpoints"], hypergraph.edge(e)["dir_mask"], hypergraph.edge(e)["labels"][0]) for e in hypergraph.edges_iter())
+        
+        for graph in [example_graphs.gt_dummy_graph, example_graphs.ap_graph_tw_3]:
+            src, dst, edge_labels = zip(*[(u, v, attr["label"]) for u, v, attr in graph.edges_iter(data=True)])
+            node_labels = {node: graph.node[node]["labels"] for node in graph.nodes_iter()}
+            hypergraph = Hypergraph(graph)
+            array_hypergraph = Hypergraph.from_arrays(src, dst, edge_labels, node_labels)
+            self.assertEqual(edges_signature(hypergraph), edges_signature(array_hypergraph))
+            self.assertEqual(set(hypergraph.parallel_edges_groups.keys()), set(array_hypergraph.parallel_edges_groups.keys()))
+            self.assertEqual(hypergraph.nodes_with_1_neighbor, array_hypergraph.nodes_with_1_neighbor)
+            self.assertEqual(hypergraph.nodes_with_2_neighbors, array_hypergraph.nodes_with_2_neighbors)
+            self.assertEqual(hypergraph.nodes_with_3_neighbors, array_hypergraph.nodes_with_3_neighbors)
+            self.assertEqual(arnborg_proskurowski.get_canonical_representation(hypergraph),
+                             arnborg_proskurowski.get_canonical_representation(array_hypergraph))
+        
+        # a node of an edge without a label
+        with self.assertRaisesRegexp(ValueError, "node 2 "):
+            Hypergraph.from_arrays([0, 1], [1, 2], ["a", "b"], ["x", "y"])
+    
+    def testHypergraph_NeighborsCount(self):
+        dummy_hypergraph = Hypergraph(example_graphs.gt_dummy_graph)
+        dummy_hypergraph.add_edge(set(["n_1", "n_2", "n_3"]))
+        dummy_hypergraph.add_edge(set(["n_1", "n_5"]))
+        dummy_hypergraph.update_nodes_with_n_neighbors(set(["n_1", "n_2", "n_3", "n_5"]))
+        dummy_hypergraph.safe_remove_node("n_6")
+        dummy_hypergraph.safe_remove_edge("e_15")
+        for node in dummy_hypergraph.nodes_iter():
+            neighbors_count = len(dummy_hypergraph.neighbors(node))
+            self.assertEqual(dummy_hypergraph.neighbors_count(node), neighbors_count)
+            self.assertEqual(node in dummy_hypergraph.nodes_with_1_neighbor, neighbors_count == 1)
+            self.assertEqual(node in dummy_hypergraph.nodes_with_2_neighbors, neighbors_count == 2)
+            self.assertEqual(node in dummy_hypergraph.nodes_with_3_neighbors, neighbors_count == 3)
+    
+    def testHypergraph_Batch(self):
+        dummy_hypergraph = Hypergraph(example_graphs.gt_dummy_graph)
+        expected_hypergraph = Hypergraph(example_graphs.gt_dummy_graph)
+        with dummy_hypergraph.batch():
+            edge = dummy_hypergraph.add_edge(set(["n_1", "n_5"]))
+            hedge_1 = dummy_hypergraph.add_edge(set(["n_1", "n_2", "n_3"]))
+            hedge_2 = dummy_hypergraph.add_edge(set(["n_1", "n_2", "n_3"]))
+            dummy_hypergraph.remove_node("n_6")
+            self.assertEqual(dummy_hypergraph.parallel_hedges_groups, {})
+        
+        expected_hypergraph.add_edge(set(["n_1", "n_5"]))
+        expected_hypergraph.add_edge(set(["n_1", "n_2", "n_3"]))
+        expected_hypergraph.add_edge(set(["n_1", "n_2", "n_3"]))
+        expected_neighbors = set(expected_hypergraph.neighbors("n_6"))
+        expected_hypergraph.remove_node("n_6")
+        expected_hypergraph.update_parallel_edges_groups([edge])
+        expected_hypergraph.update_parallel_hedges_groups([hedge_1, hedge_2])
+        expected_hypergraph.update_nodes_with_n_neighbors(set(["n_1", "n_2", "n_3", "n_5", "n_6"]) | expected_neighbors)
+        self.assertEqual(dummy_hypergraph, expected_hypergraph)
+        self.assertEqual(set(dummy_hypergraph.parallel_hedges_groups[frozenset(["n_1", "n_2", "n_3"])]), set([hedge_1, hedge_2]))
+    
+    def testHypergraph_StructuralHash(self):
+        hypergraph = Hypergraph(example_graphs.ap_graph_tw_3)
+        mapping = {node: u"m_{0}".format(node) for node in example_graphs.ap_graph_tw_3.nodes_iter()}
+        relabeled_graph = nx.relabel_nodes(example_graphs.ap_graph_tw_3, mapping)
+        self.assertEqual(hypergraph.structural_hash(), Hypergraph(relabeled_graph).structural_hash())
+        
+        other_labels_graph = example_graphs.ap_graph_tw_3.copy()
+        node = other_labels_graph.nodes()[0]
+        other_labels_graph.node[node]["labels"] = [u"other"]
+        other_labels_hypergraph = Hypergraph(other_labels_graph)
+        self.assertNotEqual(hypergraph.structural_hash(), other_labels_hypergraph.structural_hash())
+        self.assertEqual(hypergraph.structural_hash(include_labels=False), other_labels_hypergraph.structural_hash(include_labels=False))
+        
+        hypergraph_copy = hypergraph.copy()
+        hypergraph_copy.remove_edge(hypergraph_copy.edges()[0])
+        self.assertNotEqual(hypergraph.structural_hash(), hypergraph_copy.structural_hash())
+    
+    def testHypergraph_Reorder(self):
+        dummy_hypergraph = Hypergraph(example_graphs.ap_graph_tw_3)
+        for method in ["bfs", "rcm", "degree"]:
+            reordered_hypergraph, node_map = dummy_hypergraph.reorder(method)
+            self.assertEqual(sorted(node_map.values()), sorted(reordered_hypergraph.nodes()))
+            self.assertEqual(reordered_hypergraph.structural_hash(), dummy_hypergraph.structural_hash())
+            for edge in dummy_hypergraph.edges_iter():
+                endpoints = [node_map[node] for node in dummy_hypergraph.endpoints(edge)]
+                new_edges = reordered_hypergraph.edges(*endpoints)
+                self.assertTrue(any(reordered_hypergraph.edge_direction(new_edge) ==
+                                    set(tuple(node_map[node] for node in perm) for perm in dummy_hypergraph.edge_direction(edge))
+                                    for new_edge in new_edges))
+        
+        # a path 3 - 0 - 2 - 1 is renumbered along the path
+        path_neighbors = {0: [2, 3], 1: [2], 2: [0, 1], 3: [0]}
+        self.assertEqual(node_ordering.get_ordering([0, 1, 2, 3], path_neighbors.get, "bfs"), [0, 2, 3, 1])
+        self.assertEqual(node_ordering.get_ordering([0, 1, 2, 3], path_neighbors.get, "rcm"), [3, 0, 2, 1])
+        self.assertEqual(node_ordering.get_ordering([0, 1, 2, 3], path_neighbors.get, "degree"), [0, 2, 1, 3])
+        
+        compact_hypergraph = CompactHypergraph(example_graphs.ap_graph_tw_3)
+        reordered_compact_hypergraph, permutation = compact_hypergraph.reorder("rcm")
+        self.assertEqual(sorted(permutation[compact_hypergraph.nodes()].tolist()), reordered_compact_hypergraph.nodes())
+        self.assertEqual(reordered_compact_hypergraph.to_hypergraph().structural_hash(), dummy_hypergraph.structural_hash())
+    
     def testHypergraph_subgraph_with_labels(self):
         dummy_hypergraph = Hypergraph(example_graphs.gt_dummy_graph)
         subgraph = dummy_hypergraph.subgraph_with_labels(set(["n_1", "n_6", "n_9", "n_10"]))
         isomorphic = algorithms.isomorphic(example_graphs.gt_dummy_subgraph, subgraph)
         self.assertTrue(isomorphic, "Incorrect subgraph extraction from hypergraph.")
     
+    def testHypergraph_View(self):
+        dummy_hypergraph = Hypergraph(example_graphs.gt_dummy_graph)
+        nodes = set(["n_1", "n_6", "n_9", "n_10"])
+        view = dummy_hypergraph.view(nodes)
+        subgraph = dummy_hypergraph.subgraph(nodes)
+        self.assertEqual(set(view.nodes()), nodes)
+        self.assertEqual(view.get_adj_nodes(), dummy_hypergraph.get_adj_nodes(nodes))
+        for node in nodes:
+            self.assertEqual(set(view.neighbors(node)), set(subgraph.neighbors(node)))
+        self.assertTrue(algorithms.isomorphic(example_graphs.gt_dummy_subgraph, view))
+        self.assertTrue(algorithms.isomorphic(example_graphs.gt_dummy_subgraph, view.materialize()))
+        self.assertEqual(dummy_hypergraph, Hypergraph(example_graphs.gt_dummy_graph), "The view modified the hypergraph.")
+
+    def testHypergraph_ViewBoundary(self):
+        hypergraph = Hypergraph()
+        for i in range(1, 6):
+            hypergraph.add_node(i, attr_dict={"labels": [u"l{0}".format(i)]})
+        hypergraph.add_edge(set([u"n_1", u"n_2", u"n_3"]), direction=set([(u"n_1", u"n_2", u"n_3")]), label=u"h")
+        hypergraph.add_edge(set([u"n_1", u"n_4"]), direction=set([(u"n_4", u"n_1")]), label=u"a")
+        hypergraph.add_edge(set([u"n_3", u"n_5"]), label=u"b")
+        hypergraph.add_edge(set([u"n_1"]), label=u"loop")
+        for nodes in [set([u"n_1", u"n_2"]), set([u"n_1", u"n_4"]), set([u"n_1", u"n_2", u"n_3"]), set([u"n_2", u"n_5"])]:
+            view = hypergraph.view(nodes)
+            subgraph = hypergraph.subgraph_with_labels(nodes)
+            self.assertEqual(view.get_adj_nodes(), nxext.get_all_adjacent_nodes(subgraph))
+            for u, v in view.get_adj_nodes():
+                self.assertEqual(sorted(view.get_edge_labels_and_dirs(u, v)), sorted(nxext.get_edge_labels_and_dirs(subgraph, u, v)))
+            for node in nodes:
+                self.assertEqual(view.node[node], hypergraph.node[node])
+                # the edges of a node in the view (also the ones given by both endpoints) have another endpoint in the view
+                self.assertEqual(set(view.edges(node, node)), set(view.edges(node)))
+                for edge in view.edges(node):
+                    self.assertTrue(len(set(hypergraph.endpoints(edge)) & nodes) > 1)
+            for node in set(hypergraph.nodes()) - nodes:
+                self.assertNotIn(node, view.node)
+                self.assertRaises(KeyError, lambda: view.node[node])
+            self.assertEqual(sorted(view.node), sorted(nodes))
+
+    def testCompactHypergraph(self):
+        dummy_hypergraph = Hypergraph(example_graphs.gt_dummy_graph)
+        compact_hypergraph = CompactHypergraph(example_graphs.gt_dummy_graph)
+        self.assertEqual(compact_hypergraph.number_of_edges(), 32)
+        for node in dummy_hypergraph.nodes_iter():
+            neighbors = set(Hypergraph.format_node_id(n) for n in compact_hypergraph.neighbors(int(node[2:])))
+            self.assertEqual(neighbors, set(dummy_hypergraph.neighbors(node)), "Wrong neighbors in the compact hypergraph.")
+            for dir_code in [-1, 0, 1]:
+                edges = list(compact_hypergraph.edges_iter_dir(int(node[2:]), dir_code=dir_code))
+                self.assertEqual(len(edges), len(list(dummy_hypergraph.edges_iter_dir(node, dir_code=dir_code))))
+        self.assertEqual(len(compact_hypergraph.edges(5, 1)), 1)
+        subgraph = compact_hypergraph.subgraph_with_labels(set([1, 6, 9, 10]))
+        isomorphic = algorithms.isomorphic(example_graphs.gt_dummy_subgraph, subgraph)
+        self.assertTrue(isomorphic, "Incorrect subgraph extraction from compact hypergraph.")
+        compact_hypergraph.remove_node(6)
+        self.assertEqual(compact_hypergraph.number_of_edges(), 28)
+        self.assertEqual(compact_hypergraph.edges(1, 6), [])
+    
+    def testCompactHypergraph_Conversion(self):
+        canon_str = arnborg_proskurowski.get_canonical_representation(example_graphs.ap_graph_tw_3)
+        compact_hypergraph = CompactHypergraph(example_graphs.ap_graph_tw_3)
+        hypergraph = compact_hypergraph.to_hypergraph()
+        self.assertEqual(arnborg_proskurowski.get_canonical_representation(hypergraph), canon_str)
+        compact_hypergraph_2, _ = CompactHypergraph.from_hypergraph(hypergraph)
+        self.assertEqual(arnborg_proskurowski.get_canonical_representation(compact_hypergraph_2.to_hypergraph()), canon_str)
+        self.assertEqual(compact_hypergraph, compact_hypergraph.copy(), "The copy was not correct.")
+    
+    def testCompactHypergraph_Binary(self):
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        dir_name = os.path.join(temp_dir, "compact_hypergraph_bin.tmp")
+        compact_hypergraph = CompactHypergraph(example_graphs.gt_dummy_graph)
+        compact_hypergraph.add_node_label(1, u"second")
+        compact_hypergraph.add_edge([1, 2, 3], label=u"hedge")
+        compact_hypergraph.remove_edge(0)
+        compact_hypergraph.save_to_binary(dir_name)
+        canon_str = arnborg_proskurowski.get_canonical_representation(compact_hypergraph.to_hypergraph())
+        for mmap in [True, False]:
+            read_hypergraph = CompactHypergraph.load_from_binary(dir_name, mmap=mmap)
+            self.assertEqual(read_hypergraph.nodes(), compact_hypergraph.nodes())
+            self.assertEqual(read_hypergraph.edges(), compact_hypergraph.edges())
+            self.assertEqual(read_hypergraph.number_of_hedges(), 1)
+            for node in compact_hypergraph.nodes_iter():
+                self.assertEqual(read_hypergraph.node_labels(node), compact_hypergraph.node_labels(node))
+                self.assertEqual(read_hypergraph.edges(node), compact_hypergraph.edges(node))
+            for edge in compact_hypergraph.edges_iter():
+                self.assertEqual(read_hypergraph.edge(edge), compact_hypergraph.edge(edge))
+            self.assertEqual(arnborg_proskurowski.get_canonical_representation(read_hypergraph.to_hypergraph()), canon_str)
+        read_hypergraph = CompactHypergraph.load_from_binary(dir_name).copy()
+        read_hypergraph.add_edge([1, 5], label=u"new")
+        self.assertEqual(read_hypergraph.number_of_edges(), compact_hypergraph.number_of_edges() + 1)
+
+    def testCompactHypergraph_MemoryMappedRBalls(self):
+        def assert_memory_mapped(compact_hypergraph):
+            for values in [compact_hypergraph._node_flags, compact_hypergraph._node_label, compact_hypergraph._edge_ptr,
+                           compact_hypergraph._edge_nodes, compact_hypergraph._edge_labels, compact_hypergraph._edge_dirs,
+                           compact_hypergraph._edge_flags] + list(compact_hypergraph._incidence):
+                self.assertIsInstance(values, np.memmap)
+        
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        dir_name = os.path.join(temp_dir, "compact_hypergraph_bin.tmp")
+        dummy_hypergraph = Hypergraph(example_graphs.gt_dummy_graph)
+        compact_hypergraph, node_index_map = CompactHypergraph.from_hypergraph(dummy_hypergraph)
+        compact_hypergraph.save_to_binary(dir_name)
+        read_hypergraph = CompactHypergraph.load_from_binary(dir_name)
+        assert_memory_mapped(read_hypergraph)
+        # the r-balls are read from the memory-mapped arrays without converting the graph
+        for node in dummy_hypergraph.nodes_iter():
+            for edge_dir in [-1, 0, 1]:
+                rball = algorithms.r_ball_hyper(dummy_hypergraph, node, 2, edge_dir)
+                compact_rball = algorithms.r_ball_hyper(read_hypergraph, node_index_map[node], 2, edge_dir)
+                self.assertEqual(set(compact_rball.nodes()), set(rball.nodes()))
+                self.assertEqual(compact_rball.structural_hash(), rball.structural_hash())
+        assert_memory_mapped(read_hypergraph)
+    
+    def testHypergraph_MemoryReport(self):
+        dummy_hypergraph = Hypergraph(example_graphs.gt_dummy_graph)
+        report = dummy_hypergraph.memory_report()
+        for component in ["adjacency", "node_attributes", "edge_attributes", "registries", "ready_sets", "parallel_groups"]:
+            self.assertTrue(report[component] > 0, "The component {0} is missing in the memory report.".format(component))
+        self.assertEqual(report["total"], sum(size for name, size in report.items() if name != "total"))
+        self.assertEqual(report["total"], memory.deep_sizeof(dummy_hypergraph))
+        compact_report = CompactHypergraph(example_graphs.gt_dummy_graph).memory_report()
+        self.assertTrue(compact_report["total"] - compact_report["vocabulary"] < report["total"])
+        wl_report = weisfeiler_lehman.memory_report({"labels": {u"a": u"0"}, "next_label": 1})
+        self.assertEqual(sorted(wl_report.keys()), ["labels", "next_label", "total"])
+        self.assertTrue(wl_report["total"] > wl_report["labels"] + wl_report["next_label"])
+    
+    def testLabelVocabulary(self):
+        vocabulary = LabelVocabulary(["0", "1"])
+        self.assertEqual(vocabulary.get_id("1"), 1)
+        self.assertEqual(vocabulary.get_id("a"), 2)
+        self.assertEqual(list(vocabulary.get_ids(["a", "0", "b"])), [2, 0, 3])
+        self.assertEqual(vocabulary.get_labels([3, 1]), ["b", "1"])
+        self.assertTrue(vocabulary.intern("".join(["a", "b"])) is vocabulary.intern("ab"))
+        dummy_hypergraph = Hypergraph(example_graphs.gt_dummy_graph)
+        compact_hypergraph = CompactHypergraph(example_graphs.gt_dummy_graph)
+        for node in dummy_hypergraph.nodes_iter():
+            self.assertEqual(dummy_hypergraph.node[node]["labels"], compact_hypergraph.node_labels(int(node[2:])))
+            for label in dummy_hypergraph.node[node]["labels"]:
+                self.assertIs(label, default_vocabulary.intern(label))
+        self.assertIsNot(compact_hypergraph.vocabulary, default_vocabulary)
+        
+        # a vocabulary of a dataset
+        vocabulary = LabelVocabulary()
+        dataset_hypergraph = Hypergraph(example_graphs.gt_dummy_graph, vocabulary=vocabulary)
+        self.assertEqual(dataset_hypergraph, dummy_hypergraph)
+        self.assertEqual(set(vocabulary.labels), set(label for node in dummy_hypergraph.nodes_iter() for label in dummy_hypergraph.node[node]["labels"]) |
+                         set(dummy_hypergraph.edge(edge)["labels"][0] for edge in dummy_hypergraph.edges_iter()))
+        vocabulary.clear()
+        self.assertEqual(len(vocabulary), 0)
+        self.assertNotIn("0", vocabulary)
+        
+        # only the used labels are pickled
+        compact_hypergraph.vocabulary.intern(u"unused label")
+        unpickled_hypergraph = pickle.loads(pickle.dumps(compact_hypergraph))
+        self.assertNotIn(u"unused label", unpickled_hypergraph.vocabulary)
+        self.assertEqual(unpickled_hypergraph, compact_hypergraph)
+        for node in compact_hypergraph.nodes_iter():
+            self.assertEqual(unpickled_hypergraph.node_labels(node), compact_hypergraph.node_labels(node))
+        
+        # resetting the default vocabulary does not affect the existing graphs
+        wl_hypergraph, _ = weisfeiler_lehman.init(dummy_hypergraph)
+        wl_labels = {node: list(wl_hypergraph.node[node]["labels"]) for node in wl_hypergraph.nodes_iter()}
+        reset_default_vocabulary()
+        self.assertEqual(len(default_vocabulary), 0)
+        self.assertEqual(dummy_hypergraph, Hypergraph(example_graphs.gt_dummy_graph))
+        self.assertEqual({node: wl_hypergraph.node[node]["labels"] for node in wl_hypergraph.nodes_iter()}, wl_labels)
+        for node in dummy_hypergraph.nodes_iter():
+            self.assertEqual(compact_hypergraph.node_labels(int(node[2:])), dummy_hypergraph.node[node]["labels"])
+        # only the labels of the hypergraph built after the reset
+        self.assertEqual(set(default_vocabulary.labels), set(dummy_hypergraph.node[node]["labels"][0] for node in dummy_hypergraph.nodes_iter()) |
+                         set(dummy_hypergraph.edge(edge)["labels"][0] for edge in dummy_hypergraph.edges_iter()))
+    
     def testRBallHyper(self):
         dummy_hypergraph = Hypergraph(example_graphs.gt_dummy_graph)
         rball_in = algorithms.r_ball_hyper(dummy_hypergraph, "n_10", 2, -1)
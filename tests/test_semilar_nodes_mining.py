@@ -12,10 +12,14 @@ from ivanov.graph.algorithms.similar_graphs_mining.characteristic_matrix import
 from ivanov.graph.algorithms.similar_graphs_mining.min_hash_function import MinHashFunction
 from ivanov.graph.algorithms.similar_graphs_mining.sketch_matrix import SketchMatrix
 from ivanov.graph.hypergraph import Hypergraph
+from ivanov.graph.compact_hypergraph import CompactHypergraph
 from ivanov.graph import algorithms
 from tests import example_graphs
 import numpy as np
 import unittest
+import tempfile
+import shutil
+import os
 
 class TestSimilarNodesMining(unittest.TestCase):
     
@@ -150,7 +154,9 @@ class TestSimilarNodesMining(unittest.TestCase):
         self.assertEqual(self.raw_ch_matrix_exp, ch_matrix.sparse_matrix, "The computed characteristic matrix is wrong.")
     
     def testCharacteristicMatrix_ReadWrite(self):
-        file_name = "test_files/characteristic_matrix.tmp"
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        file_name = os.path.join(temp_dir, "characteristic_matrix.tmp")
         dummy_hypergraph = Hypergraph(example_graphs.snm_dummy_graph)
         rballs_database, _ = similar_nodes_mining.extract_rballs_database(dummy_hypergraph, r_in=2, r_out=2, r_all=0)
         nodes_count = dummy_hypergraph.number_of_nodes()
@@ -181,7 +187,9 @@ class TestSimilarNodesMining(unittest.TestCase):
         self.assertTrue(equality, "The computed similarity matrix is wrong (Keep in mind that the sketch_matrix is probabilistic, therefore, it may not be always correct. The test may pass in another run.).")
     
     def testSketchMatrix_ReadWrite(self):
-        file_name = "test_files/sketch_matrix.tmp"
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        file_name = os.path.join(temp_dir, "sketch_matrix.tmp")
         dummy_hypergraph = Hypergraph(example_graphs.snm_dummy_graph)
         rballs_database, _ = similar_nodes_mining.extract_rballs_database(dummy_hypergraph, r_in=2, r_out=2, r_all=0)
         nodes_count = dummy_hypergraph.number_of_nodes()
@@ -192,6 +200,19 @@ class TestSimilarNodesMining(unittest.TestCase):
         equality = (read_sketch_matrix.matrix == sketch_matrix.matrix).all()
         self.assertTrue(equality, "The read sketch matrix is different from the saved one.")
     
+    def testMatricesMemoryReport(self):
+        dummy_hypergraph = Hypergraph(example_graphs.snm_dummy_graph)
+        rballs_database, _ = similar_nodes_mining.extract_rballs_database(dummy_hypergraph, r_in=2, r_out=2, r_all=0)
+        nodes_count = dummy_hypergraph.number_of_nodes()
+        ch_matrix = CharacteristicMatrix(rballs_database, nodes_count, wl_iterations=0)
+        ch_report = ch_matrix.memory_report()
+        self.assertTrue(ch_report["sparse_matrix"] > 0)
+        self.assertEqual(ch_report["total"], sum(size for name, size in ch_report.items() if name != "total"))
+        sketch_matrix = SketchMatrix(5, 20, ch_matrix)
+        sketch_report = sketch_matrix.memory_report()
+        self.assertTrue(sketch_report["matrix"] >= sketch_matrix.matrix.nbytes)
+        self.assertEqual(sketch_report["total"], sum(size for name, size in sketch_report.items() if name != "total"))
+    
     def testGetAllSimilarNodes(self):
         dummy_sim_matrix_1 = np.array([
             [0., 1., 1., 1.],
@@ -235,6 +256,26 @@ class TestSimilarNodesMining(unittest.TestCase):
             equality = equality.all()
         self.assertTrue(equality, "Wrong similar nodes were extracted (Keep in mind that the sketch_matrix is probabilistic, therefore, it may not be always correct. The test may pass in another run.).")
 
+    def testGetSimilarNodesToQueryNode_CompactHypergraph(self):
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        dir_name = os.path.join(temp_dir, "compact_hypergraph_bin.tmp")
+        dummy_hypergraph = Hypergraph(example_graphs.snm_dummy_graph)
+        rballs_database, index_node_map = similar_nodes_mining.extract_rballs_database(dummy_hypergraph, r_in=3, r_out=2, r_all=0)
+        nodes_count = dummy_hypergraph.number_of_nodes()
+        ch_matrix = CharacteristicMatrix(rballs_database, nodes_count, wl_iterations=0)
+        sketch_matrix = SketchMatrix(25, 265, ch_matrix)
+        compact_hypergraph, _ = CompactHypergraph.from_hypergraph(dummy_hypergraph)
+        compact_hypergraph.save_to_binary(dir_name)
+        read_hypergraph = CompactHypergraph.load_from_binary(dir_name)
+        # map the columns to the node ID's of the loaded graph (as load_ch_matrix does)
+        node_index_map = CompactHypergraph.get_node_index_map(index_node_map.itervalues())
+        for index, node in index_node_map.iteritems():
+            similar_nodes_exp, _ = similar_nodes_mining.get_similar_nodes(node, dummy_hypergraph, sketch_matrix, 0, [], r_in=3, r_out=2, r_all=0)
+            similar_nodes, _ = similar_nodes_mining.get_similar_nodes(node_index_map[node], read_hypergraph, sketch_matrix, 0, [], r_in=3, r_out=2, r_all=0)
+            self.assertTrue(index in similar_nodes, "The query node {0} is not similar to itself.".format(node))
+            self.assertTrue(np.array_equal(similar_nodes_exp, similar_nodes), "The similar nodes of {0} differ in the CompactHypergraph.".format(node))
+
 if __name__ == "__main__":
     #import sys;sys.argv = ['', 'Test.testFeatureExtraction']
     unittest.main()
\ No newline at end of file